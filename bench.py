@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+cppp bench - Headless benchmark of copy strategies
+Generates synthetic datasets once, then times the cppp binary and the
+Python copy paths on them at several part counts, with a cold and a warm
+page cache, and writes a table and a JSON report.
+
+    python bench.py --dir /mnt/scratch/cppp-bench --parts 1,4,8 --repeat 3
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import CHUNK_SIZE, CopyEngine, EngineError, EngineOptions, drop_cache, split_ranges
+from jobs import find_binary
+from paths import cache_dir
+from preflight import format_size
+
+MB = 1024 * 1024
+BENCH_DIR = "bench"
+# Files of at least this size are split into parts, like SMALL_FILE_THRESHOLD
+PART_THRESHOLD = MB
+DEFAULT_PARTS = "1,4,8"
+STRATEGIES = ["cppp", "engine", "readwrite", "copy_file_range", "sendfile", "mmap"]
+CACHE_STATES = ["cold", "warm"]
+
+
+# Datasets
+
+def _fill(path: str, size: int, block: bytes) -> None:
+    with open(path, "wb") as f:
+        left = size
+        while left > 0:
+            f.write(block[:min(len(block), left)])
+            left -= len(block)
+
+
+def make_huge(root: str, scale: float, block: bytes) -> None:
+    """One large file."""
+    _fill(os.path.join(root, "huge.bin"), int(512 * MB * scale), block)
+
+
+def make_tiny(root: str, scale: float, block: bytes) -> None:
+    """Many 4 KiB files spread over 100 directories."""
+    for i in range(int(10000 * scale)):
+        directory = os.path.join(root, f"d{i % 100:02d}")
+        os.makedirs(directory, exist_ok=True)
+        _fill(os.path.join(directory, f"f{i:06d}"), 4096, block)
+
+
+def make_mixed(root: str, scale: float, block: bytes) -> None:
+    """A tree with a long-tailed size distribution, from 1 KiB to 64 MiB."""
+    sizes = [1024 * 4 ** (i % 9) for i in range(int(400 * scale))]
+    for i, size in enumerate(sizes):
+        directory = os.path.join(root, f"level{i % 3}", f"group{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        _fill(os.path.join(directory, f"file{i:04d}.dat"), size, block)
+
+
+def make_sparse(root: str, scale: float, block: bytes) -> None:
+    """Large files that are mostly holes, with 1 MiB data extents."""
+    size = int(256 * MB * scale)
+    for i in range(4):
+        with open(os.path.join(root, f"sparse{i}.img"), "wb") as f:
+            f.truncate(size)
+            for offset in range(0, size, max(MB, size // 16)):
+                f.seek(offset)
+                f.write(block[:min(MB, size - offset)])
+
+
+DATASETS = {"huge": make_huge, "tiny": make_tiny, "mixed": make_mixed, "sparse": make_sparse}
+
+
+def prepare_dataset(base: str, name: str, scale: float) -> str:
+    """Create a dataset unless it already exists with the same scale."""
+    root = os.path.join(base, "data", name)
+    marker = os.path.join(root, ".bench")
+    try:
+        with open(marker) as f:
+            if json.load(f) == {"scale": scale}:
+                return root
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    print(f"Generating dataset '{name}' (scale {scale})...", file=sys.stderr)
+    DATASETS[name](root, scale, os.urandom(MB))
+    with open(marker, "w") as f:
+        json.dump({"scale": scale}, f)
+    return root
+
+
+def dataset_files(root: str) -> list[tuple[str, int]]:
+    """Return (relative path, size) of every regular file of a dataset."""
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            if path != os.path.join(root, ".bench"):
+                files.append((os.path.relpath(path, root), os.path.getsize(path)))
+    return sorted(files)
+
+
+def set_cache(root: str, files: list, state: str) -> None:
+    """Evict (cold) or load (warm) the page cache of every dataset file.
+
+    Eviction uses POSIX_FADV_DONTNEED, which drops clean pages without
+    needing root; dirty pages are written back first by os.sync().
+    """
+    os.sync()
+    for rel, _ in files:
+        fd = os.open(os.path.join(root, rel), os.O_RDONLY)
+        try:
+            if state == "cold":
+                drop_cache(fd)
+            else:
+                while os.read(fd, 8 * MB):
+                    pass
+        finally:
+            os.close(fd)
+
+
+# Python copy paths; each copies one (offset, length) range of an open file
+
+def copy_readwrite(fd_src: int, fd_dst: int, offset: int, length: int) -> None:
+    end = offset + length
+    while offset < end:
+        data = os.pread(fd_src, min(CHUNK_SIZE, end - offset), offset)
+        if not data:
+            break
+        offset += os.pwrite(fd_dst, data, offset)
+
+
+def copy_kernel(fd_src: int, fd_dst: int, offset: int, length: int) -> None:
+    end = offset + length
+    while offset < end:
+        copied = os.copy_file_range(fd_src, fd_dst, min(CHUNK_SIZE, end - offset), offset, offset)
+        if copied <= 0:
+            break
+        offset += copied
+
+
+def copy_sendfile(fd_src: int, fd_dst: int, offset: int, length: int) -> None:
+    # sendfile() writes at the file position, so every part needs its own descriptor
+    fd_part = os.open(f"/proc/self/fd/{fd_dst}", os.O_WRONLY)
+    try:
+        os.lseek(fd_part, offset, os.SEEK_SET)
+        end = offset + length
+        while offset < end:
+            sent = os.sendfile(fd_part, fd_src, offset, min(CHUNK_SIZE, end - offset))
+            if sent <= 0:
+                break
+            offset += sent
+    finally:
+        os.close(fd_part)
+
+
+def copy_mmap(fd_src: int, fd_dst: int, offset: int, length: int) -> None:
+    if length == 0:
+        return
+    with mmap.mmap(fd_src, 0, prot=mmap.PROT_READ) as source:
+        end = offset + length
+        while offset < end:
+            count = min(CHUNK_SIZE, end - offset)
+            offset += os.pwrite(fd_dst, source[offset:offset + count], offset)
+
+
+PRIMITIVES = {
+    "readwrite": copy_readwrite,
+    "copy_file_range": copy_kernel,
+    "sendfile": copy_sendfile,
+    "mmap": copy_mmap,
+}
+
+
+def copy_tree_with(primitive, src: str, dst: str, files: list, parts: int) -> None:
+    """Copy a dataset file by file, large files in parallel parts like cppp."""
+    with ThreadPoolExecutor(max_workers=parts) as pool:
+        for rel, size in files:
+            target = os.path.join(dst, rel)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd_src = os.open(os.path.join(src, rel), os.O_RDONLY)
+            fd_dst = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.ftruncate(fd_dst, size)
+                ranges = split_ranges(size, parts if size >= PART_THRESHOLD else 1)
+                for future in [pool.submit(primitive, fd_src, fd_dst, offset, length)
+                               for offset, length in ranges]:
+                    future.result()
+                os.fsync(fd_dst)
+            finally:
+                os.close(fd_src)
+                os.close(fd_dst)
+
+
+# Runs
+
+def run_once(strategy: str, src: str, dst: str, files: list, parts: int, cppp_bin: str) -> float:
+    """Copy src into a fresh dst and return the elapsed seconds."""
+    shutil.rmtree(dst, ignore_errors=True)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    start = time.monotonic()
+    if strategy == "cppp":
+        if cppp_bin is None:
+            raise RuntimeError("cppp binary not found")
+        result = subprocess.run([cppp_bin, "-i", src, "-o", dst, "-p", str(parts)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors="replace").strip() or "cppp failed")
+    elif strategy == "engine":
+        failures = CopyEngine(EngineOptions(num_parts=parts)).run([src], dst)
+        if failures:
+            raise RuntimeError(f"{failures} files failed")
+    else:
+        copy_tree_with(PRIMITIVES[strategy], src, dst, files, parts)
+    return time.monotonic() - start
+
+
+def check_copy(dst: str, files: list) -> int:
+    """Verify sizes and return the bytes the copy allocates on disk."""
+    allocated = 0
+    for rel, size in files:
+        st = os.stat(os.path.join(dst, rel))
+        if st.st_size != size:
+            raise RuntimeError(f"'{rel}' has {st.st_size} bytes, expected {size}")
+        allocated += st.st_blocks * 512
+    return allocated
+
+
+def benchmark(args) -> list[dict]:
+    cppp_bin = args.cppp or find_binary()
+    results = []
+    for name in args.datasets:
+        src = prepare_dataset(args.dir, name, args.scale)
+        files = dataset_files(src)
+        total = sum(size for _, size in files)
+        dst = os.path.join(args.dir, "out", name)
+        for strategy in args.strategies:
+            for parts in args.parts:
+                for state in args.cache:
+                    times, allocated, error = [], 0, ""
+                    for _ in range(args.repeat):
+                        set_cache(src, files, state)
+                        try:
+                            times.append(run_once(strategy, src, dst, files, parts, cppp_bin))
+                            allocated = check_copy(dst, files)
+                        except (OSError, RuntimeError, EngineError) as e:
+                            error = str(e)
+                            break
+                    shutil.rmtree(dst, ignore_errors=True)
+                    seconds = statistics.median(times) if times and not error else None
+                    result = {
+                        "dataset": name,
+                        "strategy": strategy,
+                        "parts": parts,
+                        "cache": state,
+                        "files": len(files),
+                        "bytes": total,
+                        "seconds": seconds,
+                        "best": min(times) if times and not error else None,
+                        "runs": times,
+                        "mbps": total / MB / seconds if seconds else None,
+                        "allocated": allocated,
+                        "error": error,
+                    }
+                    results.append(result)
+                    print(format_row(result), file=sys.stderr)
+    return results
+
+
+def format_row(result: dict) -> str:
+    if result["error"]:
+        outcome = f"{'failed':>10}  {result['error']}"
+    else:
+        outcome = (f"{result['seconds']:>9.3f}s {result['mbps']:>9.1f} MB/s "
+                   f"{format_size(result['allocated']):>10}")
+    return (f"{result['dataset']:<7}{result['strategy']:<16}{result['parts']:>3}  "
+            f"{result['cache']:<5}{outcome}")
+
+
+def print_table(results: list[dict]) -> None:
+    print(f"{'data':<7}{'strategy':<16}{'-p':>3}  {'cache':<5}"
+          f"{'median':>10} {'throughput':>14} {'on disk':>10}")
+    for result in results:
+        print(format_row(result))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cppp and the Python copy paths.")
+    parser.add_argument("--dir", default=os.path.join(cache_dir(), BENCH_DIR),
+                        help="where datasets and copies are created (default: %(default)s)")
+    parser.add_argument("--datasets", default=",".join(DATASETS),
+                        help="comma separated subset of: " + ", ".join(DATASETS))
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help="comma separated subset of: " + ", ".join(STRATEGIES))
+    parser.add_argument("--parts", default=DEFAULT_PARTS, help="part counts (default: %(default)s)")
+    parser.add_argument("--cache", default=",".join(CACHE_STATES), help="cold, warm or both")
+    parser.add_argument("--scale", type=float, default=1.0, help="dataset size multiplier")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the median is reported")
+    parser.add_argument("--cppp", help="cppp binary (default: the one the TUI would use)")
+    parser.add_argument("--json", help="report file (default: <dir>/report-<time>.json)")
+    args = parser.parse_args(argv)
+
+    args.datasets = args.datasets.split(",")
+    args.strategies = args.strategies.split(",")
+    args.cache = args.cache.split(",")
+    for values, known, option in ((args.datasets, DATASETS, "--datasets"),
+                                  (args.strategies, STRATEGIES, "--strategies"),
+                                  (args.cache, CACHE_STATES, "--cache")):
+        unknown = [value for value in values if value not in known]
+        if unknown:
+            parser.error(f"{option}: unknown value(s) {', '.join(unknown)}")
+    try:
+        args.parts = [int(value) for value in args.parts.split(",")]
+    except ValueError:
+        parser.error("--parts: expected comma separated numbers")
+    if any(parts < 1 for parts in args.parts) or args.repeat < 1 or args.scale <= 0:
+        parser.error("--parts, --repeat and --scale must be positive")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    os.makedirs(args.dir, exist_ok=True)
+    results = benchmark(args)
+    print_table(results)
+    path = args.json or os.path.join(args.dir, "report-" + time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w") as f:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nReport written to {path}")
+    return 1 if any(result["error"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+cppp binary - Finds the cppp binary and probes what it supports
+The binary is run once with -V and -h; the parsed version and options
+are cached per (path, mtime), so later starts and launches skip the
+probe until the binary is rebuilt.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass, asdict, field
+
+from paths import cache_dir
+
+# Checked in order before PATH; CPPP_BIN overrides all of them
+SEARCH_PATHS = [
+    "./build/cppp",
+    "./cppp",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "cppp"),
+]
+BINARY_ENV = "CPPP_BIN"
+# Seconds a -V or -h run may take before the binary is treated as unusable
+PROBE_TIMEOUT = 5.0
+CAPABILITIES_FILE = "binary.json"
+
+_OPTION_RE = re.compile(r"--[a-z0-9][a-z0-9-]*")
+
+# path -> BinaryInfo for this session, checked against the mtime on every use
+_memory = {}
+
+
+@dataclass
+class BinaryInfo:
+    """A cppp binary and the options its help text lists.
+
+    The help text does not name the values -m accepts, so modes are not
+    probed; cli_parser.c only runs copies.
+    """
+
+    path: str
+    mtime: float = 0.0
+    version: str = ""
+    options: list[str] = field(default_factory=list)
+    cached: bool = False
+
+    def supports(self, option: str) -> bool:
+        return option in self.options
+
+
+def _capabilities_path() -> str:
+    return os.path.join(cache_dir(), CAPABILITIES_FILE)
+
+
+def load_capabilities() -> dict:
+    try:
+        with open(_capabilities_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_capabilities(info: BinaryInfo) -> None:
+    entries = load_capabilities()
+    entry = asdict(info)
+    entry.pop("cached")
+    entries[info.path] = entry
+    path = _capabilities_path()
+    with open(path + ".tmp", "w") as f:
+        json.dump(entries, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _executable(path: str) -> bool:
+    return os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def locate() -> str | None:
+    """Return the absolute path of the cppp binary to use, or None."""
+    configured = os.environ.get(BINARY_ENV)
+    if configured:
+        found = shutil.which(configured)
+        return os.path.abspath(found) if found else None
+    for path in SEARCH_PATHS:
+        if _executable(path):
+            return os.path.abspath(path)
+    found = shutil.which("cppp")
+    return os.path.abspath(found) if found else None
+
+
+def _run(path: str, flag: str) -> str:
+    result = subprocess.run([path, flag], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            stdin=subprocess.DEVNULL, timeout=PROBE_TIMEOUT)
+    return result.stdout.decode(errors="replace")
+
+
+def probe(path: str, mtime: float) -> BinaryInfo:
+    """Run the binary with -V and -h and parse what it reports."""
+    version_text = _run(path, "-V")
+    help_text = _run(path, "-h")
+    # Builds without a -V handler fall through to the help text
+    first = version_text.strip().splitlines()[0] if version_text.strip() else ""
+    version = "" if first.lower().startswith("usage") else first
+
+    options = sorted(set(_OPTION_RE.findall(help_text)))
+    return BinaryInfo(path=path, mtime=mtime, version=version, options=options)
+
+
+def inspect(path: str) -> BinaryInfo | None:
+    """Return the capabilities of the binary at path, probing it only when it changed.
+
+    Returns None when the binary is missing or does not run.
+    """
+    path = os.path.abspath(path)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+
+    info = _memory.get(path)
+    if info is not None and info.mtime == mtime:
+        return info
+    info = None
+    entry = load_capabilities().get(path)
+    if entry and entry.get("mtime") == mtime:
+        try:
+            info = BinaryInfo(**entry, cached=True)
+        except TypeError:
+            pass
+    if info is None:
+        try:
+            info = probe(path, mtime)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        try:
+            save_capabilities(info)
+        except OSError:
+            pass
+    _memory[path] = info
+    return info
+
+
+def discover() -> BinaryInfo | None:
+    """Locate the cppp binary and return its capabilities, or None.
+
+    Blocks on the first probe of a binary, so the TUI calls it in a thread.
+    """
+    path = locate()
+    return inspect(path) if path else None
+
+
+def describe(info: BinaryInfo | None) -> str:
+    """One log line describing the binary found at startup."""
+    if info is None:
+        return "ℹ️  cppp binary bulunamadı, Python motoru kullanılacak."
+    version = f" ({info.version})" if info.version else ""
+    source = " (önbellekten)" if info.cached else ""
+    return f"🔧 cppp: {info.path}{version}{source}"
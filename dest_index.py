@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+cppp destination index - Persistent metadata of destination trees
+Keeps path, size, mtime, inode and optional block digests of everything
+under a destination root in SQLite. A directory listing is reused as long
+as the directory's own mtime is unchanged, so pre-flight checks and sync
+decisions cost one stat per directory instead of one per file, which is
+what matters on NFS and other slow filesystems.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import stat
+import threading
+from dataclasses import dataclass
+
+from paths import cache_dir
+
+INDEX_DIR = "index"
+# Bump when the schema changes; the index is a cache and is rebuilt
+INDEX_VERSION = 2
+# Length of one sha256 block digest inside the digests blob
+DIGEST_SIZE = 32
+# What opening or updating the index raises when the cache is unusable
+INDEX_ERRORS = (OSError, sqlite3.Error)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    dev INTEGER NOT NULL,
+    digests BLOB
+);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roots (
+    src TEXT PRIMARY KEY,
+    dst TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class IndexEntry:
+    """Cached metadata of one destination entry.
+
+    Uses os.stat_result field names so it can stand in for a stat result.
+    """
+
+    st_size: int
+    st_mtime_ns: int
+    st_ino: int
+    st_dev: int
+    is_dir: bool = False
+
+    @classmethod
+    def from_stat(cls, st) -> "IndexEntry":
+        return cls(st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev, stat.S_ISDIR(st.st_mode))
+
+
+def index_path(root: str) -> str:
+    """Return the index file of a destination root."""
+    root = os.path.realpath(root)
+    directory = os.path.join(cache_dir(), INDEX_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, hashlib.sha1(root.encode()).hexdigest()[:16] + ".sqlite")
+
+
+def read_listing(directory: str):
+    """Return {name: IndexEntry} for a directory straight from the disk.
+
+    Returns None when the directory cannot be listed.
+    """
+    entries = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    entries[entry.name] = IndexEntry.from_stat(entry.stat())
+                except OSError:
+                    pass
+    except OSError:
+        return None
+    return entries
+
+
+class NoIndex:
+    """Stand-in for DestinationIndex that lists directories on every call."""
+
+    def destination(self, src: str):
+        return None
+
+    def listing(self, directory: str) -> dict:
+        return read_listing(directory) or {}
+
+    def lookup(self, path: str):
+        return self.listing(os.path.dirname(path)).get(os.path.basename(path))
+
+    def close(self) -> None:
+        pass
+
+
+def open_index(root: str):
+    """Return the DestinationIndex of root, or None when the cache is unusable."""
+    try:
+        return DestinationIndex(root)
+    except INDEX_ERRORS:
+        return None
+
+
+class DestinationIndex:
+    """Thread-safe index of one destination root, keyed by relative path.
+
+    A directory's listing is trusted while its mtime matches the recorded
+    one. Creating, removing or renaming entries changes that mtime; files
+    rewritten in place by other programs do not, which is why sync still
+    compares sizes and mtimes against the source.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(index_path(self.root), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            with self._db:
+                for table in ("files", "dirs", "roots"):
+                    self._db.execute(f"DROP TABLE IF EXISTS {table}")
+            self._db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self._db.executescript(SCHEMA)
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.realpath(path), self.root)
+
+    def destination(self, src: str):
+        """Return where src was synced to last time, if it still exists."""
+        with self._lock:
+            row = self._db.execute("SELECT dst FROM roots WHERE src = ?", (src,)).fetchone()
+        return row[0] if row and os.path.exists(row[0]) else None
+
+    def record_destination(self, src: str, dst: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (src, dst))
+
+    def listing(self, directory: str) -> dict:
+        """Return {name: IndexEntry} for a directory, scanning it only if it changed.
+
+        A missing directory gives an empty listing.
+        """
+        key = self._key(directory)
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            row = self._db.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (key,)).fetchone()
+            if row is not None and row[0] == dir_mtime:
+                return {
+                    os.path.basename(path): IndexEntry(size, mtime_ns, ino, dev, bool(is_dir))
+                    for path, is_dir, size, mtime_ns, ino, dev in self._db.execute(
+                        "SELECT path, is_dir, size, mtime_ns, ino, dev FROM files WHERE parent = ?",
+                        (key,))
+                }
+        return self._rescan(directory, key, dir_mtime)
+
+    def _rescan(self, directory: str, key: str, dir_mtime: int) -> dict:
+        entries = read_listing(directory)
+        if entries is None:
+            return {}
+        rows = [(os.path.join(key, name) if key != "." else name, key, int(e.is_dir),
+                 e.st_size, e.st_mtime_ns, e.st_ino, e.st_dev)
+                for name, e in entries.items()]
+        with self._lock, self._db:
+            # Keep digests of files that did not change since they were indexed
+            self._db.execute(
+                "DELETE FROM files WHERE parent = ? AND path NOT IN (SELECT value FROM json_each(?))",
+                (key, json.dumps([row[0] for row in rows])))
+            self._db.executemany(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, NULL) ON CONFLICT(path) DO UPDATE SET "
+                "is_dir = excluded.is_dir, size = excluded.size, ino = excluded.ino, dev = excluded.dev, "
+                "digests = CASE WHEN files.mtime_ns = excluded.mtime_ns AND files.size = excluded.size "
+                "THEN files.digests END, mtime_ns = excluded.mtime_ns",
+                rows)
+            self._db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (key, dir_mtime))
+        return entries
+
+    def lookup(self, path: str):
+        """Return the IndexEntry of path from its parent's listing, or None."""
+        return self.listing(os.path.dirname(path)).get(os.path.basename(path))
+
+    def block_digests(self, path: str, dst_stat):
+        """Return the block digests of path, or None if unknown or stale."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, digests FROM files WHERE path = ?", (self._key(path),)
+            ).fetchone()
+        if row is None or row[2] is None:
+            return None
+        size, mtime_ns, blob = row
+        if (size, mtime_ns) != (dst_stat.st_size, dst_stat.st_mtime_ns):
+            return None
+        return [blob[i:i + DIGEST_SIZE] for i in range(0, len(blob), DIGEST_SIZE)]
+
+    def put(self, path: str, dst_stat, digests=None) -> None:
+        """Record a destination file as it is now, with optional block digests."""
+        self.put_many([(path, dst_stat, digests)])
+
+    def put_many(self, entries) -> None:
+        """Record (path, stat, digests) tuples written by a copy job."""
+        rows = []
+        for path, st, digests in entries:
+            key = self._key(path)
+            rows.append((key, os.path.dirname(key) or ".", int(stat.S_ISDIR(st.st_mode)),
+                         st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev,
+                         b"".join(digests) if digests is not None else None))
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def touch_dirs(self, directories) -> None:
+        """Accept the current mtime of directories the job itself changed.
+
+        Their listings were fresh before the job and every entry it wrote
+        went through put(), so they are still complete.
+        """
+        rows = []
+        for directory in directories:
+            try:
+                rows.append((self._key(directory), os.stat(directory).st_mtime_ns))
+            except OSError:
+                pass
+        with self._lock, self._db:
+            self._db.executemany("UPDATE dirs SET mtime_ns = ? WHERE path = ?",
+                                 [(mtime, key) for key, mtime in rows])
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+cppp directory listing - Paged directory reads for the file picker
+Streams os.scandir results in pages so huge directories show up while
+they are still being read, and keeps finished listings in a small cache
+that is invalidated when a directory's mtime changes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Entries handed to the picker per page
+PAGE_SIZE = 2000
+# Directories whose complete listing is kept in memory
+CACHE_DIRS = 32
+
+
+@dataclass
+class Entry:
+    """One row of the file picker."""
+
+    name: str
+    path: str
+    is_dir: bool
+
+
+def sort_entries(entries: list[Entry]) -> list[Entry]:
+    """Directories first, then case-insensitive by name, like DirectoryTree."""
+    return sorted(entries, key=lambda entry: (not entry.is_dir, entry.name.lower()))
+
+
+def iter_pages(path: str, page_size: int = PAGE_SIZE):
+    """Yield lists of Entry for path without waiting for the full listing.
+
+    Uses the d_type that os.scandir already has, so no entry is stat'ed.
+    """
+    page = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            page.append(Entry(entry.name, entry.path, is_dir))
+            if len(page) >= page_size:
+                yield page
+                page = []
+    if page:
+        yield page
+
+
+class ListingCache:
+    """LRU cache of complete, sorted listings keyed by directory path."""
+
+    def __init__(self, capacity: int = CACHE_DIRS):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._listings = OrderedDict()
+
+    def get(self, path: str):
+        """Return the cached entries of path, or None if missing or stale."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._listings.get(path)
+            if cached is None or cached[0] != mtime_ns:
+                return None
+            self._listings.move_to_end(path)
+            return cached[1]
+
+    def put(self, path: str, mtime_ns: int, entries: list[Entry]) -> None:
+        with self._lock:
+            self._listings[path] = (mtime_ns, entries)
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.capacity:
+                self._listings.popitem(last=False)
+
+
+# Shared by every picker so reopening it is instant
+listing_cache = ListingCache()
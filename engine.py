@@ -0,0 +1,1586 @@
+#!/usr/bin/env python3
+"""
+cppp engine - In-process parallel copy engine for the cppp TUI
+Follows the copy rules of init_process()/copy_directory() in the C binary,
+but copies the parts of every file at the same time on a thread pool.
+"""
+
+import ctypes
+import errno
+import fcntl
+import hashlib
+import mmap
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from dest_index import INDEX_ERRORS, open_index
+from journal import CHECKPOINT_BYTES
+from progress import ProgressEvent
+
+# Default size of a single copy_file_range/pread call inside a part.
+CHUNK_SIZE = 1024 * 1024
+# Parts of large files start on multiples of this, so every worker fills
+# whole extents of the preallocated destination
+PART_ALIGN = 1024 * 1024
+# Same refresh rate as UPDATE_INTERVAL in progress_bar.h.
+UPDATE_INTERVAL = 0.5
+# Files below this size skip the ranged path and are copied in batches
+SMALL_FILE_THRESHOLD = 1024 * 1024
+# A batch ends at whichever limit is reached first
+SMALL_BATCH_FILES = 256
+SMALL_BATCH_BYTES = 64 * 1024 * 1024
+SMALL_FILE_WORKERS = 8
+# Threads re-reading destinations for -c while later files are copied
+VERIFY_WORKERS = 4
+# Sync mode compares and rewrites changed files in blocks of this size;
+# smaller files are simply copied again
+SYNC_BLOCK_SIZE = 4 * 1024 * 1024
+SYNC_DELTA_MIN = 16 * 1024 * 1024
+# Moved sources are deleted this many files per task once their copies are checked
+REMOVE_BATCH = 512
+# Copy methods, tried in this order for every new pair of filesystems
+METHOD_COPY_FILE_RANGE = "copy_file_range"
+METHOD_REFLINK = "reflink"
+METHOD_SENDFILE = "sendfile"
+METHOD_READ_WRITE = "read/write"
+COPY_METHODS = (METHOD_COPY_FILE_RANGE, METHOD_REFLINK, METHOD_SENDFILE, METHOD_READ_WRITE)
+# Chosen by EngineOptions.direct_io instead of the chain above
+METHOD_DIRECT = "O_DIRECT"
+# O_DIRECT offsets, lengths and buffers are kept aligned to this
+DIRECT_ALIGN = 4096
+# Buffered writes of the uncached path are written back every this many bytes
+FLUSH_WINDOW = 8 * 1024 * 1024
+# sync_file_range(2) flags from linux/fs.h
+SYNC_FILE_RANGE_WAIT_BEFORE = 1
+SYNC_FILE_RANGE_WRITE = 2
+SYNC_FILE_RANGE_WAIT_AFTER = 4
+# _IOW(0x94, 9, int) from linux/fs.h: share the source's extents (btrfs, XFS)
+FICLONE = 0x40049409
+# Errors meaning a method does not work for a file pair, not that I/O failed
+UNSUPPORTED_ERRNOS = frozenset({errno.EXDEV, errno.EINVAL, errno.ENOSYS,
+                                errno.EOPNOTSUPP, errno.ENOTTY})
+# fallocate(2) modes from linux/falloc.h
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+# Digest of a whole sync block of zeros, which sync turns into a hole
+ZERO_BLOCK_DIGEST = hashlib.sha256(bytes(SYNC_BLOCK_SIZE)).digest()
+
+
+class EngineError(Exception):
+    """An engine failure carrying the matching ERR_* name from error_codes.h."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+@dataclass
+class EngineOptions:
+    """Python counterpart of parser_options in cli_parser.h."""
+
+    num_parts: int = 1
+    verbose: bool = False
+    check_sha256: bool = False
+    overwrite: bool = False
+    block_size: int = CHUNK_SIZE
+    small_file_threshold: int = SMALL_FILE_THRESHOLD
+    # Skip unchanged files and rewrite only changed blocks of large ones
+    sync: bool = False
+    # Rename inputs within a filesystem; elsewhere copy, check and delete them
+    move: bool = False
+    # Copy around the page cache: O_DIRECT, or buffered with rolling write-back
+    direct_io: bool = False
+
+    def __post_init__(self):
+        # A source is only deleted once its copy was read back and compared
+        if self.move:
+            self.check_sha256 = True
+
+
+def same_metadata(src_stat, dst_stat) -> bool:
+    """Whether a synced destination still matches its source by size and mtime.
+
+    A destination mtime without a sub-second part may come from a
+    filesystem that stores whole seconds, so it is compared in seconds.
+    """
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if dst_stat.st_mtime_ns % 10**9 == 0:
+        return src_stat.st_mtime_ns // 10**9 == dst_stat.st_mtime_ns // 10**9
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def split_ranges(file_size: int, num_parts: int) -> list[tuple[int, int]]:
+    """Split a file into (offset, length) ranges like get_file_info() does."""
+    num_parts = max(1, min(num_parts, file_size or 1))
+    part_size = file_size // num_parts
+    ranges = [(i * part_size, part_size) for i in range(num_parts - 1)]
+    last_offset = part_size * (num_parts - 1)
+    ranges.append((last_offset, file_size - last_offset))
+    return ranges
+
+
+def aligned_ranges(file_size: int, num_parts: int, align: int = PART_ALIGN) -> list[tuple[int, int]]:
+    """Split a file into at most num_parts ranges starting on multiples of align.
+
+    Unlike split_ranges() only the last range may be shorter, and files
+    smaller than num_parts * align get fewer parts.
+    """
+    num_parts = max(1, num_parts)
+    part_size = max(align, -(-file_size // num_parts // align) * align) if file_size else 0
+    if part_size == 0:
+        return [(0, 0)]
+    return [(offset, min(part_size, file_size - offset))
+            for offset in range(0, file_size, part_size)]
+
+
+def preallocate(fd: int, size: int) -> None:
+    """Reserve size bytes for an output, so a full disk fails before any write.
+
+    The blocks are allocated in one go, as few extents as the filesystem
+    can manage, instead of piece by piece as parallel writers reach them.
+    Filesystems without fallocate support just get the size.
+    """
+    if size and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_ERRNOS:
+                raise
+    os.ftruncate(fd, size)
+
+
+def destination_for(src: str, output: str, file_count: int, dir_count: int) -> str:
+    """Return where init_process() puts src, without touching the disk.
+
+    file_count and dir_count are the number of regular files and
+    directories among all inputs of the job.
+    """
+    exists = os.path.exists(output)
+    name = os.path.basename(src.rstrip("/"))
+    if os.path.isdir(src):
+        if exists or (file_count and dir_count):
+            return os.path.join(output, name)
+        return output
+    if not exists or os.path.isdir(output):
+        return os.path.join(output, name)
+    return output
+
+
+def planned_destinations(inputs: list[str], output: str) -> dict:
+    """Return the destination of every input, keyed by its real path.
+
+    Has to run before the copy starts, as destination_for() answers
+    differently once output exists.
+    """
+    file_count = sum(1 for path in inputs if os.path.isfile(path))
+    dir_count = sum(1 for path in inputs if os.path.isdir(path))
+    output = os.path.realpath(output)
+    return {os.path.realpath(src): destination_for(os.path.realpath(src), output,
+                                                   file_count, dir_count)
+            for src in inputs}
+
+
+@dataclass
+class PartHash:
+    """SHA-256 of one byte range of a file, as hashed while copying it."""
+
+    offset: int
+    length: int
+    digest: str
+
+
+def manifest_digest(parts: list[PartHash]) -> str:
+    """Combine per-part digests into one digest for the whole file."""
+    combined = hashlib.sha256()
+    for part in parts:
+        combined.update(f"{part.offset}:{part.length}:{part.digest}\n".encode())
+    return combined.hexdigest()
+
+
+def select_method(fd_src: int, fd_dst: int, size: int, first: str = METHOD_COPY_FILE_RANGE,
+                  block_size: int = CHUNK_SIZE) -> str:
+    """Return the first copy method from first on that works for a file pair.
+
+    Ranged methods are tried on the first block, which the caller copies
+    again; a reflink that works has already copied the whole file.
+    """
+    count = min(block_size, size)
+    for method in COPY_METHODS[COPY_METHODS.index(first):-1]:
+        try:
+            if method == METHOD_COPY_FILE_RANGE:
+                if not hasattr(os, "copy_file_range"):
+                    continue
+                if os.copy_file_range(fd_src, fd_dst, count, 0, 0) <= 0:
+                    continue
+            elif method == METHOD_REFLINK:
+                if not reflink(fd_src, fd_dst):
+                    continue
+            elif os.sendfile(fd_dst, fd_src, 0, count) <= 0:
+                continue
+        except OSError as e:
+            if e.errno not in UNSUPPORTED_ERRNOS:
+                raise
+            continue
+        return method
+    return METHOD_READ_WRITE
+
+
+def reflink(fd_src: int, fd_dst: int) -> bool:
+    """Share the source's extents with the destination; False where unsupported."""
+    try:
+        fcntl.ioctl(fd_dst, FICLONE, fd_src)
+    except OSError as e:
+        if e.errno not in UNSUPPORTED_ERRNOS:
+            raise
+        return False
+    return True
+
+
+class MethodCache:
+    """Copy method that worked last, keyed by (source st_dev, destination st_dev)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {}
+
+    def get(self, key: tuple[int, int]):
+        with self._lock:
+            return self._methods.get(key)
+
+    def put(self, key: tuple[int, int], method: str) -> None:
+        with self._lock:
+            self._methods[key] = method
+
+
+# Shared by every engine of the process, so only the first file of a pair probes
+copy_methods = MethodCache()
+
+
+def copy_range(fd_src: int, fd_dst: int, offset: int, length: int,
+               block_size: int = CHUNK_SIZE, on_bytes=None, cancelled=None,
+               hasher=None, metrics=None, method: str = None, throttle=None) -> int:
+    """Copy one byte range with a ranged method, copy_file_range by default.
+
+    A method that turns out not to work falls back to pread and pwrite.
+    With a hasher the bytes have to pass through user space anyway, so
+    pread and pwrite are used and every block is hashed on its way through.
+    sendfile writes at the file offset, so it gets its own descriptor of
+    the destination.
+    metrics (a metrics.MetricsRecorder) gets the time of every call and
+    throttle (a throttle.Throttle) is asked before every block and told
+    how long its write took.
+    Returns the number of bytes copied, which is short only at EOF or
+    when cancelled() becomes true.
+    """
+    if method == METHOD_DIRECT:
+        return copy_range_uncached(fd_src, fd_dst, offset, length, block_size, on_bytes,
+                                   cancelled, hasher, metrics, throttle)
+    end = offset + length
+    start = offset
+    if method is None or method == METHOD_REFLINK:
+        method = METHOD_COPY_FILE_RANGE
+    if hasher is not None or (method == METHOD_COPY_FILE_RANGE and not hasattr(os, "copy_file_range")):
+        method = METHOD_READ_WRITE
+    fd_out = None
+    if method == METHOD_SENDFILE:
+        try:
+            fd_out = os.open(f"/proc/self/fd/{fd_dst}", os.O_WRONLY)
+        except OSError:
+            method = METHOD_READ_WRITE
+        else:
+            os.lseek(fd_out, offset, os.SEEK_SET)
+    clock = time.perf_counter
+    try:
+        while offset < end and not (cancelled and cancelled()):
+            count = min(block_size, end - offset)
+            written = 0
+            if throttle is not None:
+                throttle.acquire(count, cancelled)
+            if method != METHOD_READ_WRITE:
+                try:
+                    began = clock()
+                    if method == METHOD_SENDFILE:
+                        written = os.sendfile(fd_out, fd_src, offset, count)
+                    else:
+                        written = os.copy_file_range(fd_src, fd_dst, count, offset, offset)
+                    spent = clock() - began
+                    if metrics is not None:
+                        metrics.add_io("copy", spent)
+                    if throttle is not None:
+                        throttle.observe(spent, written)
+                except OSError as e:
+                    if e.errno not in UNSUPPORTED_ERRNOS:
+                        raise
+                    method = METHOD_READ_WRITE
+            if method == METHOD_READ_WRITE:
+                began = clock()
+                data = os.pread(fd_src, count, offset)
+                if metrics is not None:
+                    metrics.add_io("read", clock() - began)
+                if hasher is not None:
+                    began = clock()
+                    hasher.update(data)
+                    if metrics is not None:
+                        metrics.add_io("hash", clock() - began)
+                began = clock()
+                written = os.pwrite(fd_dst, data, offset) if data else 0
+                if data:
+                    spent = clock() - began
+                    if metrics is not None:
+                        metrics.add_io("write", spent)
+                    if throttle is not None:
+                        throttle.observe(spent, written)
+            if written <= 0:
+                break
+            offset += written
+            if on_bytes:
+                on_bytes(written)
+    finally:
+        if fd_out is not None:
+            os.close(fd_out)
+    return offset - start
+
+
+def reopen_direct(fd: int, flags: int):
+    """Open the file behind fd again with O_DIRECT; None where that is refused."""
+    if not hasattr(os, "O_DIRECT"):
+        return None
+    try:
+        return os.open(f"/proc/self/fd/{fd}", flags | os.O_DIRECT)
+    except OSError:
+        return None
+
+
+def _copy_block(fd_in: int, fd_out: int, block: memoryview, offset: int, hasher,
+                metrics, throttle) -> int:
+    """Read one block into block and write it at the same offset; 0 at EOF."""
+    clock = time.perf_counter
+    began = clock()
+    count = os.preadv(fd_in, [block], offset)
+    if metrics is not None:
+        metrics.add_io("read", clock() - began)
+    if count <= 0:
+        return 0
+    data = block[:count]
+    began = clock()
+    written = 0
+    while written < count:
+        written += os.pwritev(fd_out, [data[written:]], offset + written)
+    spent = clock() - began
+    if metrics is not None:
+        metrics.add_io("write", spent)
+    if throttle is not None:
+        throttle.observe(spent, count)
+    # Hashed only once written: a refused O_DIRECT write is retried buffered
+    if hasher is not None:
+        hasher.update(data)
+    return count
+
+
+def copy_range_uncached(fd_src: int, fd_dst: int, offset: int, length: int,
+                        block_size: int = CHUNK_SIZE, on_bytes=None, cancelled=None,
+                        hasher=None, metrics=None, throttle=None) -> int:
+    """Copy one byte range around the page cache, for files far bigger than RAM.
+
+    The block-aligned middle of the range is read and written with
+    O_DIRECT through a page-aligned mmap buffer. The unaligned edges, and
+    the whole range where O_DIRECT is refused, go through the page cache
+    with rolling write-back (WriteBehind).
+    Arguments and result are those of copy_range().
+    """
+    end = offset + length
+    direct_start = min(end, -(-offset // DIRECT_ALIGN) * DIRECT_ALIGN)
+    direct_end = max(direct_start, end // DIRECT_ALIGN * DIRECT_ALIGN)
+    size = max(DIRECT_ALIGN, block_size // DIRECT_ALIGN * DIRECT_ALIGN)
+    fd_in = fd_out = None
+    if direct_end > direct_start:
+        fd_in = reopen_direct(fd_src, os.O_RDONLY)
+        fd_out = reopen_direct(fd_dst, os.O_WRONLY) if fd_in is not None else None
+    buffer = mmap.mmap(-1, size)
+    view = memoryview(buffer)
+    behind = WriteBehind(fd_src, fd_dst)
+    copied = 0
+    try:
+        for first, last, direct in ((offset, direct_start, False),
+                                    (direct_start, direct_end, fd_out is not None),
+                                    (direct_end, end, False)):
+            position = first
+            while position < last and not (cancelled and cancelled()):
+                count = min(size, last - position)
+                if throttle is not None:
+                    throttle.acquire(count, cancelled)
+                try:
+                    if direct:
+                        written = _copy_block(fd_in, fd_out, view[:count], position,
+                                              hasher, metrics, throttle)
+                    else:
+                        written = _copy_block(fd_src, fd_dst, view[:count], position,
+                                              hasher, metrics, throttle)
+                        behind.wrote(position, written)
+                except OSError as e:
+                    if not direct or e.errno != errno.EINVAL:
+                        raise
+                    # The filesystem opens with O_DIRECT but refuses the I/O
+                    direct = False
+                    continue
+                if written <= 0:
+                    break
+                position += written
+                copied += written
+                if on_bytes:
+                    on_bytes(written)
+            if position < last:
+                break
+        behind.close()
+    finally:
+        for fd in (fd_in, fd_out):
+            if fd is not None:
+                os.close(fd)
+        view.release()
+        buffer.close()
+    return copied
+
+
+_sync_file_range = None
+
+
+def sync_range(fd: int, offset: int, length: int, flags: int) -> bool:
+    """sync_file_range(2) on one byte range; False if unsupported."""
+    global _sync_file_range
+    if _sync_file_range is None:
+        try:
+            _sync_file_range = ctypes.CDLL(None, use_errno=True).sync_file_range
+            _sync_file_range.argtypes = [ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong,
+                                         ctypes.c_uint]
+        except (OSError, AttributeError):
+            _sync_file_range = False
+    if not _sync_file_range:
+        return False
+    return _sync_file_range(fd, offset, length, flags) == 0
+
+
+class WriteBehind:
+    """Rolling write-back of buffered writes, dropping their pages once on disk.
+
+    Every FLUSH_WINDOW bytes the window just written is queued for
+    write-back and the one before it is waited for and evicted, along
+    with the source pages it was read from. Dirty pages never pile up
+    for one long fsync and the copy does not push out the page cache.
+    """
+
+    def __init__(self, fd_src: int, fd_dst: int):
+        self.fd_src = fd_src
+        self.fd_dst = fd_dst
+        self._start = self._end = None
+        self._previous = None
+
+    def wrote(self, offset: int, count: int) -> None:
+        if offset != self._end:
+            self._flush_window()
+            self._start = offset
+        self._end = offset + count
+        if self._end - self._start >= FLUSH_WINDOW:
+            self._flush_window()
+
+    def close(self) -> None:
+        """Write back and evict everything still cached."""
+        self._flush_window()
+        if self._previous is not None:
+            self._settle(*self._previous)
+            self._previous = None
+
+    def _flush_window(self) -> None:
+        if self._start is None or self._end <= self._start:
+            return
+        start, length = self._start, self._end - self._start
+        sync_range(self.fd_dst, start, length, SYNC_FILE_RANGE_WRITE)
+        drop_cache(self.fd_src, start, length)
+        if self._previous is not None:
+            self._settle(*self._previous)
+        self._previous = (start, length)
+        self._start = self._end
+
+    def _settle(self, start: int, length: int) -> None:
+        sync_range(self.fd_dst, start, length, SYNC_FILE_RANGE_WAIT_BEFORE
+                   | SYNC_FILE_RANGE_WRITE | SYNC_FILE_RANGE_WAIT_AFTER)
+        drop_cache(self.fd_dst, start, length)
+
+
+def is_sparse(st) -> bool:
+    """Whether a file has fewer blocks allocated than its size needs."""
+    return st.st_blocks * 512 < st.st_size
+
+
+def data_extents(fd: int, size: int):
+    """Return the (offset, length) data extents of a file.
+
+    Holes are found with SEEK_DATA/SEEK_HOLE; returns None when the
+    platform or filesystem cannot tell them apart from data.
+    """
+    if not hasattr(os, "SEEK_DATA"):
+        return None
+    extents = []
+    offset = 0
+    try:
+        while offset < size:
+            try:
+                start = os.lseek(fd, offset, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno == errno.ENXIO:
+                    # Only a hole is left up to the end of the file
+                    break
+                raise
+            end = min(os.lseek(fd, start, os.SEEK_HOLE), size)
+            extents.append((start, end - start))
+            offset = end
+    except OSError as e:
+        if e.errno in UNSUPPORTED_ERRNOS:
+            return None
+        raise
+    return extents
+
+
+def split_extents(extents: list[tuple[int, int]], num_parts: int) -> list[tuple[int, int]]:
+    """Cut data extents into ranges of at most 1/num_parts of the data.
+
+    Parts then run in parallel over one huge extent as well as over many
+    small ones.
+    """
+    total = sum(length for _, length in extents)
+    part_size = max(PART_ALIGN, -(-total // max(1, num_parts) // PART_ALIGN) * PART_ALIGN)
+    ranges = []
+    for offset, length in extents:
+        end = offset + length
+        while offset < end:
+            ranges.append((offset, min(part_size, end - offset)))
+            offset += part_size
+    return ranges
+
+
+_fallocate = None
+
+
+def punch_hole(fd: int, offset: int, length: int) -> bool:
+    """Deallocate a byte range, keeping the file size; False if unsupported."""
+    global _fallocate
+    if _fallocate is None:
+        try:
+            _fallocate = ctypes.CDLL(None, use_errno=True).fallocate
+            _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+        except (OSError, AttributeError):
+            _fallocate = False
+    if not _fallocate:
+        return False
+    return _fallocate(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, offset, length) == 0
+
+
+def small_batches(files: list):
+    """Group (src, dst, src_stat, dst_stat) entries into batches for the small-file pool."""
+    batch, batch_bytes = [], 0
+    for item in files:
+        batch.append(item)
+        batch_bytes += item[2].st_size
+        if len(batch) >= SMALL_BATCH_FILES or batch_bytes >= SMALL_BATCH_BYTES:
+            yield batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield batch
+
+
+_syncfs = None
+
+
+def sync_filesystem(path: str) -> None:
+    """Flush the filesystem holding path with syncfs(2), or sync(2) without it."""
+    global _syncfs
+    if _syncfs is None:
+        try:
+            _syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+        except (OSError, AttributeError):
+            _syncfs = False
+    if not _syncfs:
+        os.sync()
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        os.sync()
+        return
+    try:
+        _syncfs(fd)
+    finally:
+        os.close(fd)
+
+
+def drop_cache(fd: int, offset: int = 0, length: int = 0) -> None:
+    """Evict clean pages (of one range) so the next read really comes from the device."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+
+def hash_fd(hasher, fd: int, offset: int, length: int, pause=None) -> None:
+    """Feed one byte range of an open file into hasher.
+
+    pause() is called before every block and returns once the caller
+    is not paused.
+    """
+    end = offset + length
+    while offset < end:
+        if pause:
+            pause()
+        data = os.pread(fd, min(CHUNK_SIZE, end - offset), offset)
+        if not data:
+            break
+        hasher.update(data)
+        offset += len(data)
+
+
+def hash_range(path: str, offset: int, length: int, pause=None) -> str:
+    """Return the hex SHA-256 digest of one byte range of a file."""
+    digest = hashlib.sha256()
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        drop_cache(fd)
+        hash_fd(digest, fd, offset, length, pause)
+        # Nor should checking a big copy leave it in the cache
+        drop_cache(fd, offset, length)
+    finally:
+        os.close(fd)
+    return digest.hexdigest()
+
+
+class CopyEngine:
+    """Copies files and directory trees with concurrent byte ranges per file."""
+
+    def __init__(self, options: EngineOptions, on_log=None, on_progress=None, journal=None,
+                 metrics=None, throttle=None):
+        self.options = options
+        # journal.Journal used to skip work done by an interrupted run
+        self.journal = journal
+        # metrics.MetricsRecorder fed with bytes, files, queue depth and I/O times
+        self.metrics = metrics
+        # throttle.Throttle shared with the other jobs, limiting bytes and operations
+        self.throttle = throttle
+        self.on_log = on_log or (lambda line: None)
+        self.on_progress = on_progress or (lambda event: None)
+        self._cancel = threading.Event()
+        # Cleared while paused; workers wait for it at their chunk boundaries
+        self._running = threading.Event()
+        self._running.set()
+        self._paused_at = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pool = None
+        self._verify_pool = None
+        self._index = None
+        # Entries written and directories listed, flushed to the index at the end
+        self._written = []
+        self._listed = set()
+        self._pending_verify = []
+        # Destination path -> list of PartHash, filled in when -c is set
+        self.manifest = {}
+        self._file_done = 0
+        self._file_total = 0
+        self._file_start = 0.0
+        self._job_done = 0
+        self._job_skipped = 0
+        self._job_total = 0
+        self._job_start = time.monotonic()
+        self._files_done = 0
+        self._files_total = 0
+        self._last_update = 0.0
+        # Copy method -> number of files it copied
+        self.methods_used = {}
+        # Move mode: (src, dst, src_stat) of copied files and the walked
+        # source directories, removed once the copies are checked
+        self._moved = []
+        self._moved_dirs = []
+
+    def cancel(self) -> None:
+        """Ask every worker to stop at its next chunk boundary."""
+        self._cancel.set()
+        # Paused workers have to wake up to notice
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def pause(self) -> None:
+        """Hold every worker at its next chunk boundary, its files still open."""
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = time.monotonic()
+                self._running.clear()
+
+    def resume(self) -> None:
+        """Let paused workers continue where they stopped."""
+        with self._lock:
+            if self._paused_at is None:
+                return
+            # Time spent paused does not count towards speed and ETA
+            paused = time.monotonic() - self._paused_at
+            self._job_start += paused
+            self._file_start += paused
+            self._paused_at = None
+            self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def _stopping(self) -> bool:
+        """Pause point of the worker loops: wait while paused, then report cancellation."""
+        self._running.wait()
+        return self._cancel.is_set()
+
+    def log(self, line: str) -> None:
+        self.on_log(line)
+
+    def set_plan(self, total_bytes: int, total_files: int) -> None:
+        """Report progress against whole-job totals, e.g. from a pre-flight scan."""
+        with self._lock:
+            self._job_total = total_bytes
+            self._files_total = total_files
+
+    def run(self, inputs: list[str], output: str) -> int:
+        """Copy every input into output and return the number of failures."""
+        if not inputs:
+            raise EngineError("ERR_COPY_NO_INPUT_FILE", "Input file wasn't specified")
+        if not output:
+            raise EngineError("ERR_COPY_NO_OUTPUT_PATH", "Output path wasn't specified")
+
+        file_count = sum(1 for path in inputs if os.path.isfile(path))
+        dir_count = sum(1 for path in inputs if os.path.isdir(path))
+        self._job_start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.options.num_parts),
+                                thread_name_prefix="cppp-part") as pool, \
+                ThreadPoolExecutor(max_workers=VERIFY_WORKERS,
+                                   thread_name_prefix="cppp-verify") as verify_pool:
+            self._pool = pool
+            self._verify_pool = verify_pool
+            # The index only speeds things up; copies run without it
+            self._index = open_index(output)
+            if self._index is None and self.options.sync:
+                self.log("⚠️  Destination index unavailable, every directory is scanned")
+            complete = False
+            try:
+                failures = self._copy_inputs(inputs, output, file_count, dir_count)
+                failures += self._collect_verifications()
+                if self.options.move and not self.cancelled:
+                    failures += self._remove_sources()
+                complete = not failures and not self.cancelled
+            finally:
+                self._pool = None
+                self._verify_pool = None
+                self._flush_index(complete)
+
+        if self.methods_used:
+            self.log("Copy methods: " + ", ".join(
+                f"{method} ({count} files)" for method, count in self.methods_used.items()))
+        if self.cancelled:
+            raise EngineError("ERR_COPY_CANCELLED", "copy was cancelled")
+        return failures
+
+    def _copy_inputs(self, inputs: list[str], output: str, file_count: int, dir_count: int) -> int:
+        failures = 0
+        for src in inputs:
+            if self.cancelled:
+                break
+            src = os.path.realpath(src)
+            if not os.path.exists(src):
+                raise EngineError("ERR_COPY_INPUT_FILE_OPEN", f"'{src}' cannot be opened")
+            try:
+                dst = self._known_destination(src)
+                if dst is None:
+                    dst = self._resolve_destination(src, output, file_count, dir_count)
+                    if dst is None:
+                        failures += 1
+                        continue
+                    if self.journal is not None:
+                        self.journal.record_destination(src, dst)
+                    if self.options.sync and self._index is not None:
+                        self._index.record_destination(src, dst)
+                if self.options.move and self._rename(src, dst):
+                    self.log(f"✅ '{src}' moved to '{os.path.realpath(output)}'")
+                    continue
+                if os.path.isdir(src):
+                    failures += self.copy_tree(src, dst)
+                else:
+                    self.copy_file(src, dst)
+                self.log(f"✅ '{src}' copied to '{os.path.realpath(output)}'")
+            except EngineError as e:
+                if e.code in ("ERR_COPY_SAME_FILE_INPUT", "ERR_COPY_CANCELLED"):
+                    raise
+                self.log(f"❌ {e}")
+                failures += 1
+        return failures
+
+    def _rename(self, src: str, dst: str) -> bool:
+        """Move a whole input with one rename(2); False if it has to be copied.
+
+        That is the case across filesystems (EXDEV) and when dst is a
+        directory that already has entries.
+        """
+        try:
+            os.rename(src, dst)
+        except OSError:
+            return False
+        self._record_written(dst)
+        return True
+
+    def _source_copied(self, src: str, dst: str, src_stat) -> None:
+        """Queue the source of a finished copy for removal in move mode."""
+        if self.options.move:
+            with self._lock:
+                self._moved.append((src, dst, src_stat))
+
+    def _resumed_copied(self, src: str, dst: str, src_stat, resume) -> None:
+        """Move mode: check a file an interrupted run finished before deleting its source.
+
+        The destination is compared with the digests journaled for it; a
+        file journaled without them keeps its source.
+        """
+        if not self.options.move:
+            return
+        parts = [PartHash(offset, length, digest)
+                 for offset, (length, _, digest) in sorted(resume.parts.items())]
+        if parts and all(part.digest for part in parts):
+            self._schedule_verify(src, dst, src_stat, parts)
+        else:
+            self.log(f"⚠️  '{src}' has no recorded checksum, not removed")
+
+    def _remove_sources(self) -> int:
+        """Delete moved sources in batches, then the directories they leave empty.
+
+        Returns the number of sources that had to be kept.
+        """
+        with self._lock:
+            moved, self._moved = self._moved, []
+        batches = [moved[i:i + REMOVE_BATCH] for i in range(0, len(moved), REMOVE_BATCH)]
+        failures = sum(self._pool.map(self._remove_batch, batches))
+        # Deepest first, so parents are empty by the time they are reached
+        for directory in sorted(self._moved_dirs, key=len, reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+        self._moved_dirs = []
+        return failures
+
+    def _remove_batch(self, batch: list) -> int:
+        """Unlink sources whose copy has their size and that did not change since."""
+        failures = 0
+        for src, dst, src_stat in batch:
+            try:
+                current = os.stat(src)
+                copied = os.stat(dst)
+            except OSError as e:
+                self.log(f"⚠️  '{src}' was not removed ({e.strerror})")
+                failures += 1
+                continue
+            if copied.st_size != src_stat.st_size or not same_metadata(src_stat, current):
+                self.log(f"⚠️  '{src}' changed while it was moved, not removed")
+                failures += 1
+                continue
+            try:
+                os.unlink(src)
+            except OSError as e:
+                self.log(f"⚠️  '{src}' couldn't be removed ({e.strerror})")
+                failures += 1
+        return failures
+
+    def _known_destination(self, src: str):
+        """Destination used for src by an interrupted run or the last sync.
+
+        Once the output directory exists init_process() would pick a
+        nested destination, so repeated runs have to reuse the first one.
+        """
+        dst = self.journal.destination(src) if self.journal is not None else None
+        if dst is None and self.options.sync and self._index is not None:
+            dst = self._index.destination(src)
+        if dst is not None and os.path.isdir(src):
+            os.makedirs(dst, exist_ok=True)
+        return dst
+
+    def _record_written(self, path: str, digests=None) -> None:
+        """Remember a destination entry for the index once the job ends."""
+        try:
+            entry = (path, os.stat(path), digests)
+        except OSError:
+            return
+        with self._lock:
+            self._written.append(entry)
+
+    def _flush_index(self, complete: bool) -> None:
+        """Store what this run wrote.
+
+        Only a complete run keeps the listed directories fresh: after a
+        failure or a cancel they may have changed in ways the run did not
+        record, so the next run rescans them.
+        """
+        if self._index is None:
+            return
+        try:
+            self._index.put_many(self._written)
+            if complete:
+                self._index.touch_dirs(self._listed)
+        except INDEX_ERRORS as e:
+            self.log(f"⚠️  Destination index not updated ({e})")
+        finally:
+            self._index.close()
+        self._index = None
+        self._written = []
+        self._listed = set()
+
+    def _resolve_destination(self, src: str, output: str, file_count: int, dir_count: int):
+        """Pick and create the destination path like init_process() does."""
+        output = os.path.realpath(output)
+        dst = destination_for(src, output, file_count, dir_count)
+        if os.path.isdir(src):
+            os.makedirs(dst, exist_ok=True)
+            return dst
+
+        if src == output:
+            raise EngineError("ERR_COPY_SAME_FILE_INPUT",
+                              f"'{src}' and '{output}' are the same file")
+        if dst != output:
+            os.makedirs(output, exist_ok=True)
+            return dst
+        if self.options.overwrite or self.options.sync:
+            return output
+        self.log("❌ ERR_COPY_FILE_NOT_ALLOWED: no overwrite permission")
+        self.log(f"   src: {src}")
+        self.log(f"   dst: {output}")
+        return None
+
+    def copy_tree(self, src: str, dst: str) -> int:
+        """Copy a directory tree, returning the number of failed files.
+
+        Directories are created while walking; files are collected and
+        copied afterwards, sorted by size: small ones in batches on a
+        separate worker pool, large ones with parallel ranges.
+        """
+        small, large = [], []
+        failures = self._walk_tree(src, dst, small, large)
+        return failures + self._copy_collected(small, large)
+
+    def _walk_tree(self, src: str, dst: str, small: list, large: list) -> int:
+        src_stat = os.stat(src)
+        if self.options.move:
+            self._moved_dirs.append(src)
+        created = not os.path.isdir(dst)
+        try:
+            os.makedirs(dst, mode=stat.S_IMODE(src_stat.st_mode), exist_ok=True)
+        except OSError as e:
+            raise EngineError("ERR_COPY_DIR_MKDIR_FAIL", f"{dst}: {e.strerror}") from e
+        if created:
+            self._record_written(dst)
+        # One stat of dst instead of one per entry while its listing is current
+        dst_entries = self._index.listing(dst) if self._index is not None else {}
+        self._listed.add(dst)
+
+        failures = 0
+        try:
+            entries = list(os.scandir(src))
+        except OSError as e:
+            raise EngineError("ERR_COPY_DIR_OPEN", f"{src}: {e.strerror}") from e
+
+        for entry in entries:
+            if self.cancelled:
+                break
+            src_path = entry.path
+            dst_path = os.path.join(dst, entry.name)
+            try:
+                entry_stat = entry.stat(follow_symlinks=True)
+            except OSError:
+                self.log(f"⚠️  Skipping unreadable file: {src_path}")
+                continue
+
+            dst_stat = dst_entries.get(entry.name)
+            if dst_stat is not None and \
+                    (dst_stat.st_ino, dst_stat.st_dev) == (entry_stat.st_ino, entry_stat.st_dev):
+                continue
+
+            if stat.S_ISDIR(entry_stat.st_mode):
+                try:
+                    failures += self._walk_tree(src_path, dst_path, small, large)
+                except EngineError as e:
+                    self.log(f"❌ ERR_COPY_DIR_RECURSIVE_FAIL: error in {src_path}: {e}")
+                    failures += 1
+            elif stat.S_ISREG(entry_stat.st_mode):
+                if entry_stat.st_size < self.options.small_file_threshold:
+                    small.append((src_path, dst_path, entry_stat, dst_stat))
+                else:
+                    large.append((src_path, dst_path, entry_stat, dst_stat))
+            else:
+                self.log(f"⚠️  Skipped: '{src_path}' is not supported type")
+        return failures
+
+    def _copy_collected(self, small: list, large: list) -> int:
+        """Copy small files in batches while large files use ranged parts."""
+        small.sort(key=lambda item: item[2].st_size)
+        large.sort(key=lambda item: item[2].st_size, reverse=True)
+        failures = 0
+
+        with ThreadPoolExecutor(max_workers=SMALL_FILE_WORKERS,
+                                thread_name_prefix="cppp-small") as pool:
+            futures = [pool.submit(self._copy_batch, batch) for batch in small_batches(small)]
+            self._queued(len(futures))
+            for src_path, dst_path, _, _ in large:
+                if self.cancelled:
+                    break
+                try:
+                    self.copy_file(src_path, dst_path)
+                except EngineError as e:
+                    if e.code == "ERR_COPY_CANCELLED":
+                        break
+                    self.log(f"⚠️  Failed to copy file: {src_path} ({e})")
+                    failures += 1
+                failures += self._collect_verifications(wait_all=False)
+            failures += sum(future.result() for future in futures)
+
+        if self.cancelled:
+            raise EngineError("ERR_COPY_CANCELLED", "copy was cancelled")
+        return failures
+
+    def _copy_batch(self, batch: list) -> int:
+        """Copy a batch of small files with one reused buffer and one sync."""
+        self._queued(-1)
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = memoryview(bytearray(self.options.small_file_threshold or CHUNK_SIZE))
+        failures = 0
+        copied = []
+        for src_path, dst_path, src_stat, dst_stat in batch:
+            if self._stopping():
+                break
+            resume = self._resume_state(src_path, dst_path, src_stat)
+            if resume is not None and resume.done:
+                self._skip_file(src_path, src_stat)
+                self._resumed_copied(src_path, dst_path, src_stat, resume)
+                continue
+            if self.options.sync and self._in_sync(src_path, dst_path, src_stat, dst_stat):
+                self._skip_file(src_path, src_stat, "unchanged")
+                continue
+            try:
+                parts = self._copy_small(src_path, dst_path, src_stat, buffer)
+            except OSError as e:
+                self.log(f"⚠️  Failed to copy file: {src_path} ({e.strerror})")
+                failures += 1
+                continue
+            copied.append((src_path, dst_path, src_stat, parts))
+
+        if copied:
+            sync_filesystem(os.path.dirname(copied[-1][1]))
+        if self.options.check_sha256:
+            for src_path, dst_path, src_stat, parts in copied:
+                self._schedule_verify(src_path, dst_path, src_stat, parts)
+            failures += self._collect_verifications(wait_all=False)
+        else:
+            for src_path, dst_path, src_stat, _ in copied:
+                self._source_copied(src_path, dst_path, src_stat)
+            if self.journal is not None:
+                self.journal.record_files([(src_path, src_stat, None)
+                                           for src_path, _, src_stat, _ in copied])
+        return failures
+
+    def _copy_small(self, src: str, dst: str, src_stat, buffer: memoryview):
+        """Copy one small file; returns its single PartHash when hashing."""
+        hasher = hashlib.sha256() if self.options.check_sha256 else None
+        fd_src = os.open(src, os.O_RDONLY)
+        try:
+            fd_dst = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                             stat.S_IMODE(src_stat.st_mode))
+            try:
+                method = self._copy_method(fd_src, fd_dst, src_stat)
+                if self.options.verbose:
+                    self.log(f"'{src}' -> '{dst}' [{method}]")
+                if method == METHOD_REFLINK:
+                    size = src_stat.st_size
+                    self._advance(size)
+                elif method != METHOD_READ_WRITE:
+                    size = copy_range(fd_src, fd_dst, 0, src_stat.st_size, self.options.block_size,
+                                      on_bytes=self._advance, hasher=hasher, metrics=self.metrics,
+                                      method=method, throttle=self.throttle)
+                else:
+                    size = self._read_write_small(fd_src, fd_dst, buffer, hasher)
+            finally:
+                os.close(fd_dst)
+        finally:
+            os.close(fd_src)
+        if self.options.sync:
+            os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        self._record_written(dst)
+        self._finish_file()
+        return [PartHash(0, size, hasher.hexdigest())] if hasher is not None else None
+
+    def _read_write_small(self, fd_src: int, fd_dst: int, buffer: memoryview, hasher) -> int:
+        """Copy a small file through the reused buffer; returns its size."""
+        metrics = self.metrics
+        clock = time.perf_counter
+        size = 0
+        while True:
+            began = clock()
+            count = os.readv(fd_src, [buffer])
+            if metrics is not None:
+                metrics.add_io("read", clock() - began)
+            if not count:
+                return size
+            if hasher is not None:
+                hasher.update(buffer[:count])
+            if self.throttle is not None:
+                self.throttle.acquire(count, self._cancel.is_set)
+            written = 0
+            began = clock()
+            while written < count:
+                written += os.write(fd_dst, buffer[written:count])
+            spent = clock() - began
+            if metrics is not None:
+                metrics.add_io("write", spent)
+            if self.throttle is not None:
+                self.throttle.observe(spent, count)
+            size += count
+            self._advance(count)
+
+    def copy_file(self, src: str, dst: str) -> None:
+        """Copy a single regular file, its parts running in parallel."""
+        try:
+            fd_src = os.open(src, os.O_RDONLY)
+        except OSError as e:
+            raise EngineError("ERR_COPY_FILE_OPEN", f"'{src}' couldn't be opened") from e
+
+        try:
+            src_stat = os.fstat(fd_src)
+            if self.options.sync and self._sync_file(fd_src, src, dst, src_stat):
+                return
+            resume = self._resume_state(src, dst, src_stat)
+            if resume is not None and resume.done:
+                self._skip_file(src, src_stat)
+                self._resumed_copied(src, dst, src_stat, resume)
+                return
+            flags = os.O_WRONLY | os.O_CREAT | (0 if resume else os.O_TRUNC)
+            try:
+                fd_dst = os.open(dst, flags, stat.S_IMODE(src_stat.st_mode))
+            except OSError as e:
+                raise EngineError("ERR_COPY_FILE_CREATE", f"'{dst}' couldn't be created") from e
+
+            try:
+                method = self._copy_method(fd_src, fd_dst, src_stat, probe=resume is None)
+                if self.options.verbose:
+                    self.log(f"'{src}' -> '{dst}' [{method}]" + (" (resumed)" if resume else ""))
+                file_size = src_stat.st_size
+                if method != METHOD_REFLINK:
+                    self._size_destination(fd_dst, dst, src_stat)
+                if resume:
+                    ranges = sorted((offset, part[0]) for offset, part in resume.parts.items())
+                    done = [resume.parts[offset][1] for offset, _ in ranges]
+                else:
+                    ranges = self._file_ranges(fd_src, src_stat, method)
+                    done = [0] * len(ranges)
+                    if self.journal is not None:
+                        self.journal.start_file(src, src_stat, ranges)
+                data_size = sum(length for _, length in ranges)
+                if data_size < file_size:
+                    self._skip_holes(src, file_size - data_size)
+                self._start_file(data_size)
+                hashers = [hashlib.sha256() if self.options.check_sha256 else None for _ in ranges]
+                if method == METHOD_REFLINK:
+                    self._advance(file_size)
+                else:
+                    self._copy_ranges(fd_src, fd_dst, ranges, hashers, done, src, src_stat, method)
+                os.fsync(fd_dst)
+            except BaseException:
+                self._abandon(fd_dst)
+                raise
+            finally:
+                os.close(fd_dst)
+        finally:
+            os.close(fd_src)
+
+        if self.options.sync:
+            os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        self._record_written(dst)
+        self._finish_file()
+        if self.options.check_sha256:
+            parts = [PartHash(offset, length, hasher.hexdigest())
+                     for (offset, length), hasher in zip(ranges, hashers)]
+            self._schedule_verify(src, dst, src_stat, parts)
+        else:
+            self._source_copied(src, dst, src_stat)
+            if self.journal is not None:
+                self.journal.record_files([(src, src_stat, None)])
+
+    def _size_destination(self, fd_dst: int, dst: str, src_stat) -> None:
+        """Give a destination its final size before the parts are written.
+
+        Sparse sources only get the size, so everything outside the copied
+        ranges stays a hole; other files are preallocated in full.
+        """
+        if is_sparse(src_stat):
+            os.ftruncate(fd_dst, src_stat.st_size)
+            return
+        try:
+            preallocate(fd_dst, src_stat.st_size)
+        except OSError as e:
+            raise EngineError("ERR_COPY_FILE_CREATE",
+                              f"'{dst}' couldn't be allocated ({e.strerror})") from e
+
+    def _abandon(self, fd_dst: int) -> None:
+        """Cut a failed destination back to nothing, releasing its preallocated blocks.
+
+        With a journal the written parts are kept for the resumed run instead.
+        """
+        if self.journal is not None:
+            return
+        try:
+            os.ftruncate(fd_dst, 0)
+        except OSError:
+            pass
+
+    def _file_ranges(self, fd_src: int, src_stat, method: str) -> list[tuple[int, int]]:
+        """Ranges of a file to copy: only its data extents when it has holes.
+
+        A reflink shares the holes along with the data, so it keeps the
+        plain split.
+        """
+        file_size = src_stat.st_size
+        if method != METHOD_REFLINK and is_sparse(src_stat):
+            extents = data_extents(fd_src, file_size)
+            if extents is not None:
+                return split_extents(extents, self.options.num_parts)
+        return [r for r in aligned_ranges(file_size, self.options.num_parts) if r[1] > 0]
+
+    def _skip_holes(self, src: str, hole_bytes: int) -> None:
+        """Take the holes of a sparse file out of the job's byte total."""
+        with self._lock:
+            if self._job_total:
+                self._job_total = max(self._job_done, self._job_total - hole_bytes)
+        if self.options.verbose:
+            self.log(f"'{src}' is sparse, {hole_bytes} bytes of holes are not copied")
+
+    def _copy_method(self, fd_src: int, fd_dst: int, src_stat, probe: bool = True) -> str:
+        """Pick the copy method of a file pair and count it for the run summary.
+
+        Only the first file of a filesystem pair walks the whole chain; later
+        ones reuse its result. A reflink copies whole files, so it is tried
+        again for every file and the pair falls back down the chain once it
+        fails. Without probe (resumed files) nothing is written here.
+        With direct_io a reflink is still tried, as it moves no data at all.
+        """
+        if self.options.direct_io and src_stat.st_size:
+            method = METHOD_DIRECT
+            known = copy_methods.get((src_stat.st_dev, os.fstat(fd_dst).st_dev))
+            if (probe and not self.options.check_sha256 and known in (None, METHOD_REFLINK)
+                    and reflink(fd_src, fd_dst)):
+                method = METHOD_REFLINK
+        elif self.options.check_sha256 or not src_stat.st_size:
+            method = METHOD_READ_WRITE
+        else:
+            key = (src_stat.st_dev, os.fstat(fd_dst).st_dev)
+            known = copy_methods.get(key)
+            if not probe:
+                method = known if known not in (None, METHOD_REFLINK) else METHOD_COPY_FILE_RANGE
+            elif known is not None and known != METHOD_REFLINK:
+                method = known
+            else:
+                began = time.perf_counter()
+                method = select_method(fd_src, fd_dst, src_stat.st_size,
+                                       known or COPY_METHODS[0], self.options.block_size)
+                if method == METHOD_REFLINK and self.metrics is not None:
+                    self.metrics.add_io("copy", time.perf_counter() - began)
+                if method != known:
+                    copy_methods.put(key, method)
+        with self._lock:
+            self.methods_used[method] = self.methods_used.get(method, 0) + 1
+        return method
+
+    def _resume_state(self, src: str, dst: str, src_stat):
+        """Return the journal's FileState for src if its work can be reused.
+
+        A finished file whose part digests are missing while -c is on is
+        turned into fully copied parts, so only the verification runs again.
+        """
+        if self.journal is None:
+            return None
+        state = self.journal.file_state(src, src_stat)
+        if state is None:
+            return None
+        try:
+            dst_size = os.stat(dst).st_size
+        except OSError:
+            return None
+        if state.done:
+            if dst_size != src_stat.st_size:
+                return None
+            if not self.options.check_sha256 or (
+                    state.parts and all(part[2] for part in state.parts.values())):
+                return state
+            if not state.parts:
+                state.parts = {0: [src_stat.st_size, src_stat.st_size, None]}
+            state.done = False
+        return state if state.parts else None
+
+    def _skip_file(self, src: str, src_stat, reason: str = "was already copied") -> None:
+        with self._lock:
+            self._job_done += src_stat.st_size
+            self._job_skipped += src_stat.st_size
+        self._finish_file()
+        if self.options.verbose:
+            self.log(f"↷ '{src}' {reason}, skipped")
+
+    def _in_sync(self, src: str, dst: str, src_stat, dst_stat=None) -> bool:
+        """Sync mode: whether a small destination can be left as it is.
+
+        dst_stat may come from the destination index instead of a stat call.
+        """
+        if dst_stat is None:
+            try:
+                dst_stat = os.stat(dst)
+            except OSError:
+                return False
+        if not same_metadata(src_stat, dst_stat):
+            return False
+        if not self.options.check_sha256:
+            return True
+        return hash_range(src, 0, src_stat.st_size) == hash_range(dst, 0, dst_stat.st_size)
+
+    def _sync_file(self, fd_src: int, src: str, dst: str, src_stat) -> bool:
+        """Bring an existing large destination up to date block by block.
+
+        Returns False when the file has to be copied in full instead.
+        Without -c, destination block digests come from the index when it
+        is current, so an unchanged destination is not read at all.
+        """
+        try:
+            dst_stat = os.stat(dst)
+        except OSError:
+            return False
+        if not stat.S_ISREG(dst_stat.st_mode):
+            return False
+        if not self.options.check_sha256 and same_metadata(src_stat, dst_stat):
+            self._skip_file(src, src_stat, "unchanged")
+            return True
+        if src_stat.st_size < SYNC_DELTA_MIN or dst_stat.st_size == 0:
+            # Too small for block deltas; with -c an unchanged file is found
+            # by comparing whole-file hashes, as for small files
+            if self.options.check_sha256 and self._in_sync(src, dst, src_stat, dst_stat):
+                self._skip_file(src, src_stat, "unchanged")
+                return True
+            return False
+
+        known = None
+        if not self.options.check_sha256 and self._index is not None:
+            known = self._index.block_digests(dst, dst_stat)
+        try:
+            fd_dst = os.open(dst, os.O_RDWR)
+        except OSError as e:
+            raise EngineError("ERR_COPY_FILE_CREATE", f"'{dst}' couldn't be opened") from e
+        blocks = -(-src_stat.st_size // SYNC_BLOCK_SIZE)
+        digests = [None] * blocks
+        try:
+            if src_stat.st_size > dst_stat.st_size:
+                # Blocks past the old end are appended by several workers at once
+                self._size_destination(fd_dst, dst, src_stat)
+            self._start_file(src_stat.st_size)
+            futures = [self._pool.submit(self._sync_blocks, fd_src, fd_dst, first, count,
+                                         dst_stat.st_size, known, digests)
+                       for first, count in split_ranges(blocks, self.options.num_parts) if count > 0]
+            self._wait_parts(futures, src)
+            changed = sum(future.result() for future in futures)
+            os.ftruncate(fd_dst, src_stat.st_size)
+            os.fsync(fd_dst)
+        finally:
+            os.close(fd_dst)
+
+        os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        self._finish_file()
+        self._record_written(dst, digests)
+        if self.options.verbose:
+            self.log(f"'{src}' -> '{dst}' ({changed}/{blocks} blocks rewritten)")
+        return True
+
+    def _sync_blocks(self, fd_src: int, fd_dst: int, first: int, count: int,
+                     dst_size: int, known, digests: list) -> int:
+        """Rewrite the differing blocks of one block range; returns how many."""
+        changed = 0
+        for index in range(first, first + count):
+            if self._stopping():
+                break
+            offset = index * SYNC_BLOCK_SIZE
+            data = os.pread(fd_src, SYNC_BLOCK_SIZE, offset)
+            digest = hashlib.sha256(data).digest()
+            digests[index] = digest
+            if known is not None and index < len(known):
+                old = known[index]
+            elif offset < dst_size:
+                old = hashlib.sha256(os.pread(fd_dst, SYNC_BLOCK_SIZE, offset)).digest()
+            else:
+                old = None
+            if digest != old:
+                if self.throttle is not None:
+                    self.throttle.acquire(len(data), self._cancel.is_set)
+                # A block that became zeros turns into a hole instead of being written
+                if digest != ZERO_BLOCK_DIGEST or not punch_hole(fd_dst, offset, len(data)):
+                    written = 0
+                    while written < len(data):
+                        written += os.pwrite(fd_dst, data[written:], offset + written)
+                changed += 1
+            self._advance(len(data))
+        return changed
+
+    def _copy_ranges(self, fd_src: int, fd_dst: int, ranges, hashers, done, src: str, src_stat,
+                     method: str = None) -> None:
+        futures = [self._pool.submit(self._copy_range, fd_src, fd_dst, offset, length,
+                                     hasher, copied, src, src_stat, method)
+                   for (offset, length), hasher, copied in zip(ranges, hashers, done)]
+        self._queued(len(futures))
+        self._wait_parts(futures, src)
+
+    def _wait_parts(self, futures, src: str) -> None:
+        # Wait for every part, even after a failure: the descriptors are
+        # closed by the caller and must not be in use by a late worker.
+        wait(futures)
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                if isinstance(error, EngineError):
+                    raise error
+                raise EngineError("ERR_COPY_FILE_PART_COPY",
+                                  f"'{src}': an error encountered while copying ({error})") from error
+        if self.cancelled:
+            raise EngineError("ERR_COPY_CANCELLED", f"'{src}' copy was cancelled")
+
+    def _copy_range(self, fd_src: int, fd_dst: int, offset: int, length: int, hasher,
+                    done: int, src: str, src_stat, method: str = None) -> None:
+        """Copy one part; with a journal, checkpoint it every CHECKPOINT_BYTES."""
+        self._queued(-1)
+        if done:
+            # The hash state is not journaled, so rebuild it from the source
+            if hasher is not None:
+                hash_fd(hasher, fd_src, offset, done, self._running.wait)
+            with self._lock:
+                self._file_done += done
+                self._job_done += done
+                self._job_skipped += done
+        if self.journal is None:
+            copy_range(fd_src, fd_dst, offset, length, self.options.block_size,
+                       on_bytes=self._advance, cancelled=self._stopping, hasher=hasher,
+                       metrics=self.metrics, method=method, throttle=self.throttle)
+            return
+
+        position, end = offset + done, offset + length
+        while position < end and not self._stopping():
+            count = copy_range(fd_src, fd_dst, position, min(CHECKPOINT_BYTES, end - position),
+                               self.options.block_size, on_bytes=self._advance,
+                               cancelled=self._stopping, hasher=hasher,
+                               metrics=self.metrics, method=method, throttle=self.throttle)
+            if count <= 0:
+                break
+            position += count
+            os.fdatasync(fd_dst)
+            self.journal.record_part(src, src_stat, offset, length, position - offset)
+
+    def _start_file(self, total: int) -> None:
+        with self._lock:
+            self._file_done = 0
+            self._file_total = total
+            self._file_start = time.monotonic()
+            event = self._snapshot(self._file_start)
+        self.on_progress(event)
+
+    def _finish_file(self) -> None:
+        with self._lock:
+            self._files_done += 1
+        if self.metrics is not None:
+            self.metrics.add_file()
+
+    def _queued(self, count: int) -> None:
+        if self.metrics is not None:
+            self.metrics.add_queued(count)
+
+    def _advance(self, count: int) -> None:
+        if self.metrics is not None:
+            self.metrics.add_bytes(count, threading.current_thread().name)
+        with self._lock:
+            self._file_done += count
+            self._job_done += count
+            now = time.monotonic()
+            if now - self._last_update < UPDATE_INTERVAL and self._file_done < self._file_total:
+                return
+            self._last_update = now
+            event = self._snapshot(now)
+        self.on_progress(event)
+
+    def _snapshot(self, now: float) -> ProgressEvent:
+        """Build a progress event; whole-job once set_plan() was called."""
+        skipped = 0
+        if self._job_total:
+            done, total, elapsed = self._job_done, self._job_total, now - self._job_start
+            # Work reused from the journal does not count towards the speed
+            skipped = self._job_skipped
+        else:
+            done, total, elapsed = self._file_done, self._file_total, now - self._file_start
+        # Same arithmetic as copy_full()/copy_part() in copy.c
+        speed_mbps = ((done - skipped) / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0
+        eta = int((total - done) / (speed_mbps * 1024 * 1024)) if speed_mbps >= 0.01 else 0
+        percent = min(100.0, done * 100 / total) if total else 100.0
+        return ProgressEvent(percent=percent, speed_mbps=speed_mbps, eta=max(0, eta),
+                             elapsed=elapsed, files_done=self._files_done,
+                             files_total=self._files_total)
+
+    def _schedule_verify(self, src: str, dst: str, src_stat, parts: list[PartHash]) -> None:
+        """Queue destination re-reads, one per part, behind the copy."""
+        with self._lock:
+            self.manifest[dst] = parts
+        futures = [self._verify_pool.submit(hash_range, dst, part.offset, part.length,
+                                            self._running.wait)
+                   for part in parts]
+        with self._lock:
+            self._pending_verify.append((src, dst, src_stat, parts, futures))
+
+    def _collect_verifications(self, wait_all: bool = True) -> int:
+        """Check the queued re-reads and return the number of mismatches.
+
+        Without wait_all only files whose re-reads already finished are
+        checked, so the journal learns about verified files during the run.
+        """
+        with self._lock:
+            if wait_all:
+                ready, self._pending_verify = self._pending_verify, []
+            else:
+                ready, pending = [], []
+                for entry in self._pending_verify:
+                    (ready if all(f.done() for f in entry[4]) else pending).append(entry)
+                self._pending_verify = pending
+        failures = 0
+        verified = []
+        for src, dst, src_stat, parts, futures in ready:
+            try:
+                digests = [future.result() for future in futures]
+            except OSError as e:
+                self.log(f"❌ ERR_COPY_DST_HASH_FAIL: '{dst}' couldn't be read ({e.strerror})")
+                failures += 1
+                continue
+            self.log(f"{manifest_digest(parts)} {src}")
+            bad = [part for part, digest in zip(parts, digests) if digest != part.digest]
+            if bad:
+                self.log(f"❌ ERR_COPY_DST_HASH_FAIL: SHA256 Hash mismatch detected! ({dst}, "
+                         f"{len(bad)}/{len(parts)} parts)")
+                failures += 1
+            else:
+                self.log("✅ SHA256 Hash values are matched!")
+                verified.append((src, src_stat, parts))
+                self._source_copied(src, dst, src_stat)
+        if self.journal is not None:
+            self.journal.record_files(verified)
+        return failures
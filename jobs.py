@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+cppp jobs - Transfer jobs, their runners and the concurrent job scheduler
+A job is one cppp invocation (or one Python engine run). The scheduler
+runs several of them at once while limiting how many touch the same disk.
+"""
+
+import asyncio
+import os
+import signal
+from collections import deque
+from dataclasses import dataclass, field
+
+from binary import inspect, locate
+from engine import CHUNK_SIZE, CopyEngine, EngineOptions
+from parts import MODES as PARTS_MODES, PartsEngine, PartsOptions
+from paths import device_of
+from preflight import scan
+from tuning import describe, tune
+from progress import StreamParser, ProgressDecoder, ProgressEvent
+
+# Job states, shown as-is in the queue table
+PENDING = "Bekliyor"
+RUNNING = "Çalışıyor"
+PAUSED = "Duraklatıldı"
+DONE = "Tamamlandı"
+FAILED = "Başarısız"
+CANCELLED = "İptal"
+
+# Output lines kept per job for the queue detail view
+JOB_LOG_LINES = 200
+
+
+@dataclass
+class JobSpec:
+    """Everything needed to run one transfer, as read from the TUI form."""
+
+    inputs: list[str]
+    output: str
+    mode: str = "copy"
+    parts: int = 1
+    verbose: bool = False
+    force: bool = False
+    checksum: bool = False
+    direct_io: bool = False
+    backend: str = "cppp"
+    auto_tune: bool = False
+    block_size: int = CHUNK_SIZE
+    # 1-based part numbers for select-merge
+    selected: list[int] = field(default_factory=list)
+
+    @property
+    def parts_mode(self) -> bool:
+        """Split, merge and select-merge run on parts.PartsEngine."""
+        return self.mode in PARTS_MODES
+
+    def engine_options(self) -> EngineOptions:
+        return EngineOptions(
+            num_parts=self.parts,
+            verbose=self.verbose,
+            check_sha256=self.checksum,
+            overwrite=self.force,
+            block_size=self.block_size,
+            sync=self.mode == "sync",
+            move=self.mode == "move",
+            direct_io=self.direct_io,
+        )
+
+    def parts_options(self) -> PartsOptions:
+        return PartsOptions(
+            mode=self.mode,
+            num_parts=self.parts,
+            selected=self.selected,
+            overwrite=self.force,
+            verbose=self.verbose,
+            block_size=self.block_size,
+        )
+
+    def make_engine(self, on_log=None, on_progress=None, journal=None, metrics=None,
+                    throttle=None):
+        """Return the in-process engine that runs this job."""
+        if self.parts_mode:
+            return PartsEngine(self.parts_options(), on_log=on_log, on_progress=on_progress,
+                               metrics=metrics, throttle=throttle)
+        return CopyEngine(self.engine_options(), on_log=on_log, on_progress=on_progress,
+                          journal=journal, metrics=metrics, throttle=throttle)
+
+    def apply_tuning(self, result) -> None:
+        """Use the part count and block size chosen by tuning.tune()."""
+        self.parts = result.parts
+        self.block_size = result.block_size
+
+
+def find_binary():
+    """Return the cppp binary to use, or None if there is none."""
+    return locate()
+
+
+def build_command(cppp_bin: str, spec: JobSpec) -> list[str]:
+    """Build the cppp command line for a job."""
+    cmd = [cppp_bin]
+    if spec.mode and spec.mode != "copy":
+        cmd.extend(["-m", spec.mode])
+    cmd.append("-i")
+    # -i takes arguments up to the next one starting with '-'
+    cmd.extend(os.path.join(".", path) if path.startswith("-") else path for path in spec.inputs)
+    cmd.extend(["-o", spec.output])
+    cmd.extend(["-p", str(spec.parts)])
+    if spec.verbose:
+        cmd.append("-v")
+    if spec.force:
+        cmd.append("-f")
+    if spec.checksum:
+        cmd.append("-c")
+    return cmd
+
+
+async def binary_supports(cppp_bin: str, option: str) -> bool:
+    """Check whether the cppp binary lists an option in its help text."""
+    info = await asyncio.to_thread(inspect, cppp_bin)
+    return info is not None and info.supports(option)
+
+
+async def run_binary(cmd: list[str], on_line, on_progress, on_start=None, on_file_done=None,
+                     on_event=None) -> int:
+    """Run the external cppp binary, reporting output lines and progress.
+
+    on_start receives the asyncio process as soon as it exists so the
+    caller can stop it. on_file_done(src, dst) is called for every file
+    the binary finished successfully and on_event with every decoded
+    event (both only with --progress-fd support).
+    """
+    # Prefer the structured --progress-fd channel over screen scraping
+    use_events = await binary_supports(cmd[0], "--progress-fd")
+    read_fd = write_fd = None
+    pass_fds = ()
+    if use_events:
+        read_fd, write_fd = os.pipe()
+        cmd = cmd + ["--progress-fd", str(write_fd)]
+        pass_fds = (write_fd,)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            pass_fds=pass_fds
+        )
+    except BaseException:
+        if use_events:
+            os.close(read_fd)
+        raise
+    finally:
+        if use_events:
+            os.close(write_fd)
+
+    if on_start:
+        on_start(process)
+
+    # Read raw chunks: print_progress() redraws with '\r' and only
+    # ends the line when a part is finished.
+    async def read_stream(stream, prefix=""):
+        parser = StreamParser()
+        while True:
+            chunk = await stream.read(65536)
+            items = parser.feed(chunk) if chunk else parser.close()
+            for item in items:
+                if isinstance(item, ProgressEvent):
+                    if not use_events:
+                        on_progress(item)
+                else:
+                    on_line(prefix + item)
+            if not chunk:
+                break
+
+    async def read_events():
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader),
+            os.fdopen(read_fd, "rb", buffering=0)
+        )
+        decoder = ProgressDecoder()
+        current = None
+        try:
+            while chunk := await reader.read(65536):
+                for event in decoder.feed(chunk):
+                    if on_event:
+                        on_event(event)
+                    if event.get("ev") == "file":
+                        current = event
+                    elif event.get("ev") == "verify" and not event["match"]:
+                        current = None
+                    elif event.get("ev") == "end" and current is not None:
+                        if event["status"] == 0 and on_file_done:
+                            on_file_done(current["src"], current["dst"])
+                        current = None
+                on_progress(decoder.snapshot())
+        finally:
+            transport.close()
+
+    readers = [read_stream(process.stdout), read_stream(process.stderr, "⚠️  ")]
+    if use_events:
+        readers.append(read_events())
+    await asyncio.gather(*readers)
+
+    await process.wait()
+    return process.returncode
+
+
+def pause_process(process, paused: bool) -> None:
+    """Stop (SIGSTOP) or continue (SIGCONT) the cppp binary with all its threads.
+
+    A stopped binary keeps its open files and finished parts; its
+    progress pipe simply goes quiet until it continues.
+    """
+    if process.returncode is None:
+        process.send_signal(signal.SIGSTOP if paused else signal.SIGCONT)
+
+
+async def run_engine(engine, inputs: list[str], output: str) -> int:
+    """Run an in-process engine (CopyEngine or PartsEngine) on a worker thread."""
+    failures = await asyncio.to_thread(engine.run, inputs, output)
+    return 0 if failures == 0 else 1
+
+
+class Job:
+    """A queued transfer with its own status and throughput."""
+
+    def __init__(self, job_id: int, spec: JobSpec, throttle=None):
+        self.id = job_id
+        self.spec = spec
+        # throttle.Throttle shared by every in-process job
+        self.throttle = throttle
+        self.status = PENDING
+        self.progress = None
+        self.returncode = None
+        self.error = None
+        self.report = None
+        self.lines = deque(maxlen=JOB_LOG_LINES)
+        self.devices = {device_of(path) for path in spec.inputs} | {device_of(spec.output)}
+        self.process = None
+        self.engine = None
+        self.task = None
+
+    def cancel(self) -> None:
+        """Stop the job if it is running, or drop it if it is still queued."""
+        if self.status in (RUNNING, PAUSED):
+            if self.engine:
+                self.engine.cancel()
+            elif self.process and self.process.returncode is None:
+                self.process.terminate()
+                # A stopped process only acts on SIGTERM once it continues
+                pause_process(self.process, False)
+        if self.status in (PENDING, RUNNING, PAUSED):
+            self.status = CANCELLED
+
+    def pause(self) -> bool:
+        """Hold a running transfer where it is; returns False if nothing is copying yet."""
+        if self.status != RUNNING:
+            return False
+        if self.engine:
+            self.engine.pause()
+        elif self.process and self.process.returncode is None:
+            pause_process(self.process, True)
+        else:
+            return False
+        self.status = PAUSED
+        return True
+
+    def resume(self) -> None:
+        """Continue a paused transfer."""
+        if self.status != PAUSED:
+            return
+        self.status = RUNNING
+        if self.engine:
+            self.engine.resume()
+        elif self.process:
+            pause_process(self.process, False)
+
+    async def run(self) -> None:
+        spec = self.spec
+
+        def on_progress(event):
+            self.progress = event
+
+        try:
+            if not spec.parts_mode:
+                self.report = await asyncio.to_thread(scan, spec.inputs, spec.output,
+                                                      sync=spec.mode == "sync",
+                                                      move=spec.mode == "move",
+                                                      skip_holes=spec.backend == "python")
+                if not self.report.fits:
+                    raise OSError("Hedefte yeterli boş alan yok")
+            if spec.auto_tune:
+                result = await asyncio.to_thread(tune, self.report.largest_file, spec.output)
+                spec.apply_tuning(result)
+                self.lines.append(describe(result))
+            if spec.backend == "python":
+                self.engine = spec.make_engine(on_log=self.lines.append, on_progress=on_progress,
+                                               throttle=self.throttle)
+                if self.report is not None:
+                    self.engine.set_plan(self.report.total_bytes, self.report.file_count)
+                if self.status == CANCELLED:
+                    self.engine.cancel()
+                self.returncode = await run_engine(self.engine, spec.inputs, spec.output)
+            else:
+                cppp_bin = find_binary()
+                if cppp_bin is None:
+                    raise FileNotFoundError("cppp binary bulunamadı")
+                cmd = build_command(cppp_bin, spec)
+
+                def on_start(process):
+                    self.process = process
+                    if self.status == CANCELLED:
+                        process.terminate()
+
+                self.returncode = await run_binary(cmd, self.lines.append, on_progress, on_start)
+        except Exception as e:
+            self.error = str(e)
+            self.returncode = 1
+        finally:
+            self.engine = None
+            self.process = None
+
+        if self.status != CANCELLED:
+            self.status = DONE if self.returncode == 0 else FAILED
+
+
+class JobScheduler:
+    """Runs queued jobs with a global and a per-device concurrency limit."""
+
+    def __init__(self, max_jobs: int = 2, per_device: int = 1, on_finish=None, throttle=None):
+        self.max_jobs = max_jobs
+        self.per_device = per_device
+        self.on_finish = on_finish
+        self.throttle = throttle
+        self.jobs = []
+        self._next_id = 1
+        self._device_load = {}
+
+    def add(self, spec: JobSpec) -> Job:
+        job = Job(self._next_id, spec, self.throttle)
+        self._next_id += 1
+        self.jobs.append(job)
+        self.dispatch()
+        return job
+
+    def move(self, job: Job, delta: int) -> None:
+        """Move a job up (delta < 0) or down (delta > 0) in the queue."""
+        index = self.jobs.index(job)
+        target = max(0, min(len(self.jobs) - 1, index + delta))
+        self.jobs.insert(target, self.jobs.pop(index))
+        self.dispatch()
+
+    def cancel(self, job: Job) -> None:
+        job.cancel()
+        self.dispatch()
+
+    def clear_finished(self) -> None:
+        self.jobs = [job for job in self.jobs if job.status in (PENDING, RUNNING, PAUSED)]
+
+    @property
+    def running(self) -> int:
+        # A paused job keeps its slot and its devices
+        return sum(1 for job in self.jobs if job.status in (RUNNING, PAUSED))
+
+    def dispatch(self) -> None:
+        """Start every pending job whose devices have a free slot, in queue order."""
+        for job in self.jobs:
+            if self.running >= self.max_jobs:
+                break
+            if job.status != PENDING:
+                continue
+            if any(self._device_load.get(dev, 0) >= self.per_device for dev in job.devices):
+                continue
+            for dev in job.devices:
+                self._device_load[dev] = self._device_load.get(dev, 0) + 1
+            job.status = RUNNING
+            job.task = asyncio.get_running_loop().create_task(self._run(job))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            await job.run()
+        finally:
+            for dev in job.devices:
+                self._device_load[dev] -= 1
+            if self.on_finish:
+                self.on_finish(job)
+            self.dispatch()
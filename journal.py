@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+cppp journal - Checkpoint journal for resumable transfers
+Records finished files and the progress of every part in a small SQLite
+database under the cache directory, so an interrupted job can skip the
+work that already reached the destination instead of starting over.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+
+from paths import cache_dir
+
+JOURNAL_DIR = "journals"
+# A part records its progress (after an fdatasync) every this many bytes
+CHECKPOINT_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    src TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS parts (
+    src TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    copied INTEGER NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (src, offset)
+);
+CREATE TABLE IF NOT EXISTS roots (
+    src TEXT PRIMARY KEY,
+    dst TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class FileState:
+    """What the journal knows about one source file."""
+
+    done: bool = False
+    # offset -> [length, copied, digest]
+    parts: dict = field(default_factory=dict)
+
+
+def journal_path(inputs: list[str], output: str) -> str:
+    """Return the journal file of the job copying inputs into output."""
+    key = "\0".join(sorted(os.path.realpath(path) for path in inputs))
+    key += "\0" + os.path.realpath(output)
+    directory = os.path.join(cache_dir(), JOURNAL_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, hashlib.sha1(key.encode()).hexdigest()[:16] + ".sqlite")
+
+
+def has_journal(inputs: list[str], output: str) -> bool:
+    return os.path.exists(journal_path(inputs, output))
+
+
+class Journal:
+    """Thread-safe checkpoint journal of one job.
+
+    Entries are keyed by source path and only trusted while the source
+    keeps the size and mtime it had when they were written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._roots = dict(self._db.execute("SELECT src, dst FROM roots"))
+        self._files = {}
+        for src, size, mtime_ns, done in self._db.execute("SELECT src, size, mtime_ns, done FROM files"):
+            self._files[src] = [size, mtime_ns, FileState(done=bool(done))]
+        for src, offset, length, copied, digest in self._db.execute(
+                "SELECT src, offset, length, copied, digest FROM parts"):
+            if src in self._files:
+                self._files[src][2].parts[offset] = [length, copied, digest]
+
+    @classmethod
+    def open(cls, inputs: list[str], output: str) -> "Journal":
+        return cls(journal_path(inputs, output))
+
+    @property
+    def finished_files(self) -> int:
+        with self._lock:
+            return sum(1 for _, _, state in self._files.values() if state.done)
+
+    def destination(self, src: str):
+        """Return where an input was copied to by the interrupted run.
+
+        init_process() picks a different destination once the output
+        directory exists, so a resumed run has to reuse the recorded one.
+        """
+        with self._lock:
+            return self._roots.get(src)
+
+    @property
+    def has_destinations(self) -> bool:
+        with self._lock:
+            return bool(self._roots)
+
+    def record_destination(self, src: str, dst: str) -> None:
+        with self._lock, self._db:
+            self._roots[src] = dst
+            self._db.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (src, dst))
+
+    def file_state(self, src: str, src_stat):
+        """Return the FileState of src, or None if it is unknown or changed."""
+        with self._lock:
+            entry = self._files.get(src)
+            if entry is None:
+                return None
+            size, mtime_ns, state = entry
+            if (size, mtime_ns) == (src_stat.st_size, src_stat.st_mtime_ns):
+                return state
+            with self._db:
+                self._forget(src)
+            return None
+
+    def start_file(self, src: str, src_stat, ranges) -> None:
+        """Record the part layout of a file before its first byte is copied."""
+        with self._lock, self._db:
+            state = self._entry(src, src_stat)
+            state.parts = {offset: [length, 0, None] for offset, length in ranges}
+            self._db.execute("DELETE FROM parts WHERE src = ?", (src,))
+            self._db.executemany(
+                "INSERT INTO parts VALUES (?, ?, ?, 0, NULL)",
+                [(src, offset, length) for offset, length in ranges],
+            )
+
+    def record_part(self, src: str, src_stat, offset: int, length: int,
+                    copied: int, digest: str = None) -> None:
+        """Remember that copied bytes of a part are durable at the destination."""
+        with self._lock, self._db:
+            state = self._entry(src, src_stat)
+            state.parts[offset] = [length, copied, digest]
+            self._db.execute(
+                "INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?, ?)",
+                (src, offset, length, copied, digest),
+            )
+
+    def record_files(self, entries) -> None:
+        """Mark files as finished; entries are (src, src_stat, parts) tuples.
+
+        parts is a list of engine.PartHash or None.
+        """
+        with self._lock, self._db:
+            for src, src_stat, parts in entries:
+                state = self._entry(src, src_stat)
+                state.done = True
+                self._db.execute("UPDATE files SET done = 1 WHERE src = ?", (src,))
+                for part in parts or ():
+                    state.parts[part.offset] = [part.length, part.length, part.digest]
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO parts VALUES (?, ?, ?, ?, ?)",
+                        (src, part.offset, part.length, part.length, part.digest),
+                    )
+
+    def record_copied(self, paths) -> None:
+        """Mark files finished by the cppp binary; paths are (src, dst) pairs.
+
+        copy() fsyncs every destination before reporting it finished.
+        """
+        entries = []
+        for src, _ in paths:
+            try:
+                entries.append((src, os.stat(src), None))
+            except OSError:
+                continue
+        self.record_files(entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def remove(self) -> None:
+        """Close and delete the journal once the job has finished."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.path + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _entry(self, src: str, src_stat) -> FileState:
+        entry = self._files.get(src)
+        if entry is not None and (entry[0], entry[1]) == (src_stat.st_size, src_stat.st_mtime_ns):
+            return entry[2]
+        if entry is not None:
+            self._forget(src)
+        state = FileState()
+        self._files[src] = [src_stat.st_size, src_stat.st_mtime_ns, state]
+        self._db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, 0)",
+            (src, src_stat.st_size, src_stat.st_mtime_ns),
+        )
+        return state
+
+    def _forget(self, src: str) -> None:
+        del self._files[src]
+        self._db.execute("DELETE FROM files WHERE src = ?", (src,))
+        self._db.execute("DELETE FROM parts WHERE src = ?", (src,))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+cppp log buffer - Bounded line buffer between copy output and the Log widget
+Readers append lines as fast as the child process or the engine produce
+them; the TUI drains the buffer on a timer and writes one batch per frame.
+"""
+
+import threading
+from collections import deque
+
+# Lines held between two flushes before the oldest ones are dropped
+LOG_BUFFER_LINES = 2000
+
+
+class LogBuffer:
+    """Thread-safe ring buffer that drops and collapses lines under load."""
+
+    def __init__(self, capacity: int = LOG_BUFFER_LINES):
+        self._lines = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._last = None
+        self._repeat = 0
+        self.dropped = 0
+        self.collapsed = 0
+
+    def append(self, line: str) -> None:
+        """Queue a line, collapsing immediate repeats of the previous one."""
+        with self._lock:
+            if line == self._last:
+                self._repeat += 1
+                self.collapsed += 1
+                return
+            self._flush_repeat()
+            self._last = line
+            self._push(line)
+
+    def drain(self) -> list[str]:
+        """Return and forget every queued line."""
+        with self._lock:
+            self._flush_repeat()
+            lines = list(self._lines)
+            self._lines.clear()
+            return lines
+
+    def reset(self) -> None:
+        """Forget queued lines and counters, e.g. when a new job starts."""
+        with self._lock:
+            self._lines.clear()
+            self._last = None
+            self._repeat = 0
+            self.dropped = 0
+            self.collapsed = 0
+
+    def _flush_repeat(self) -> None:
+        if self._repeat:
+            self._push(f"   ↑ {self._repeat} kez tekrarlandı")
+            self._repeat = 0
+
+    def _push(self, line: str) -> None:
+        if len(self._lines) == self._lines.maxlen:
+            self.dropped += 1
+        self._lines.append(line)
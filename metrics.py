@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+cppp metrics - Throughput and latency telemetry of a running transfer
+The copy engine (or the --progress-fd decoder for the cppp binary) feeds
+cumulative counters; the TUI samples them at a fixed interval into
+fixed-size array-backed ring buffers, draws those as sparklines and
+writes a run summary when the job ends.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+
+from paths import cache_dir
+from preflight import format_size
+
+# Seconds between two samples and samples kept per series (one minute)
+SAMPLE_INTERVAL = 0.5
+HISTORY = 120
+RUNS_DIR = "runs"
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Verdicts of MetricsRecorder.bottleneck()
+BOUND_SOURCE = "source"
+BOUND_DESTINATION = "destination"
+BOUND_CPU = "cpu"
+BOUND_KERNEL = "kernel-copy"
+BOUND_UNKNOWN = "unknown"
+BOUND_LABELS = {
+    BOUND_SOURCE: "kaynak (okuma)",
+    BOUND_DESTINATION: "hedef (yazma)",
+    BOUND_CPU: "işlemci (SHA-256)",
+    BOUND_KERNEL: "çekirdek içi kopya (copy_file_range/reflink/sendfile, okuma/yazma ayrılamaz)",
+    BOUND_UNKNOWN: "bilinmiyor (cppp gecikme bildirmiyor)",
+}
+
+
+class Ring:
+    """Fixed-size ring buffer of floats stored in an array('d')."""
+
+    def __init__(self, size: int = HISTORY):
+        self._data = array("d", bytes(8 * size))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(self, value: float) -> None:
+        self._data[self._head] = value
+        self._head = (self._head + 1) % len(self._data)
+        self._count = min(self._count + 1, len(self._data))
+
+    def values(self) -> array:
+        """Samples from oldest to newest."""
+        if self._count < len(self._data):
+            return self._data[:self._count]
+        return self._data[self._head:] + self._data[:self._head]
+
+    @property
+    def last(self) -> float:
+        return self._data[self._head - 1] if self._count else 0.0
+
+    @property
+    def peak(self) -> float:
+        return max(self.values(), default=0.0)
+
+
+def sparkline(values, width: int) -> str:
+    """Draw the newest width values as block characters scaled to their peak."""
+    values = values[-width:]
+    peak = max(values, default=0.0)
+    if peak <= 0:
+        return SPARK_CHARS[0] * len(values)
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[min(top, int(value / peak * top + 0.5))] for value in values)
+
+
+class MetricsRecorder:
+    """Cumulative transfer counters plus their sampled history.
+
+    Counter updates are thread-safe and cheap so copy workers can call
+    them per chunk; sample() turns them into per-interval rates.
+    """
+
+    def __init__(self, history: int = HISTORY):
+        self._lock = threading.Lock()
+        self._history = history
+        self.started = time.monotonic()
+        self.bytes = 0
+        self.files = 0
+        self.queued = 0
+        # Seconds spent and calls made per kind of I/O
+        self.io_time = {"read": 0.0, "write": 0.0, "copy": 0.0, "hash": 0.0}
+        self.io_calls = {"read": 0, "write": 0, "copy": 0, "hash": 0}
+        self.worker_bytes = {}
+        self.throughput = Ring(history)
+        self.file_rate = Ring(history)
+        self.queue_depth = Ring(history)
+        self.read_latency = Ring(history)
+        self.write_latency = Ring(history)
+        self.workers = {}
+        # Whole-run peaks; the rings only remember the last HISTORY samples
+        self.mbps_peak = 0.0
+        self.queue_peak = 0
+        self._last = (self.started, 0, 0, dict(self.io_time), dict(self.io_calls), {})
+        # Part progress of the cppp binary, keyed by (file id, part)
+        self._part_done = {}
+        self._part_file = None
+
+    # Counters, called from copy workers
+
+    def add_bytes(self, count: int, worker: str) -> None:
+        with self._lock:
+            self.bytes += count
+            self.worker_bytes[worker] = self.worker_bytes.get(worker, 0) + count
+
+    def add_file(self) -> None:
+        with self._lock:
+            self.files += 1
+
+    def add_io(self, kind: str, seconds: float) -> None:
+        """Account one read, write, copy (copy_file_range, reflink, sendfile) or hash call."""
+        with self._lock:
+            self.io_time[kind] += seconds
+            self.io_calls[kind] += 1
+
+    def add_queued(self, count: int) -> None:
+        """Work items submitted (positive) or picked up (negative)."""
+        with self._lock:
+            self.queued += count
+
+    def record_event(self, event: dict) -> None:
+        """Account one --progress-fd event of the cppp binary."""
+        kind = event.get("ev")
+        if kind == "file":
+            self._part_file = event["id"]
+        elif kind == "part":
+            key = (self._part_file, event["part"])
+            delta = event["part_done"] - self._part_done.get(key, 0)
+            self._part_done[key] = event["part_done"]
+            self.add_bytes(max(0, delta), f"part {event['part']}")
+        elif kind == "end":
+            self._part_done.clear()
+            self.add_file()
+
+    # Sampling, called from the UI at SAMPLE_INTERVAL
+
+    def sample(self, now: float = None) -> None:
+        """Push one sample of every series."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last_time, last_bytes, last_files, last_time_io, last_calls, last_workers = self._last
+            elapsed = max(now - last_time, 1e-6)
+            mbps = (self.bytes - last_bytes) / (1024 * 1024) / elapsed
+            self.mbps_peak = max(self.mbps_peak, mbps)
+            self.queue_peak = max(self.queue_peak, self.queued)
+            self.throughput.push(mbps)
+            self.file_rate.push((self.files - last_files) / elapsed)
+            self.queue_depth.push(self.queued)
+            for kind, ring in (("read", self.read_latency), ("write", self.write_latency)):
+                calls = self.io_calls[kind] - last_calls[kind]
+                spent = self.io_time[kind] - last_time_io[kind]
+                ring.push(spent / calls * 1000 if calls else 0.0)
+            for worker, count in self.worker_bytes.items():
+                ring = self.workers.get(worker)
+                if ring is None:
+                    ring = self.workers[worker] = Ring(self._history)
+                ring.push((count - last_workers.get(worker, 0)) / (1024 * 1024) / elapsed)
+            self._last = (now, self.bytes, self.files, dict(self.io_time),
+                          dict(self.io_calls), dict(self.worker_bytes))
+
+    def bottleneck(self) -> str:
+        """Guess what limited the run from where the worker time went."""
+        with self._lock:
+            spent = dict(self.io_time)
+        if not any(spent.values()):
+            return BOUND_UNKNOWN
+        verdicts = {"read": BOUND_SOURCE, "write": BOUND_DESTINATION,
+                    "copy": BOUND_KERNEL, "hash": BOUND_CPU}
+        return verdicts[max(spent, key=spent.get)]
+
+    def summary(self) -> dict:
+        """Everything worth keeping about the run, JSON-serialisable."""
+        duration = time.monotonic() - self.started
+        with self._lock:
+            latency = {kind: (self.io_time[kind] / self.io_calls[kind] * 1000
+                              if self.io_calls[kind] else None)
+                       for kind in self.io_time}
+            summary = {
+                "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "duration": duration,
+                "bytes": self.bytes,
+                "files": self.files,
+                "mbps_avg": self.bytes / (1024 * 1024) / duration if duration > 0 else 0.0,
+                "mbps_peak": self.mbps_peak,
+                "files_per_sec": self.files / duration if duration > 0 else 0.0,
+                "queue_peak": self.queue_peak,
+                "latency_ms": latency,
+                "io_seconds": dict(self.io_time),
+                "worker_bytes": dict(self.worker_bytes),
+            }
+        summary["bound_by"] = self.bottleneck()
+        return summary
+
+
+def export_summary(summary: dict) -> str:
+    """Write a run summary below the cache directory and return its path."""
+    directory = os.path.join(cache_dir(), RUNS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "run-" + time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+    return path
+
+
+def summarize(summary: dict) -> list[str]:
+    """Render a run summary as log lines."""
+    latency = summary["latency_ms"]
+
+    def ms(kind):
+        return f"{latency[kind]:.2f} ms" if latency[kind] is not None else "-"
+
+    lines = [
+        f"📊 Özet: {format_size(summary['bytes'])}, {summary['files']} dosya, "
+        f"{summary['duration']:.1f} sn",
+        f"   Hız: ort. {summary['mbps_avg']:.2f} MB/s, tepe {summary['mbps_peak']:.2f} MB/s, "
+        f"{summary['files_per_sec']:.1f} dosya/sn",
+        f"   Gecikme: okuma {ms('read')}, yazma {ms('write')}, kopya {ms('copy')}",
+        f"   Darboğaz: {BOUND_LABELS[summary['bound_by']]}",
+    ]
+    workers = summary["worker_bytes"]
+    if len(workers) > 1:
+        total = sum(workers.values()) or 1
+        lines.append("   İş parçacıkları: " + "  ".join(
+            f"{name.removeprefix('cppp-')}:%{count * 100 / total:.0f}"
+            for name, count in sorted(workers.items())
+        ))
+    return lines
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+cppp parts - Split, merge and select-merge on memory-mapped files
+Python counterpart of split.c, merge.c and select_and_merge.c. Inputs are
+mapped with mmap and written with pwrite straight from memoryview slices
+of the mapping, so the bytes never pass through a Python buffer. Outputs
+are preallocated and every piece is written by its own thread.
+"""
+
+import mmap
+import os
+import re
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from engine import CHUNK_SIZE, UPDATE_INTERVAL, EngineError, preallocate, split_ranges
+from progress import ProgressEvent
+
+MODES = ("split", "merge", "select-merge")
+# Pieces written at the same time
+PART_WORKERS = 8
+# Suffix split.c gives to part files: example.part1, example.part2, ...
+PART_SUFFIX_RE = re.compile(r"\.part\d+$")
+
+# ERR_* names from error_codes.h per mode: (source open, output create, write)
+ERROR_CODES = {
+    "split": ("ERR_SPLIT_FILE_OPEN", "ERR_SPLIT_PART_CREATE", "ERR_SPLIT_PWRITE"),
+    "merge": ("ERR_MERGE_SECOND_FILE_OPEN", "ERR_MERGE_FIRST_FILE_OPEN", "ERR_MERGE_WRITE"),
+    "select-merge": ("ERR_SELECT_FILE_OPEN", "ERR_SELECT_FILE_CREATE", "ERR_SELECT_PWRITE"),
+}
+
+
+@dataclass
+class PartsOptions:
+    """Settings of one split, merge or select-merge job."""
+
+    mode: str = "split"
+    # Parts a file is split into, or was split into for select-merge
+    num_parts: int = 2
+    # 1-based part numbers for select-merge, in output order
+    selected: list[int] = field(default_factory=list)
+    overwrite: bool = False
+    verbose: bool = False
+    block_size: int = CHUNK_SIZE
+
+
+@dataclass
+class Piece:
+    """One byte range of an input and where it goes in an output."""
+
+    src: str
+    src_offset: int
+    length: int
+    dst: str
+    dst_offset: int
+
+
+def parse_selection(text: str) -> list[int]:
+    """Parse part numbers like "1,3-5" into [1, 3, 4, 5]; raises ValueError."""
+    selected = []
+    for item in text.replace(" ", "").split(","):
+        if not item:
+            continue
+        first, _, last = item.partition("-")
+        first = int(first)
+        last = int(last) if last else first
+        if first < 1 or last < first:
+            raise ValueError(f"invalid part range '{item}'")
+        selected.extend(range(first, last + 1))
+    return selected
+
+
+def part_name(path: str, index: int) -> str:
+    """Name of the index-th (0-based) part of path, like split.c."""
+    return f"{path}.part{index + 1}"
+
+
+@contextmanager
+def mapped(path: str):
+    """Map a whole file read-only and yield a memoryview of it."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if not size:
+            # mmap refuses empty files
+            yield memoryview(b"")
+            return
+        with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapping:
+            if hasattr(mapping, "madvise"):
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mapping)
+            try:
+                yield view
+            finally:
+                view.release()
+    finally:
+        os.close(fd)
+
+
+class PartsEngine:
+    """Runs split, merge and select-merge jobs with the interface of CopyEngine."""
+
+    def __init__(self, options: PartsOptions, on_log=None, on_progress=None, metrics=None,
+                 throttle=None):
+        self.options = options
+        # metrics.MetricsRecorder fed with bytes, finished outputs and write times
+        self.metrics = metrics
+        # throttle.Throttle limiting the bytes and writes of every piece
+        self.throttle = throttle
+        self.on_log = on_log or (lambda line: None)
+        self.on_progress = on_progress or (lambda event: None)
+        self._cancel = threading.Event()
+        # Cleared while paused; pieces wait for it between blocks
+        self._running = threading.Event()
+        self._running.set()
+        self._paused_at = None
+        self._lock = threading.Lock()
+        self._done = 0
+        self._total = 0
+        self._start = time.monotonic()
+        self._last_update = 0.0
+        # Output path -> pieces still being written
+        self._remaining = {}
+        self._outputs_done = 0
+
+    def cancel(self) -> None:
+        """Ask every worker to stop at its next block boundary."""
+        self._cancel.set()
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def pause(self) -> None:
+        """Hold every piece at its next block boundary, mappings and outputs kept open."""
+        with self._lock:
+            if self._paused_at is None:
+                self._paused_at = time.monotonic()
+                self._running.clear()
+
+    def resume(self) -> None:
+        with self._lock:
+            if self._paused_at is None:
+                return
+            self._start += time.monotonic() - self._paused_at
+            self._paused_at = None
+            self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def _stopping(self) -> bool:
+        """Pause point of the piece loop: wait while paused, then report cancellation."""
+        self._running.wait()
+        return self._cancel.is_set()
+
+    def log(self, line: str) -> None:
+        self.on_log(line)
+
+    def run(self, inputs: list[str], output: str) -> int:
+        """Run the job of options.mode; returns 0 or raises EngineError."""
+        open_code, create_code, _ = ERROR_CODES[self.options.mode]
+        if not inputs:
+            raise EngineError("ERR_COPY_NO_INPUT_FILE", "Input file wasn't specified")
+        if not output:
+            raise EngineError("ERR_COPY_NO_OUTPUT_PATH", "Output path wasn't specified")
+        sizes = {}
+        for path in inputs:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                raise EngineError(open_code, f"'{path}' couldn't be opened") from e
+            if not stat.S_ISREG(st.st_mode):
+                raise EngineError(open_code, f"'{path}' is not a regular file")
+            sizes[path] = st
+
+        pieces, message = self._plan(inputs, output, sizes)
+        outputs = {}
+        for piece in pieces:
+            outputs[piece.dst] = max(outputs.get(piece.dst, 0), piece.dst_offset + piece.length)
+        sources = {os.path.realpath(path) for path in inputs}
+        for dst in outputs:
+            if os.path.realpath(dst) in sources:
+                raise EngineError(create_code, f"'{dst}' is also a source")
+        self._total = sum(piece.length for piece in pieces)
+        self._remaining = {dst: sum(1 for piece in pieces if piece.dst == dst) for dst in outputs}
+        self._start = time.monotonic()
+
+        with ExitStack() as stack:
+            views = {}
+            for path in dict.fromkeys(piece.src for piece in pieces):
+                try:
+                    views[path] = stack.enter_context(mapped(path))
+                except OSError as e:
+                    raise EngineError(open_code, f"'{path}' couldn't be opened ({e.strerror})") from e
+            fds = self._create_outputs(outputs, sizes[inputs[0]], create_code)
+            try:
+                self._write_pieces(pieces, views, fds)
+            except BaseException:
+                for fd in fds.values():
+                    os.close(fd)
+                # Preallocated outputs look complete, so none is left behind
+                for dst in outputs:
+                    try:
+                        os.unlink(dst)
+                    except OSError:
+                        pass
+                raise
+            for fd in fds.values():
+                os.fsync(fd)
+                os.close(fd)
+        self.log(message)
+        return 0
+
+    def _plan(self, inputs: list[str], output: str, sizes: dict):
+        """Return the pieces of the job and its closing log line."""
+        mode = self.options.mode
+        if mode == "split":
+            os.makedirs(output, exist_ok=True)
+            pieces = []
+            for path in inputs:
+                name = os.path.join(output, os.path.basename(path))
+                ranges = split_ranges(sizes[path].st_size, self.options.num_parts)
+                pieces += [Piece(path, offset, length, part_name(name, index), 0)
+                           for index, (offset, length) in enumerate(ranges)]
+            return pieces, f"✅ {len(inputs)} file(s) split into {len(pieces)} part files in '{output}'"
+
+        if mode == "merge":
+            if os.path.isdir(output):
+                output = os.path.join(output, PART_SUFFIX_RE.sub("", os.path.basename(inputs[0])))
+            pieces, offset = [], 0
+            for path in inputs:
+                pieces.append(Piece(path, 0, sizes[path].st_size, output, offset))
+                offset += sizes[path].st_size
+            return pieces, f"✅ {len(inputs)} file(s) merged into '{output}'"
+
+        # select-merge: the C checks, with the last part keeping the remainder
+        selected = self.options.selected
+        num_parts = self.options.num_parts
+        if len(inputs) != 1:
+            raise EngineError("ERR_SELECT_FILE_OPEN", "select-merge takes a single source file")
+        if not selected:
+            raise EngineError("ERR_SELECT_INVALID_PART_VALUE", "no parts were selected")
+        if len(selected) > num_parts:
+            raise EngineError("ERR_SELECT_TOO_MANY_PARTS",
+                              f"selected parts ({len(selected)}) exceed total available parts ({num_parts})")
+        if max(selected) > num_parts:
+            raise EngineError("ERR_SELECT_INVALID_PART_VALUE",
+                              f"selected part index's exceed valid range [1..{num_parts}]")
+        src = inputs[0]
+        if os.path.isdir(output):
+            output = os.path.join(output, os.path.basename(src) + "_new")
+        ranges = split_ranges(sizes[src].st_size, num_parts)
+        pieces, offset = [], 0
+        for number in selected:
+            part_offset, length = ranges[number - 1]
+            pieces.append(Piece(src, part_offset, length, output, offset))
+            offset += length
+        numbers = ",".join(map(str, selected))
+        return pieces, f"✅ Parts {numbers} of '{src}' merged into '{output}'"
+
+    def _create_outputs(self, outputs: dict, src_stat, create_code: str) -> dict:
+        """Create and preallocate every output; returns {path: fd}."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        if not self.options.overwrite:
+            flags |= os.O_EXCL
+        fds = {}
+        try:
+            for dst, size in outputs.items():
+                try:
+                    fds[dst] = os.open(dst, flags, stat.S_IMODE(src_stat.st_mode))
+                except FileExistsError as e:
+                    raise EngineError(create_code, f"'{dst}' already exists (enable overwrite -f)") from e
+                except OSError as e:
+                    raise EngineError(create_code, f"'{dst}' couldn't be created ({e.strerror})") from e
+                try:
+                    preallocate(fds[dst], size)
+                except OSError as e:
+                    raise EngineError(create_code, f"'{dst}' couldn't be allocated ({e.strerror})") from e
+        except BaseException:
+            for dst, fd in fds.items():
+                os.close(fd)
+                os.unlink(dst)
+            raise
+        return fds
+
+    def _write_pieces(self, pieces: list[Piece], views: dict, fds: dict) -> None:
+        write_code = ERROR_CODES[self.options.mode][2]
+        workers = max(1, min(PART_WORKERS, len(pieces)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cppp-piece") as pool:
+            futures = [pool.submit(self._write_piece, piece, views[piece.src], fds[piece.dst])
+                       for piece in pieces]
+            if self.metrics is not None:
+                self.metrics.add_queued(len(futures))
+            # Every piece has to stop before the mappings and outputs are closed
+            wait(futures)
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                raise EngineError(write_code, f"an error encountered while writing ({error})") from error
+        if self.cancelled:
+            raise EngineError("ERR_COPY_CANCELLED", "operation was cancelled")
+
+    def _write_piece(self, piece: Piece, view: memoryview, fd: int) -> None:
+        """pwrite one piece straight from the source mapping."""
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.add_queued(-1)
+        if self.options.verbose:
+            self.log(f"'{piece.src}' [{piece.src_offset}+{piece.length}] -> '{piece.dst}'")
+        throttle = self.throttle
+        clock = time.perf_counter
+        worker = threading.current_thread().name
+        position, end = piece.src_offset, piece.src_offset + piece.length
+        while position < end and not self._stopping():
+            count = min(self.options.block_size, end - position)
+            if throttle is not None:
+                throttle.acquire(count, self._cancel.is_set)
+            began = clock()
+            written = os.pwrite(fd, view[position:position + count],
+                                piece.dst_offset + position - piece.src_offset)
+            spent = clock() - began
+            if throttle is not None:
+                throttle.observe(spent, written)
+            if metrics is not None:
+                metrics.add_io("write", spent)
+                metrics.add_bytes(written, worker)
+            position += written
+            self._advance(written)
+        if not self.cancelled:
+            self._finish_piece(piece.dst)
+
+    def _finish_piece(self, dst: str) -> None:
+        with self._lock:
+            self._remaining[dst] -= 1
+            if self._remaining[dst]:
+                return
+            self._outputs_done += 1
+        if self.metrics is not None:
+            self.metrics.add_file()
+        self._advance(0)
+
+    def _advance(self, count: int) -> None:
+        with self._lock:
+            self._done += count
+            now = time.monotonic()
+            if count and now - self._last_update < UPDATE_INTERVAL and self._done < self._total:
+                return
+            self._last_update = now
+            elapsed = now - self._start
+            speed = self._done / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+            remaining = self._total - self._done
+            event = ProgressEvent(
+                percent=self._done * 100 / self._total if self._total else 100.0,
+                speed_mbps=speed,
+                eta=int(remaining / (speed * 1024 * 1024)) if speed > 0 else 0,
+                elapsed=elapsed,
+                files_done=self._outputs_done,
+                files_total=len(self._remaining),
+            )
+        self.on_progress(event)
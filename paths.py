@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+cppp paths - Filesystem helpers shared by the TUI modules
+"""
+
+import os
+
+
+def cache_dir() -> str:
+    """Return (and create) the per-user cache directory of the TUI."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "cppp-tui")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def device_of(path: str) -> int:
+    """Return st_dev of path, or of its nearest existing parent."""
+    path = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return -1
+            path = parent
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+cppp preflight - Plans a transfer before any bytes move
+Walks the sources with os.scandir on a thread pool and reports the total
+size, file count, size histogram, free space on the destination and
+conflicts (same-inode or overwritten files). Destination directories are
+read through the persistent destination index.
+"""
+
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+
+from dest_index import NoIndex, open_index
+from engine import SMALL_FILE_THRESHOLD, destination_for, is_sparse
+from paths import device_of
+
+# Upper bounds of the size histogram buckets; the last bucket is open ended
+SIZE_BUCKETS = [
+    (4 * 1024, "<4K"),
+    (64 * 1024, "<64K"),
+    (1024 * 1024, "<1M"),
+    (16 * 1024 * 1024, "<16M"),
+    (256 * 1024 * 1024, "<256M"),
+    (4 * 1024 * 1024 * 1024, "<4G"),
+]
+SIZE_BUCKET_LABELS = [label for _, label in SIZE_BUCKETS] + [">=4G"]
+# Examples kept per conflict list
+MAX_EXAMPLES = 5
+SCAN_WORKERS = 8
+
+
+@dataclass
+class PreflightReport:
+    """Result of a pre-flight scan."""
+
+    total_bytes: int = 0
+    file_count: int = 0
+    dir_count: int = 0
+    histogram: list[int] = field(default_factory=lambda: [0] * len(SIZE_BUCKET_LABELS))
+    overwrite_count: int = 0
+    overwrite_bytes: int = 0
+    overwrites: list[str] = field(default_factory=list)
+    same_inode: list[str] = field(default_factory=list)
+    unreadable: list[str] = field(default_factory=list)
+    free_bytes: int = -1
+    largest_file: str = ""
+    largest_size: int = 0
+    # Apparent bytes of sparse files that are holes; the Python engine skips them
+    hole_bytes: int = 0
+    # Whether required_bytes leaves the holes out
+    skip_holes: bool = False
+    # Move mode: inputs on the destination's filesystem, renamed without copying
+    renamed: list[str] = field(default_factory=list)
+
+    @property
+    def required_bytes(self) -> int:
+        """Bytes the destination has to grow by (overwritten files are reused)."""
+        holes = self.hole_bytes if self.skip_holes else 0
+        return max(0, self.total_bytes - holes - self.overwrite_bytes)
+
+    @property
+    def fits(self) -> bool:
+        return self.free_bytes < 0 or self.required_bytes <= self.free_bytes
+
+    def add_file(self, size: int) -> None:
+        self.file_count += 1
+        self.total_bytes += size
+        for index, (limit, _) in enumerate(SIZE_BUCKETS):
+            if size < limit:
+                self.histogram[index] += 1
+                return
+        self.histogram[-1] += 1
+
+
+def format_size(size: float) -> str:
+    """Format a byte count with a binary unit."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+
+
+def free_space(path: str) -> int:
+    """Return bytes available to unprivileged users on the filesystem of path."""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return -1
+        path = parent
+    try:
+        info = os.statvfs(path)
+    except OSError:
+        return -1
+    return info.f_bavail * info.f_frsize
+
+
+def _scan_dir(src_dir: str, dst_dir: str, index):
+    """List one source directory and compare it with its destination."""
+    files, subdirs, unreadable = [], [], []
+    dst_stats = index.listing(dst_dir)
+    try:
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    unreadable.append(entry.path)
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    subdirs.append((entry.path, os.path.join(dst_dir, entry.name)))
+                elif stat.S_ISREG(st.st_mode):
+                    files.append((entry.path, st, dst_stats.get(entry.name)))
+    except OSError:
+        unreadable.append(src_dir)
+    return files, subdirs, unreadable
+
+
+def _add_entry(report: PreflightReport, src: str, st, dst_st) -> None:
+    report.add_file(st.st_size)
+    # Small files are copied whole, holes included
+    if is_sparse(st) and st.st_size >= SMALL_FILE_THRESHOLD:
+        report.hole_bytes += st.st_size - st.st_blocks * 512
+    if st.st_size > report.largest_size:
+        report.largest_file, report.largest_size = src, st.st_size
+    if dst_st is None:
+        return
+    if (dst_st.st_ino, dst_st.st_dev) == (st.st_ino, st.st_dev):
+        if len(report.same_inode) < MAX_EXAMPLES:
+            report.same_inode.append(src)
+        return
+    report.overwrite_count += 1
+    report.overwrite_bytes += dst_st.st_size
+    if len(report.overwrites) < MAX_EXAMPLES:
+        report.overwrites.append(src)
+
+
+def scan(inputs: list[str], output: str, workers: int = SCAN_WORKERS,
+         sync: bool = False, move: bool = False, skip_holes: bool = False) -> PreflightReport:
+    """Scan every input and report what a copy into output would do.
+
+    With sync, inputs synced before are compared with the destination
+    they were synced to, as CopyEngine reuses it. With move, inputs on
+    the destination's filesystem are not walked: they are only renamed.
+    skip_holes (the Python engine) leaves the holes of sparse files out
+    of the space the copy needs.
+    """
+    report = PreflightReport(skip_holes=skip_holes)
+    output = os.path.realpath(output)
+    report.free_bytes = free_space(output)
+    output_dev = device_of(output)
+    index = open_index(output) or NoIndex()
+
+    file_count = sum(1 for path in inputs if os.path.isfile(path))
+    dir_count = sum(1 for path in inputs if os.path.isdir(path))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cppp-scan") as pool:
+        pending = set()
+        for src in inputs:
+            src = os.path.realpath(src)
+            try:
+                st = os.stat(src)
+            except OSError:
+                report.unreadable.append(src)
+                continue
+            if move and st.st_dev == output_dev:
+                report.renamed.append(src)
+                continue
+            dst = (index.destination(src) if sync else None) or \
+                destination_for(src, output, file_count, dir_count)
+            if stat.S_ISDIR(st.st_mode):
+                report.dir_count += 1
+                pending.add(pool.submit(_scan_dir, src, dst, index))
+            elif stat.S_ISREG(st.st_mode):
+                _add_entry(report, src, st, index.lookup(dst))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs, unreadable = future.result()
+                report.unreadable.extend(unreadable)
+                for src, st, dst_st in files:
+                    _add_entry(report, src, st, dst_st)
+                for src_dir, dst_dir in subdirs:
+                    report.dir_count += 1
+                    pending.add(pool.submit(_scan_dir, src_dir, dst_dir, index))
+    index.close()
+    return report
+
+
+def summarize(report: PreflightReport) -> list[str]:
+    """Render a report as log lines."""
+    lines = [
+        f"🔎 Ön tarama: {report.file_count} dosya, {report.dir_count} klasör, "
+        f"{format_size(report.total_bytes)}",
+        "   Boyut dağılımı: " + "  ".join(
+            f"{label}:{count}" for label, count in zip(SIZE_BUCKET_LABELS, report.histogram) if count
+        ),
+    ]
+    if report.renamed:
+        lines.append(f"   Aynı dosya sisteminde yeniden adlandırılacak: {len(report.renamed)} girdi "
+                     f"(veri kopyalanmaz)")
+    if report.hole_bytes:
+        lines.append(f"   Seyrek dosyalardaki boşluklar: {format_size(report.hole_bytes)} "
+                     f"(Python motoru bunları kopyalamaz)")
+    if report.free_bytes >= 0:
+        lines.append(f"   Hedefte boş alan: {format_size(report.free_bytes)} "
+                     f"(gereken: {format_size(report.required_bytes)})")
+    if report.overwrite_count:
+        lines.append(f"⚠️  {report.overwrite_count} dosyanın üzerine yazılacak "
+                     f"({format_size(report.overwrite_bytes)})")
+        lines.extend(f"     {path}" for path in report.overwrites)
+    if report.same_inode:
+        lines.append("⚠️  Kaynak ve hedef aynı dosya (atlanacak):")
+        lines.extend(f"     {path}" for path in report.same_inode)
+    if report.unreadable:
+        lines.append(f"⚠️  {len(report.unreadable)} girdi okunamadı")
+        lines.extend(f"     {path}" for path in report.unreadable[:MAX_EXAMPLES])
+    return lines
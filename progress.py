@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+cppp progress - Streaming parser for cppp output
+Turns the raw stdout/stderr bytes of the cppp binary into log lines and
+structured progress events, without waiting for a newline. Also decodes
+the JSON-lines channel written by `cppp --progress-fd`.
+"""
+
+import codecs
+import json
+import re
+import time
+from dataclasses import dataclass, field
+
+# ANSI escape sequences used by print_warns.c and progress_bar.c
+ANSI_RE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+# An escape sequence cut in half at the end of a chunk
+PARTIAL_ANSI_RE = re.compile(r"\x1b(\[[0-9;?]*)?$")
+# One frame of print_progress(): "[====>···] 42% [12.34 MB/s] [ETA: 01:02] [Elapsed: 00:10]"
+PROGRESS_RE = re.compile(
+    r"(\d+)%\s*\[([\d.]+) MB/s\]\s*\[ETA: (\d+):(\d+)\]\s*\[Elapsed: (\d+):(\d+)\]"
+)
+
+
+@dataclass
+class ProgressEvent:
+    """A single progress sample of the part or file being copied."""
+
+    percent: float
+    speed_mbps: float
+    eta: int
+    elapsed: float
+    files_done: int = 0
+    files_total: int = 0
+    received: float = field(default_factory=time.monotonic)
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as MM:SS like format_eta() in progress_bar.c."""
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def strip_ansi(text: str) -> str:
+    """Remove ANSI color and cursor codes from text."""
+    return ANSI_RE.sub("", text)
+
+
+def parse_progress(text: str):
+    """Return a ProgressEvent if text is a print_progress() frame, else None."""
+    match = PROGRESS_RE.search(text)
+    if not match:
+        return None
+    percent, speed, eta_m, eta_s, el_m, el_s = match.groups()
+    return ProgressEvent(
+        percent=float(percent),
+        speed_mbps=float(speed),
+        eta=int(eta_m) * 60 + int(eta_s),
+        elapsed=float(int(el_m) * 60 + int(el_s)),
+    )
+
+
+class StreamParser:
+    """Incrementally splits raw output on '\\r' and '\\n'.
+
+    feed() returns a list whose items are either plain log lines (str) or
+    ProgressEvent objects, in the order they appeared in the stream.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+
+    def feed(self, data: bytes) -> list:
+        text = self._pending + self._decoder.decode(data)
+        items = []
+        start = 0
+        for match in re.finditer(r"[\r\n]", text):
+            self._emit(text[start:match.start()], items)
+            start = match.end()
+        self._pending = text[start:]
+
+        # print_progress() never ends a frame with a separator, so emit a
+        # complete trailing frame now instead of waiting for the next one.
+        if PROGRESS_RE.search(strip_ansi(self._pending)):
+            partial = PARTIAL_ANSI_RE.search(self._pending)
+            cut = partial.start() if partial else len(self._pending)
+            self._emit(self._pending[:cut], items)
+            self._pending = self._pending[cut:]
+        return items
+
+    def close(self) -> list:
+        """Flush whatever is left once the stream reaches EOF."""
+        items = []
+        self._emit(self._pending + self._decoder.decode(b"", final=True), items)
+        self._pending = ""
+        return items
+
+    def _emit(self, segment: str, items: list) -> None:
+        text = strip_ansi(segment).strip()
+        if not text:
+            return
+        event = parse_progress(text)
+        items.append(event if event else text)
+
+
+class ProgressDecoder:
+    """Decodes the --progress-fd channel into job-wide progress.
+
+    See progress_events.h for the event layout. Unlike print_progress()
+    frames, these events carry byte counts, so progress is aggregated over
+    the whole copy_directory() tree instead of a single part.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+        self.started = time.monotonic()
+        self.total_bytes = 0
+        self.total_files = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.file_done = 0
+        self.current = None
+        self.status = None
+
+    def feed(self, data: bytes) -> list[dict]:
+        """Consume raw bytes and return the complete events found in them."""
+        self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        events = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            self._apply(event)
+            events.append(event)
+        return events
+
+    def _apply(self, event: dict) -> None:
+        kind = event.get("ev")
+        if kind == "plan":
+            self.total_bytes = event["bytes"]
+            self.total_files = event["files"]
+        elif kind == "file":
+            self.current = event
+            self.file_done = 0
+        elif kind == "part":
+            self.file_done = event["file_done"]
+        elif kind == "end":
+            if self.current is not None:
+                self.bytes_done += self.current["size"]
+            self.files_done += 1
+            self.current = None
+            self.file_done = 0
+        elif kind == "done":
+            self.status = event["status"]
+
+    def snapshot(self) -> ProgressEvent:
+        """Build a ProgressEvent for the whole job from the events so far."""
+        done = self.bytes_done + self.file_done
+        elapsed = time.monotonic() - self.started
+        if self.status is not None:
+            percent = 100.0
+        elif self.total_bytes:
+            percent = min(100.0, done * 100 / self.total_bytes)
+        else:
+            percent = 0.0
+        speed_mbps = (done / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.total_bytes - done)
+        # Below 0.01 MB/s (shown as 0.00) the estimate is meaningless
+        eta = int(remaining / (speed_mbps * 1024 * 1024)) if speed_mbps >= 0.01 else 0
+        return ProgressEvent(
+            percent=percent,
+            speed_mbps=speed_mbps,
+            eta=eta,
+            elapsed=elapsed,
+            files_done=self.files_done,
+            files_total=self.total_files,
+        )
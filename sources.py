@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+cppp sources - The list of sources of the next transfer
+Expands glob patterns without a shell and measures every selected source
+on a thread pool, so the TUI can show the total size while the selection
+is still being built.
+"""
+
+import glob
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from preflight import SCAN_WORKERS
+
+# A source being measured reports its running total every this many entries
+REPORT_EVERY = 5000
+
+
+@dataclass
+class SourceSize:
+    """Size of one selected source; done is False while it is measured."""
+
+    total_bytes: int = 0
+    file_count: int = 0
+    done: bool = False
+    error: str = ""
+
+
+def expand_sources(text: str) -> tuple[list[str], list[str]]:
+    """Expand a typed source into paths.
+
+    Patterns with *, ? or [...] are matched like a shell would, hidden
+    files included only when the pattern asks for them. Returns the
+    paths and the patterns that matched nothing.
+    """
+    text = os.path.expanduser(text.strip())
+    if not text:
+        return [], []
+    if not glob.has_magic(text):
+        return [text], []
+    matches = sorted(glob.glob(text))
+    return (matches, []) if matches else ([], [text])
+
+
+def describe_sources(inputs: list[str], limit: int = 3) -> str:
+    """Short label of a job's sources for logs and the queue table."""
+    names = [os.path.basename(path.rstrip("/")) or path for path in inputs]
+    if len(names) <= limit:
+        return ", ".join(names)
+    return ", ".join(names[:limit]) + f" (+{len(names) - limit} kaynak)"
+
+
+class SizeAggregator:
+    """Measures selected sources concurrently.
+
+    on_update(path, SourceSize) is called from a worker thread whenever a
+    source's size grows or its measurement finishes.
+    """
+
+    def __init__(self, on_update, workers: int = SCAN_WORKERS):
+        self.on_update = on_update
+        self.sizes = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cppp-size")
+
+    def add(self, path: str) -> bool:
+        """Start measuring path; returns False if it is already listed."""
+        with self._lock:
+            if path in self.sizes:
+                return False
+            size = self.sizes[path] = SourceSize()
+        self._pool.submit(self._measure, path, size)
+        return True
+
+    def remove(self, path: str) -> None:
+        with self._lock:
+            self.sizes.pop(path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.sizes.clear()
+
+    @property
+    def paths(self) -> list[str]:
+        with self._lock:
+            return list(self.sizes)
+
+    @property
+    def measuring(self) -> bool:
+        with self._lock:
+            return any(not size.done for size in self.sizes.values())
+
+    def totals(self) -> tuple[int, int]:
+        """Return (bytes, files) of everything measured so far."""
+        with self._lock:
+            return (sum(size.total_bytes for size in self.sizes.values()),
+                    sum(size.file_count for size in self.sizes.values()))
+
+    def shutdown(self) -> None:
+        self.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _current(self, path: str, size: SourceSize) -> bool:
+        """A removed (or removed and re-added) source stops being measured."""
+        with self._lock:
+            return self.sizes.get(path) is size
+
+    def _measure(self, path: str, size: SourceSize) -> None:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            size.error = e.strerror or str(e)
+            size.done = True
+            self.on_update(path, size)
+            return
+        if not stat.S_ISDIR(st.st_mode):
+            size.total_bytes, size.file_count = st.st_size, 1
+            size.done = True
+            self.on_update(path, size)
+            return
+
+        pending = [path]
+        seen = 0
+        while pending:
+            if not self._current(path, size):
+                return
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                size.total_bytes += entry.stat(follow_symlinks=False).st_size
+                                size.file_count += 1
+                        except OSError:
+                            continue
+                        seen += 1
+                        if seen % REPORT_EVERY == 0:
+                            self.on_update(path, size)
+            except OSError:
+                continue
+        size.done = True
+        if self._current(path, size):
+            self.on_update(path, size)
@@ -2,7 +2,9 @@
 
 int main(int argc, char *argv[]) {
 	parser_options cli_options = parse_cli(argc, argv);
+	progress_events_init(cli_options.progress_fd);
 	ErrorCode status = init_process(cli_options);
+	emit_done(status);
 	if (status != ERR_OK) {
 		free(cli_options.input_files);
 		return status;
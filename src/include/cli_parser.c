@@ -11,7 +11,8 @@ void print_help_message() {
 	printf("  -h, --help           Display this help message.\n");
 	printf("  -v, --verbose        Enable verbose logging.\n");
 	printf("  -f --force           Enable overwriting on existing file.\n");
-	printf("  -V, --version        Show program version information.\n\n");
+	printf("  -V, --version        Show program version information.\n");
+	printf("      --progress-fd <fd> Write JSON-lines progress events to <fd>.\n\n");
 }
 
 int compare(const void *a, const void *b) {
@@ -33,6 +34,7 @@ parser_options parse_cli(int argc, char *argv[]) {
 	parser_options.verbose_mode = false;
 	parser_options.check_sha256 = false;
 	parser_options.overwrite = false;
+	parser_options.progress_fd = -1;
 
 	const char *short_options = "m:i:o:p:hcfvV";
 
@@ -54,6 +56,7 @@ parser_options parse_cli(int argc, char *argv[]) {
 		{"verbose", no_argument, 0, 'v'},
 		{"force", no_argument, 0, 'f'},
 		{"version", no_argument, 0, 'V'},
+		{"progress-fd", required_argument, 0, 'P'},
 		{0, 0, 0, 0}};
 
 	while ((option = getopt_long(argc, argv, short_options, long_options, &option_index)) != -1) {
@@ -95,6 +98,14 @@ parser_options parse_cli(int argc, char *argv[]) {
 					}
 				}
 				break;
+			case 'P':
+				errno = 0;
+				parser_options.progress_fd = strtol(optarg, &endptr, 10);
+				if (errno == ERANGE || endptr == optarg || parser_options.progress_fd < 0) {
+					print_err("Not a valid file descriptor. Please provide valid number (cli_parser.h)");
+					exit(EXIT_FAILURE);
+				}
+				break;
 			case 'c':
 				parser_options.check_sha256 = true;
 				break;
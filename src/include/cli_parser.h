@@ -4,6 +4,7 @@
 
 #include "file_info.h"
 #include "print_warns.h"
+#include "progress_events.h"
 #include <errno.h>
 #include <getopt.h>
 #include <stdbool.h>
@@ -22,6 +23,7 @@ typedef struct {
 		bool verbose_mode;
 		bool check_sha256;
 		bool overwrite;
+		int progress_fd;
 } parser_options;
 
 void print_help_message();
@@ -27,19 +27,23 @@ ErrorCode copy(const char *src, const char *dst, off_t num_parts, parser_options
 	if (cli_options.verbose_mode) {
 		print_info("'%s' -> '%s'", src_info.file_name, dst_info.file_name);
 	}
+	emit_file_start(src_info.file_name, dst_info.file_name, src_info.file_size, src_info.num_parts);
 
 	if (num_parts == 1) {
 		ErrorCode status = copy_full(fd_src, fd_dst, src_info, dst_info, cli_options);
 		if (status == ERR_COPY_FILE_FULL_FAIL) {
+			emit_file_end(ERR_COPY_FILE_FULL_FAIL);
 			return ERR_COPY_FILE_FULL_FAIL;
 		}
 	} else if (num_parts > 1) {
 		ErrorCode status = copy_part(fd_src, fd_dst, src_info, dst_info, cli_options);
 		if (status == ERR_COPY_FILE_PART_COPY) {
+			emit_file_end(ERR_COPY_FILE_PART_COPY);
 			return ERR_COPY_FILE_PART_COPY;
 		}
 	} else {
 		print_err("ERR_COPY_FILE_NOT_ALLOWED: num_parts cannot be less than 1");
+		emit_file_end(ERR_COPY_FILE_NOT_ALLOWED);
 		return ERR_COPY_FILE_NOT_ALLOWED;
 	}
 
@@ -64,9 +68,11 @@ ErrorCode copy(const char *src, const char *dst, off_t num_parts, parser_options
 			(strcmp(src_hash, dst_hash) == 0
 				 ? print_success("SHA256 Hash values are matched!")
 				 : print_failure("SHA256 Hash mismatch detected!"));
+			emit_verify(strcmp(src_hash, dst_hash) == 0);
 		}
 	}
 
+	emit_file_end(ERR_OK);
 	return ERR_OK;
 }
 
@@ -111,14 +117,15 @@ ErrorCode copy_part(int fd_src, int fd_dst, file_info src_info, file_info dst_in
 				gettimeofday(&current_time, NULL);
 				float since_last = time_diff(last_update, current_time);
 
-				if (cli_options.verbose_mode) {
-					if (since_last >= UPDATE_INTERVAL || part_written == total_size) {
+				if (since_last >= UPDATE_INTERVAL || part_written == total_size) {
+					if (cli_options.verbose_mode) {
 						float elapsed = time_diff(start_time, current_time);
 						float speed_MBps = (elapsed > 0) ? (part_written / (1024.0f * 1024.0f)) / elapsed : 0;
 						int eta_seconds = (speed_MBps > 0) ? (int)(total_size - part_written) / (speed_MBps * 1024 * 1024) : 0;
 						print_progress(total_size, part_written, speed_MBps, eta_seconds, elapsed);
-						last_update = current_time;
 					}
+					emit_part(i, src_info.num_parts, part_written, total_size, (i - 1) * part_size + part_written);
+					last_update = current_time;
 				}
 			}
 		} else {
@@ -149,14 +156,15 @@ ErrorCode copy_part(int fd_src, int fd_dst, file_info src_info, file_info dst_in
 				gettimeofday(&current_time, NULL);
 				float since_last = time_diff(last_update, current_time);
 
-				if (cli_options.verbose_mode) {
-					if (since_last >= UPDATE_INTERVAL || part_written == total_size) {
+				if (since_last >= UPDATE_INTERVAL || part_written == total_size) {
+					if (cli_options.verbose_mode) {
 						float elapsed = time_diff(start_time, current_time);
 						float speed_MBps = (elapsed > 0) ? (part_written / (1024.0f * 1024.0f)) / elapsed : 0;
 						int eta_seconds = (speed_MBps > 0) ? (int)(total_size - part_written) / (speed_MBps * 1024 * 1024) : 0;
 						print_progress(total_size, part_written, speed_MBps, eta_seconds, elapsed);
-						last_update = current_time;
 					}
+					emit_part(i, src_info.num_parts, part_written, total_size, (i - 1) * part_size + part_written);
+					last_update = current_time;
 				}
 			}
 		}
@@ -196,14 +204,15 @@ ErrorCode copy_full(int fd_src, int fd_dst, file_info src_info, file_info dst_in
 
 		gettimeofday(&current_time, NULL);
 		float since_last = time_diff(last_update, current_time);
-		if (cli_options.verbose_mode) {
-			if (since_last >= UPDATE_INTERVAL || total_written == total_size) {
+		if (since_last >= UPDATE_INTERVAL || total_written == total_size) {
+			if (cli_options.verbose_mode) {
 				float elapsed = time_diff(start_time, current_time);
 				float speed_MBps = (elapsed > 0) ? (total_written / (1024.0f * 1024.0f)) / elapsed : 0;
 				int eta_seconds = (speed_MBps > 0) ? (int)(total_size - total_written) / (speed_MBps * 1024 * 1024) : 0;
 				print_progress(total_size, total_written, speed_MBps, eta_seconds, elapsed);
-				last_update = current_time;
 			}
+			emit_part(1, 1, total_written, total_size, total_written);
+			last_update = current_time;
 		}
 	}
 
@@ -22,6 +22,15 @@ ErrorCode init_process(parser_options cli_options) {
 			}
 		}
 
+		if (progress_events_enabled()) {
+			off_t total_bytes = 0;
+			long total_files = 0;
+			for (int i = 0; i < cli_options.input_count; i++) {
+				count_tree(cli_options.input_files[i], &total_bytes, &total_files);
+			}
+			emit_plan(total_bytes, total_files);
+		}
+
 		for (int i = 0; i < cli_options.input_count; i++) {
 			file_info src_info = get_file_info(cli_options.input_files[i], 1);
 			file_info dst_info = get_file_info(cli_options.output, 1);
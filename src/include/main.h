@@ -9,6 +9,7 @@
 #include "init_process.h"
 #include "insert.h"
 #include "merge.h"
+#include "progress_events.h"
 #include "replace.h"
 #include "select_and_merge.h"
 #include "sha256.h"
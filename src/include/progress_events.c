@@ -0,0 +1,99 @@
+#include "progress_events.h"
+
+static int events_fd = -1;
+static int current_file = 0;
+
+void progress_events_init(int fd) {
+	events_fd = fd;
+}
+
+bool progress_events_enabled() {
+	return events_fd >= 0;
+}
+
+static void write_json_string(const char *text) {
+	char buffer[PATH_MAX * 2 + 3];
+	size_t pos = 0;
+
+	buffer[pos++] = '"';
+	for (const unsigned char *p = (const unsigned char *)text; *p && pos < sizeof(buffer) - 8; p++) {
+		if (*p == '"' || *p == '\\') {
+			buffer[pos++] = '\\';
+			buffer[pos++] = *p;
+		} else if (*p < 0x20) {
+			pos += snprintf(buffer + pos, sizeof(buffer) - pos, "\\u%04x", *p);
+		} else {
+			buffer[pos++] = *p;
+		}
+	}
+	buffer[pos++] = '"';
+	write(events_fd, buffer, pos);
+}
+
+void count_tree(const char *path, off_t *total_bytes, long *total_files) {
+	struct stat st;
+	if (stat(path, &st) != 0) {
+		return;
+	}
+
+	if (S_ISREG(st.st_mode)) {
+		*total_bytes += st.st_size;
+		(*total_files)++;
+		return;
+	}
+
+	if (!S_ISDIR(st.st_mode)) {
+		return;
+	}
+
+	DIR *dir = opendir(path);
+	if (!dir) {
+		return;
+	}
+
+	struct dirent *entry;
+	char child[PATH_MAX];
+	while ((entry = readdir(dir)) != NULL) {
+		if (strcmp(entry->d_name, ".") == 0 || strcmp(entry->d_name, "..") == 0)
+			continue;
+		snprintf(child, sizeof(child), "%s/%s", path, entry->d_name);
+		count_tree(child, total_bytes, total_files);
+	}
+	closedir(dir);
+}
+
+void emit_plan(off_t total_bytes, long total_files) {
+	if (events_fd < 0) return;
+	dprintf(events_fd, "{\"ev\":\"plan\",\"files\":%ld,\"bytes\":%lld}\n", total_files, (long long)total_bytes);
+}
+
+void emit_file_start(const char *src, const char *dst, off_t size, unsigned int num_parts) {
+	if (events_fd < 0) return;
+	current_file++;
+	dprintf(events_fd, "{\"ev\":\"file\",\"id\":%d,\"src\":", current_file);
+	write_json_string(src);
+	dprintf(events_fd, ",\"dst\":");
+	write_json_string(dst);
+	dprintf(events_fd, ",\"size\":%lld,\"parts\":%u}\n", (long long)size, num_parts);
+}
+
+void emit_part(int part, unsigned int num_parts, off_t part_done, off_t part_size, off_t file_done) {
+	if (events_fd < 0) return;
+	dprintf(events_fd, "{\"ev\":\"part\",\"id\":%d,\"part\":%d,\"parts\":%u,\"part_done\":%lld,\"part_size\":%lld,\"file_done\":%lld}\n",
+			current_file, part, num_parts, (long long)part_done, (long long)part_size, (long long)file_done);
+}
+
+void emit_verify(bool match) {
+	if (events_fd < 0) return;
+	dprintf(events_fd, "{\"ev\":\"verify\",\"id\":%d,\"match\":%s}\n", current_file, match ? "true" : "false");
+}
+
+void emit_file_end(int status) {
+	if (events_fd < 0) return;
+	dprintf(events_fd, "{\"ev\":\"end\",\"id\":%d,\"status\":%d}\n", current_file, status);
+}
+
+void emit_done(int status) {
+	if (events_fd < 0) return;
+	dprintf(events_fd, "{\"ev\":\"done\",\"status\":%d}\n", status);
+}
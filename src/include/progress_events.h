@@ -0,0 +1,35 @@
+#ifndef PROGRESS_EVENTS
+#define PROGRESS_EVENTS
+
+#include <dirent.h>
+#include <limits.h>
+#include <stdbool.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/stat.h>
+#include <sys/types.h>
+#include <unistd.h>
+
+/*
+	JSON-lines progress channel (--progress-fd <fd>).
+	One object per line, keys always in this order:
+
+	{"ev":"plan","files":N,"bytes":B}
+	{"ev":"file","id":I,"src":"...","dst":"...","size":S,"parts":P}
+	{"ev":"part","id":I,"part":K,"parts":P,"part_done":D,"part_size":Z,"file_done":F}
+	{"ev":"verify","id":I,"match":true|false}
+	{"ev":"end","id":I,"status":E}
+	{"ev":"done","status":E}
+*/
+
+void progress_events_init(int fd);
+bool progress_events_enabled();
+void count_tree(const char *path, off_t *total_bytes, long *total_files);
+void emit_plan(off_t total_bytes, long total_files);
+void emit_file_start(const char *src, const char *dst, off_t size, unsigned int num_parts);
+void emit_part(int part, unsigned int num_parts, off_t part_done, off_t part_size, off_t file_done);
+void emit_verify(bool match);
+void emit_file_end(int status);
+void emit_done(int status);
+
+#endif
@@ -0,0 +1,134 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dest_index import open_index
+from engine import SMALL_FILE_THRESHOLD, CopyEngine, EngineOptions
+
+
+def test_direct_io_verifies_small_files(tmp_path):
+    # Directories send files below the threshold through the small file batch
+    src = tmp_path / "src"
+    src.mkdir()
+    data = {f"f{i}": os.urandom(min(SMALL_FILE_THRESHOLD // 2, 5000)) for i in range(3)}
+    for name, content in data.items():
+        (src / name).write_bytes(content)
+    out = tmp_path / "out"
+
+    engine = CopyEngine(EngineOptions(direct_io=True, check_sha256=True))
+    assert engine.run([str(src)], str(out)) == 0
+    for name, content in data.items():
+        assert (out / name).read_bytes() == content
+
+
+def _make_tree(root, sizes):
+    root.mkdir()
+    data = {}
+    for name, size in sizes.items():
+        data[name] = os.urandom(size)
+        (root / name).write_bytes(data[name])
+    return data
+
+
+def test_move_within_filesystem_renames(tmp_path):
+    src = tmp_path / "src"
+    data = _make_tree(src, {"a": 5000, "b": 3 * SMALL_FILE_THRESHOLD})
+    out = tmp_path / "out"
+
+    engine = CopyEngine(EngineOptions(move=True))
+    assert engine.run([str(src)], str(out)) == 0
+    assert not src.exists()
+    for name, content in data.items():
+        assert (out / name).read_bytes() == content
+
+
+def test_move_across_filesystems_verifies_then_deletes(tmp_path, monkeypatch):
+    # rename(2) failing stands in for EXDEV
+    monkeypatch.setattr(CopyEngine, "_rename", lambda self, src, dst: False)
+    src = tmp_path / "src"
+    data = _make_tree(src, {"a": 5000, "b": 3 * SMALL_FILE_THRESHOLD})
+    out = tmp_path / "out"
+
+    engine = CopyEngine(EngineOptions(move=True))
+    assert engine.options.check_sha256
+    assert engine.run([str(src)], str(out)) == 0
+    for name, content in data.items():
+        assert not (src / name).exists()
+        assert (out / name).read_bytes() == content
+
+
+def _truncate(path):
+    os.truncate(path, os.path.getsize(path) // 2)
+
+
+def _overwrite(path):
+    with open(path, "r+b") as f:
+        f.write(b"\0" * 16)
+
+
+@pytest.mark.parametrize("damage", [_truncate, _overwrite])
+def test_move_keeps_source_of_damaged_copy(tmp_path, monkeypatch, damage):
+    monkeypatch.setattr(CopyEngine, "_rename", lambda self, src, dst: False)
+    schedule_verify = CopyEngine._schedule_verify
+
+    def damage_then_verify(self, src, dst, src_stat, parts):
+        # Damage the copy after it was written, before it is read back
+        damage(dst)
+        schedule_verify(self, src, dst, src_stat, parts)
+
+    monkeypatch.setattr(CopyEngine, "_schedule_verify", damage_then_verify)
+    src = tmp_path / "src"
+    data = _make_tree(src, {"a": 5000, "b": 3 * SMALL_FILE_THRESHOLD})
+    out = tmp_path / "out"
+
+    engine = CopyEngine(EngineOptions(move=True))
+    assert engine.run([str(src)], str(out)) == len(data)
+    for name, content in data.items():
+        assert (src / name).read_bytes() == content
+
+
+def test_sync_with_checksum_skips_unchanged_mid_size_file(tmp_path):
+    # Above the small file threshold but below the block delta size
+    src = tmp_path / "src"
+    data = _make_tree(src, {"mid": 4 * SMALL_FILE_THRESHOLD})
+    out = tmp_path / "out"
+    options = EngineOptions(sync=True, check_sha256=True, verbose=True)
+    assert CopyEngine(options).run([str(src)], str(out)) == 0
+
+    lines = []
+    assert CopyEngine(options, on_log=lines.append).run([str(src)], str(out)) == 0
+    assert any("unchanged, skipped" in line for line in lines)
+    assert (out / "mid").read_bytes() == data["mid"]
+
+
+def test_copy_without_usable_cache(tmp_path, monkeypatch):
+    # A file where the cache directory should be makes the index unusable
+    (tmp_path / "cache").write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    src = tmp_path / "src"
+    data = _make_tree(src, {"a": 5000})
+    out = tmp_path / "out"
+
+    for options in (EngineOptions(), EngineOptions(sync=True)):
+        assert CopyEngine(options).run([str(src)], str(out)) == 0
+        assert (out / "a").read_bytes() == data["a"]
+
+
+def test_incomplete_run_leaves_listings_stale(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "old").write_text("")
+
+    engine = CopyEngine(EngineOptions(sync=True))
+    engine._index = open_index(str(out))
+    engine._index.listing(str(out))
+    engine._listed.add(str(out))
+    # Changed by someone else while the run was going
+    (out / "old").unlink()
+    engine._flush_index(complete=False)
+
+    assert "old" not in open_index(str(out)).listing(str(out))
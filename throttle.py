@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+cppp throttle - Bandwidth and IOPS limits shared by the copy workers
+Every worker of a run takes bytes and operations from the same pair of
+token buckets before it touches the disks. The limits can be changed
+while a run is going, follow a time-of-day schedule and shrink on their
+own while the observed write latency is well above its usual level.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict
+
+from paths import cache_dir
+from preflight import format_size
+
+SETTINGS_FILE = "throttle.json"
+# A bucket saves up at most this many seconds of its rate while idle
+BURST_SECONDS = 0.25
+# Longest single wait, so limit changes and cancellation are seen quickly
+MAX_WAIT = 0.1
+# Back-pressure: the limits are re-evaluated this often ...
+ADJUST_INTERVAL = 1.0
+# ... from a moving average of write latency with this weight per call;
+# the baseline is the lowest average seen, drifting up this much per check
+LATENCY_WEIGHT = 0.1
+BASELINE_DRIFT = 0.02
+# Back off while the average is this many times the baseline
+BACKOFF_RATIO = 2.0
+BACKOFF_STEP = 0.7
+RECOVER_STEP = 1.1
+MIN_FACTOR = 0.1
+
+UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+RATE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?(?:/S)?\s*$", re.IGNORECASE)
+RULE_RE = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?\s*=\s*([^/]*?)\s*(?:/\s*(\d+)\s*)?$")
+
+
+def parse_rate(text: str) -> int:
+    """Parse a byte rate like "50M", "1.5G" or "800K"; empty or 0 means no limit."""
+    if not text.strip():
+        return 0
+    match = RATE_RE.match(text)
+    if not match:
+        raise ValueError(f"geçersiz hız: '{text.strip()}'")
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def format_rate(rate: float) -> str:
+    return format_size(rate) + "/s"
+
+
+@dataclass
+class ScheduleRule:
+    """Limits in force from start to end, in minutes after midnight."""
+
+    start: int
+    end: int
+    bytes_per_sec: int = 0
+    ops_per_sec: int = 0
+
+    def covers(self, minute: int) -> bool:
+        if self.start <= self.end:
+            return self.start <= minute < self.end
+        # Past midnight, e.g. 22:00-06:00
+        return minute >= self.start or minute < self.end
+
+
+def parse_schedule(text: str) -> list[ScheduleRule]:
+    """Parse rules like "09:00-18:00=20M/100; 18-24=0", first match wins.
+
+    After '=' comes the byte rate and, after '/', the operations per
+    second; 0 lifts that limit for the period.
+    """
+    rules = []
+    for entry in re.split(r"[;,]", text):
+        if not entry.strip():
+            continue
+        match = RULE_RE.match(entry)
+        if not match:
+            raise ValueError(f"geçersiz plan: '{entry.strip()}'")
+        start_h, start_m, end_h, end_m, rate, ops = match.groups()
+        start = int(start_h) * 60 + int(start_m or 0)
+        end = int(end_h) * 60 + int(end_m or 0)
+        if start > 24 * 60 or end > 24 * 60:
+            raise ValueError(f"geçersiz saat: '{entry.strip()}'")
+        rules.append(ScheduleRule(start, end, parse_rate(rate), int(ops or 0)))
+    return rules
+
+
+@dataclass
+class ThrottleSettings:
+    """Limits chosen in the TUI; 0 means unlimited."""
+
+    bytes_per_sec: int = 0
+    ops_per_sec: int = 0
+    # Text of parse_schedule(), overriding the limits above while a rule covers now
+    schedule: str = ""
+    backoff: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.bytes_per_sec or self.ops_per_sec or self.schedule.strip() or self.backoff)
+
+
+def _settings_path() -> str:
+    return os.path.join(cache_dir(), SETTINGS_FILE)
+
+
+def load_settings() -> ThrottleSettings:
+    try:
+        with open(_settings_path()) as f:
+            settings = ThrottleSettings(**json.load(f))
+        parse_schedule(settings.schedule)
+        return settings
+    except (OSError, ValueError, TypeError):
+        return ThrottleSettings()
+
+
+def save_settings(settings: ThrottleSettings) -> None:
+    path = _settings_path()
+    with open(path + ".tmp", "w") as f:
+        json.dump(asdict(settings), f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+class TokenBucket:
+    """A thread-safe token bucket whose rate may change at any time.
+
+    Callers reserve their tokens in arrival order and wait until the
+    tokens paid in at the current rate reach their reservation.
+    """
+
+    def __init__(self, rate: float = 0.0):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self._issued = 0.0
+        self._paid = 0.0
+        self._stamp = time.monotonic()
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            if rate <= 0:
+                # Lifting the limit releases every waiter at once
+                self._paid = self._issued
+            self.rate = rate
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self._paid = min(self._paid + (now - self._stamp) * self.rate,
+                             self._issued + self.rate * BURST_SECONDS)
+        else:
+            self._paid = self._issued
+        self._stamp = now
+
+    def take(self, count: float, cancelled=None) -> None:
+        """Wait until count tokens are available; returns early once cancelled() is true."""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            self._refill(time.monotonic())
+            self._issued += count
+            position = self._issued
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._paid >= position or self.rate <= 0:
+                    return
+                delay = (position - self._paid) / self.rate
+            if cancelled and cancelled():
+                return
+            time.sleep(min(delay, MAX_WAIT))
+
+
+class Throttle:
+    """Byte and operation limits of every running job, shared by their workers.
+
+    The TUI changes them with apply() at any time; acquire() and
+    observe() are called from copy workers.
+    """
+
+    def __init__(self, settings: ThrottleSettings = None):
+        self._lock = threading.Lock()
+        self.bytes = TokenBucket()
+        self.ops = TokenBucket()
+        self.settings = ThrottleSettings()
+        self._rules = []
+        # Back-pressure state: latency average and baseline in seconds,
+        # the limit multiplier and the throughput it was applied to
+        self.factor = 1.0
+        self._latency = None
+        self._baseline = None
+        self._reference = 0.0
+        self._window_bytes = 0
+        self._window_start = time.monotonic()
+        self._checked = 0.0
+        self.apply(settings or ThrottleSettings())
+
+    def apply(self, settings: ThrottleSettings) -> None:
+        """Use new settings; raises ValueError for an invalid schedule."""
+        rules = parse_schedule(settings.schedule)
+        with self._lock:
+            self.settings = settings
+            self._rules = rules
+            if not settings.backoff:
+                self.factor = 1.0
+            self._update(time.monotonic())
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled
+
+    def limits(self) -> tuple[int, int]:
+        """(bytes/s, ops/s) the settings ask for right now, before back-off."""
+        now = time.localtime()
+        minute = now.tm_hour * 60 + now.tm_min
+        for rule in self._rules:
+            if rule.covers(minute):
+                return rule.bytes_per_sec, rule.ops_per_sec
+        return self.settings.bytes_per_sec, self.settings.ops_per_sec
+
+    def acquire(self, count: int, cancelled=None) -> None:
+        """Wait for one operation and count bytes of budget."""
+        now = time.monotonic()
+        if now - self._checked >= ADJUST_INTERVAL:
+            with self._lock:
+                if now - self._checked >= ADJUST_INTERVAL:
+                    self._update(now)
+        self.ops.take(1, cancelled)
+        self.bytes.take(count, cancelled)
+
+    def observe(self, seconds: float, count: int) -> None:
+        """Account one write (or in-kernel copy) of count bytes taking seconds."""
+        with self._lock:
+            self._window_bytes += count
+            if self._latency is None:
+                self._latency = seconds
+            else:
+                self._latency += (seconds - self._latency) * LATENCY_WEIGHT
+
+    def _update(self, now: float) -> None:
+        """Recompute the bucket rates from the schedule and back-pressure."""
+        elapsed = max(now - self._window_start, 1e-6)
+        throughput = self._window_bytes / elapsed
+        self._window_bytes = 0
+        self._window_start = now
+        self._checked = now
+        if self.settings.backoff and self._latency is not None:
+            if self._baseline is None or self._latency < self._baseline:
+                self._baseline = self._latency
+            else:
+                self._baseline += (self._latency - self._baseline) * BASELINE_DRIFT
+            if self._latency > self._baseline * BACKOFF_RATIO:
+                if self.factor == 1.0:
+                    self._reference = throughput
+                self.factor = max(MIN_FACTOR, self.factor * BACKOFF_STEP)
+            else:
+                self.factor = min(1.0, self.factor * RECOVER_STEP)
+        byte_limit, op_limit = self.limits()
+        if self.factor < 1.0:
+            # Without a byte limit, back off from the throughput seen when it started
+            byte_limit = (byte_limit or self._reference) * self.factor
+            op_limit *= self.factor
+        self.bytes.set_rate(byte_limit)
+        self.ops.set_rate(op_limit)
+
+    def describe(self) -> str:
+        """Short Turkish label of the limits in force, empty when there are none."""
+        parts = []
+        if self.bytes.rate > 0:
+            parts.append(format_rate(self.bytes.rate))
+        if self.ops.rate > 0:
+            parts.append(f"{self.ops.rate:.0f} işlem/sn")
+        if not parts:
+            return ""
+        text = "sınır " + ", ".join(parts)
+        if self.factor < 1.0:
+            text += f" (geri çekilme x{self.factor:.2f})"
+        return text
@@ -6,21 +6,243 @@ A better version of cp with parallel processing support
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical, Center
-from textual.widgets import Header, Footer, Button, Static, Input, Checkbox, Log, Label, DirectoryTree, RadioButton, RadioSet
+from textual.widgets import Header, Footer, Button, Static, Input, Checkbox, Log, Label, RadioButton, RadioSet, ProgressBar, DataTable
 from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
 from textual.screen import ModalScreen
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 from textual import on
+from rich.segment import Segment
+from rich.style import Style
+from functools import partial
 import subprocess
 import asyncio
 import os
+import shlex
+import threading
+import time
 from pathlib import Path
 
+from binary import describe as describe_binary, discover
+from dir_listing import Entry, iter_pages, listing_cache, sort_entries
+
+from engine import EngineError, planned_destinations
+from journal import Journal, has_journal
+from jobs import PARTS_MODES, JobSpec, JobScheduler, DONE, PAUSED, build_command, find_binary, pause_process, run_binary, run_engine
+from log_buffer import LogBuffer
+from metrics import SAMPLE_INTERVAL, MetricsRecorder, export_summary, sparkline
+from metrics import summarize as summarize_metrics
+from parts import parse_selection
+from preflight import format_size, scan, summarize
+from sources import SizeAggregator, describe_sources, expand_sources
+from throttle import Throttle, ThrottleSettings, load_settings, parse_rate, save_settings
+from tuning import DEFAULT_PARTS, describe, tune
+from progress import format_duration
+
+# Progress bar and speed readout refresh rate (seconds)
+PROGRESS_REFRESH = 0.1
+# Seconds without a progress event before a copy is shown as stalled
+STALL_AFTER = 3.0
+# Batched log flush rate (seconds) and lines kept in the Log widget
+LOG_FLUSH_INTERVAL = 0.1
+LOG_MAX_LINES = 5000
+# Log names of the Parça mode operations
+PARTS_LABELS = {"split": "Böl", "merge": "Birleştir", "select-merge": "Ayıkla"}
+# Modes cli_parser.c does not know, run on the Python engine instead
+ENGINE_ONLY_MODES = {
+    "sync": "Senkronizasyon Python motoruyla yapılır.",
+    "move": "Taşıma Python motoruyla yapılır.",
+}
+
+
+def _count_entries(entries) -> int:
+    return sum(1 for entry in entries if entry.name != "..")
+
+
+class EntryList(ScrollView, can_focus=True):
+    """Virtualized list of directory entries; only visible rows are rendered."""
+
+    BINDINGS = [
+        Binding("up", "cursor(-1)", show=False),
+        Binding("down", "cursor(1)", show=False),
+        Binding("pageup", "page(-1)", show=False),
+        Binding("pagedown", "page(1)", show=False),
+        Binding("home", "cursor(-1000000000)", show=False),
+        Binding("end", "cursor(1000000000)", show=False),
+        Binding("enter", "open", show=False),
+        Binding("space", "toggle", show=False),
+        Binding("backspace", "parent", show=False),
+    ]
+
+    ROW_STYLE = Style(color="#d3c6aa", bgcolor="#232a2e")
+    CURSOR_STYLE = Style(color="#2b3339", bgcolor="#a7c080", bold=True)
+    SELECTED_STYLE = Style(color="#dbbc7f", bgcolor="#232a2e", bold=True)
+
+    class Opened(Message):
+        """Enter was pressed on an entry."""
+
+        def __init__(self, entry: Entry):
+            super().__init__()
+            self.entry = entry
+
+    class Changed(Message):
+        """The cursor or the selection changed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entries = []
+        self.shown = []
+        # Entries other than ".." in entries and shown, kept up to date so
+        # the status line never walks a huge listing
+        self.total_count = 0
+        self.shown_count = 0
+        self.selected = {}
+        self.cursor = 0
+        self.filter_text = ""
+        self.multiple = True
+
+    def clear(self) -> None:
+        self.entries = []
+        self.shown = []
+        self.total_count = self.shown_count = 0
+        self.cursor = 0
+        self._refresh_size()
+
+    def add_entries(self, page: list[Entry]) -> None:
+        """Append a page from the background listing, filtered as it arrives."""
+        shown = [entry for entry in page if self._matches(entry)]
+        self.entries.extend(page)
+        self.shown.extend(shown)
+        self.total_count += _count_entries(page)
+        self.shown_count += _count_entries(shown)
+        self._refresh_size()
+
+    def set_entries(self, entries: list[Entry]) -> None:
+        """Replace everything, e.g. with the sorted complete listing."""
+        current = self.current
+        self.entries = list(entries)
+        self.shown = [entry for entry in self.entries if self._matches(entry)]
+        self.total_count = _count_entries(self.entries)
+        self.shown_count = _count_entries(self.shown)
+        self.cursor = next((i for i, entry in enumerate(self.shown)
+                            if current is not None and entry.path == current.path), 0)
+        self._refresh_size()
+        self.scroll_to_region(Region(0, self.cursor, 1, 1), animate=False)
+
+    def set_filter(self, text: str) -> None:
+        text = text.lower()
+        if text.startswith(self.filter_text):
+            # Narrowing: only the visible rows can still match
+            source = self.shown
+        else:
+            source = self.entries
+        self.filter_text = text
+        self.shown = [entry for entry in source if self._matches(entry)]
+        self.shown_count = _count_entries(self.shown)
+        self.cursor = 0
+        self._refresh_size()
+        self.scroll_home(animate=False)
+
+    @property
+    def current(self):
+        return self.shown[self.cursor] if self.cursor < len(self.shown) else None
+
+    def _matches(self, entry: Entry) -> bool:
+        return entry.name == ".." or not self.filter_text or self.filter_text in entry.name.lower()
+
+    def _refresh_size(self) -> None:
+        """Resize to the shown rows; called once per page or listing change."""
+        self.virtual_size = Size(self.size.width, max(1, len(self.shown)))
+        self.refresh()
+        self.post_message(self.Changed())
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        if index >= len(self.shown):
+            return Strip.blank(width, self.ROW_STYLE)
+        entry = self.shown[index]
+        mark = "[x]" if entry.path in self.selected else "[ ]"
+        if entry.name == "..":
+            mark = "   "
+        text = f" {mark} {'📁' if entry.is_dir else '📄'} {entry.name}"
+        if index == self.cursor:
+            style = self.CURSOR_STYLE
+        elif entry.path in self.selected:
+            style = self.SELECTED_STYLE
+        else:
+            style = self.ROW_STYLE
+        return Strip([Segment(text, style)]).crop_extend(scroll_x, scroll_x + width, style)
+
+    def action_cursor(self, delta: int) -> None:
+        if not self.shown:
+            return
+        self.cursor = max(0, min(len(self.shown) - 1, self.cursor + delta))
+        self.scroll_to_region(Region(0, self.cursor, 1, 1), animate=False)
+        self.refresh()
+        self.post_message(self.Changed())
+
+    def action_page(self, direction: int) -> None:
+        self.action_cursor(direction * max(1, self.size.height - 1))
+
+    def action_open(self) -> None:
+        if self.current is not None:
+            self.post_message(self.Opened(self.current))
+
+    def action_toggle(self) -> None:
+        entry = self.current
+        if entry is None or entry.name == "..":
+            return
+        if entry.path in self.selected:
+            del self.selected[entry.path]
+        else:
+            if not self.multiple:
+                self.selected.clear()
+            self.selected[entry.path] = entry
+        self.refresh()
+        self.action_cursor(1)
+
+    def action_parent(self) -> None:
+        if self.shown and self.shown[0].name == "..":
+            self.post_message(self.Opened(self.shown[0]))
+
+    def on_click(self, event) -> None:
+        index = self.scroll_offset.y + event.y
+        if index < len(self.shown):
+            if index == self.cursor and event.chain > 1:
+                self.action_open()
+            self.cursor = index
+            self.refresh()
+            self.post_message(self.Changed())
+
+
+class SourceTable(DataTable):
+    """The source list of the main form."""
+
+    BINDINGS = [
+        Binding("delete,backspace", "app.remove_source", "Çıkar", show=False),
+    ]
+
+
+class FilePickerScreen(ModalScreen):
+    """A modal screen for picking files and directories.
+
+    Directories are listed on a worker thread page by page, so even huge
+    ones can be browsed while they are being read. With multiple=True the
+    result is a list of paths, otherwise a single path.
+    """
 
     BINDINGS = [
         Binding("x", "btn_select", "Seç", show=False),
         Binding("escape,z", "btn_cancel", "İptal", show=False),
+        Binding("slash,f", "focus_filter", "Filtre", show=False),
     ]
 
+    AUTO_FOCUS = "EntryList"
+
     CSS = """
     FilePickerScreen {
         align: center middle;
@@ -28,7 +250,7 @@ from pathlib import Path
 
     #picker-container {
         width: 80;
-        height: 30;
+        height: 34;
         background: #2b3339;
         border: thick #a7c080;
     }
@@ -49,12 +271,22 @@ from pathlib import Path
         content-align: left middle;
     }
 
-    DirectoryTree {
+    #picker-filter {
+        margin: 0 1;
+    }
+
+    EntryList {
         height: 1fr;
         background: #232a2e;
         scrollbar-gutter: stable;
     }
 
+    #picker-status {
+        height: 1;
+        padding: 0 2;
+        color: #859289;
+    }
+
     #picker-buttons {
         height: 4;
         align: center middle;
@@ -67,42 +299,130 @@ from pathlib import Path
     }
     """
 
-    def __init__(self, title: str = "Dosya/Klasör Seç", start_path: str = "."):
+    def __init__(self, title: str = "Dosya/Klasör Seç", start_path: str = ".", multiple: bool = False):
         super().__init__()
         self.picker_title = title
+        start_path = os.path.abspath(start_path or ".")
+        if not os.path.isdir(start_path):
+            start_path = os.path.dirname(start_path)
+        while not os.path.isdir(start_path):
+            start_path = os.path.dirname(start_path)
         self.start_path = start_path
-        self.selected_path = None
+        self.current_dir = start_path
+        self.multiple = multiple
+        self.reading = False
+        self._generation = 0
 
     def compose(self) -> ComposeResult:
         with Container(id="picker-container"):
             yield Static(self.picker_title, id="picker-title")
-            yield Static(f"📂 {os.path.abspath(self.start_path)}", id="picker-path")
-            yield DirectoryTree(self.start_path, id="file_tree")
+            yield Static(f"📂 {self.start_path}", id="picker-path")
+            yield Input(placeholder="Filtre: yazdıkça süzülür ( / )", id="picker-filter")
+            yield EntryList(id="file_list")
+            yield Static("", id="picker-status", markup=False)
             with Horizontal(id="picker-buttons"):
                 yield Button("✓ Seç", id="btn_select", variant="success")
                 yield Button("✗ İptal", id="btn_cancel", variant="error")
 
-    @on(DirectoryTree.FileSelected)
-    def on_file_selected(self, event: DirectoryTree.FileSelected) -> None:
-        """Update selected path when file is clicked."""
-        self.selected_path = str(event.path)
-        path_display = self.query_one("#picker-path", Static)
-        path_display.update(f"📄 {self.selected_path}")
+    def on_mount(self) -> None:
+        entries = self.query_one("#file_list", EntryList)
+        entries.multiple = self.multiple
+        self.open_directory(self.start_path)
+
+    def open_directory(self, path: str) -> None:
+        """Show path, from the cache or by listing it in the background."""
+        self._generation += 1
+        self.current_dir = path
+        self.query_one("#picker-filter", Input).value = ""
+        entries = self.query_one("#file_list", EntryList)
+        entries.filter_text = ""
+        entries.clear()
+        self.query_one("#picker-path", Static).update(f"📂 {path}")
+        parent = os.path.dirname(path)
+        head = [Entry("..", parent, True)] if parent != path else []
+        cached = listing_cache.get(path)
+        if cached is not None:
+            entries.set_entries(head + cached)
+            self.reading = False
+        else:
+            entries.add_entries(head)
+            self.reading = True
+            self.run_worker(partial(self._list_directory, path, self._generation, head),
+                            thread=True, group="listing")
+        self.update_status()
+
+    def _list_directory(self, path: str, generation: int, head: list) -> None:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            listed = []
+            for page in iter_pages(path):
+                if generation != self._generation:
+                    return
+                listed.extend(page)
+                self.app.call_from_thread(self._add_page, generation, page)
+        except OSError as e:
+            self.app.call_from_thread(self._listing_failed, generation, e)
+            return
+        listed = sort_entries(listed)
+        listing_cache.put(path, mtime_ns, listed)
+        self.app.call_from_thread(self._listing_done, generation, head + listed)
+
+    def _add_page(self, generation: int, page: list) -> None:
+        if generation == self._generation:
+            self.query_one("#file_list", EntryList).add_entries(page)
+
+    def _listing_done(self, generation: int, entries: list) -> None:
+        if generation == self._generation:
+            self.reading = False
+            self.query_one("#file_list", EntryList).set_entries(entries)
+
+    def _listing_failed(self, generation: int, error: OSError) -> None:
+        if generation == self._generation:
+            self.reading = False
+            self.query_one("#picker-status", Static).update(f"❌ Okunamadı: {error.strerror}")
+
+    @on(EntryList.Changed)
+    def update_status(self) -> None:
+        entries = self.query_one("#file_list", EntryList)
+        total, shown = entries.total_count, entries.shown_count
+        parts = [f"{shown}/{total} öğe" if entries.filter_text else f"{total} öğe"]
+        if entries.selected:
+            parts.append(f"{len(entries.selected)} seçili")
+        if self.reading:
+            parts.append("yükleniyor…")
+        keys = "[Boşluk] seç  [Enter] aç" if self.multiple else "[Enter] aç"
+        self.query_one("#picker-status", Static).update(" • ".join(parts) + f"   {keys}")
+
+    @on(EntryList.Opened)
+    def on_entry_opened(self, event: EntryList.Opened) -> None:
+        """Enter a directory, or pick a file."""
+        if event.entry.is_dir:
+            self.open_directory(event.entry.path)
+        elif self.multiple:
+            self.query_one("#file_list", EntryList).action_toggle()
+        else:
+            self.dismiss(event.entry.path)
+
+    @on(Input.Changed, "#picker-filter")
+    def on_filter_changed(self, event: Input.Changed) -> None:
+        self.query_one("#file_list", EntryList).set_filter(event.value)
 
-    @on(DirectoryTree.DirectorySelected)
-    def on_directory_selected(self, event: DirectoryTree.DirectorySelected) -> None:
-        """Update selected path when directory is clicked."""
-        self.selected_path = str(event.path)
-        path_display = self.query_one("#picker-path", Static)
-        path_display.update(f"📂 {self.selected_path}")
+    @on(Input.Submitted, "#picker-filter")
+    def on_filter_submitted(self) -> None:
+        self.query_one("#file_list", EntryList).focus()
+
+    def action_focus_filter(self) -> None:
+        self.query_one("#picker-filter", Input).focus()
 
     @on(Button.Pressed, "#btn_select")
     def on_select(self) -> None:
-        """Select the current path."""
-        if self.selected_path:
-            self.dismiss(self.selected_path)
-        else:
-            self.dismiss(os.path.abspath(self.start_path))
+        """Select the marked entries, or the entry under the cursor."""
+        entries = self.query_one("#file_list", EntryList)
+        paths = list(entries.selected)
+        if not paths:
+            current = entries.current
+            paths = [current.path if current is not None and current.name != ".." else self.current_dir]
+        self.dismiss(paths if self.multiple else paths[0])
 
     @on(Button.Pressed, "#btn_cancel")
     def on_cancel(self) -> None:
@@ -118,6 +438,327 @@ from pathlib import Path
         self.on_cancel()
 
 
+class JobQueueScreen(ModalScreen):
+    """A modal screen listing queued transfers and their throughput."""
+
+    BINDINGS = [
+        Binding("u", "move_up", "Yukarı", show=False),
+        Binding("d", "move_down", "Aşağı", show=False),
+        Binding("c", "cancel_job", "İptal Et", show=False),
+        Binding("p", "pause_job", "Duraklat", show=False),
+        Binding("r", "clear_finished", "Temizle", show=False),
+        Binding("escape,z", "close", "Kapat", show=False),
+    ]
+
+    CSS = """
+    JobQueueScreen {
+        align: center middle;
+    }
+
+    #queue-container {
+        width: 110;
+        height: 32;
+        background: #2b3339;
+        border: thick #a7c080;
+    }
+
+    #queue-title {
+        height: 3;
+        content-align: center middle;
+        background: #a7c080;
+        color: #2b3339;
+        text-style: bold;
+    }
+
+    #queue-limits {
+        height: 3;
+        padding: 0 2;
+        align: left middle;
+    }
+
+    #queue-limits Label {
+        width: auto;
+        margin: 0 1 0 2;
+        color: #d3c6aa;
+    }
+
+    #queue-limits Input {
+        width: 8;
+    }
+
+    #job_table {
+        height: 1fr;
+        background: #232a2e;
+    }
+
+    #queue-buttons {
+        height: 4;
+        align: center middle;
+        background: #2b3339;
+    }
+
+    #queue-buttons Button {
+        margin: 0 1;
+        min-width: 12;
+    }
+    """
+
+    def __init__(self, scheduler: JobScheduler):
+        super().__init__()
+        self.scheduler = scheduler
+
+    def compose(self) -> ComposeResult:
+        with Container(id="queue-container"):
+            yield Static("📋 İş Kuyruğu", id="queue-title")
+            with Horizontal(id="queue-limits"):
+                yield Label("Eşzamanlı İş:")
+                yield Input(value=str(self.scheduler.max_jobs), id="max_jobs")
+                yield Label("Disk Başına:")
+                yield Input(value=str(self.scheduler.per_device), id="per_device")
+            yield DataTable(id="job_table", cursor_type="row")
+            with Horizontal(id="queue-buttons"):
+                yield Button("▲ Yukarı", id="btn_job_up")
+                yield Button("▼ Aşağı", id="btn_job_down")
+                yield Button("⏸ Duraklat", id="btn_job_pause")
+                yield Button("✗ İptal Et", id="btn_job_cancel", variant="error")
+                yield Button("🧹 Temizle", id="btn_job_clear")
+                yield Button("Kapat", id="btn_queue_close", variant="primary")
+
+    def on_mount(self) -> None:
+        table = self.query_one("#job_table", DataTable)
+        table.add_columns("#", "Kaynak", "Hedef", "Motor", "Durum", "İlerleme", "Hız")
+        self.refresh_rows()
+        self.set_interval(0.5, self.refresh_rows)
+
+    def refresh_rows(self) -> None:
+        """Redraw one row per job with its status and throughput."""
+        table = self.query_one("#job_table", DataTable)
+        cursor = table.cursor_row
+        table.clear()
+        for job in self.scheduler.jobs:
+            event = job.progress
+            percent = f"%{event.percent:.0f}" if event else "-"
+            if job.status == DONE:
+                percent = "%100"
+            speed = f"{event.speed_mbps:.2f} MB/s" if event else "-"
+            table.add_row(
+                str(job.id),
+                describe_sources(job.spec.inputs),
+                job.spec.output,
+                job.spec.backend,
+                job.status,
+                percent,
+                speed,
+            )
+        if self.scheduler.jobs:
+            table.move_cursor(row=min(cursor, len(self.scheduler.jobs) - 1))
+
+    def selected_job(self):
+        table = self.query_one("#job_table", DataTable)
+        if not self.scheduler.jobs:
+            return None
+        return self.scheduler.jobs[min(table.cursor_row, len(self.scheduler.jobs) - 1)]
+
+    @on(Input.Changed, "#max_jobs")
+    def on_max_jobs_changed(self, event: Input.Changed) -> None:
+        """Update the global concurrency limit."""
+        if event.value.isdigit() and int(event.value) >= 1:
+            self.scheduler.max_jobs = int(event.value)
+            self.scheduler.dispatch()
+
+    @on(Input.Changed, "#per_device")
+    def on_per_device_changed(self, event: Input.Changed) -> None:
+        """Update the per-device concurrency limit."""
+        if event.value.isdigit() and int(event.value) >= 1:
+            self.scheduler.per_device = int(event.value)
+            self.scheduler.dispatch()
+
+    @on(Button.Pressed, "#btn_job_up")
+    def action_move_up(self) -> None:
+        """Move the selected job up [u]."""
+        job = self.selected_job()
+        if job:
+            self.scheduler.move(job, -1)
+            self.query_one("#job_table", DataTable).move_cursor(row=self.scheduler.jobs.index(job))
+            self.refresh_rows()
+
+    @on(Button.Pressed, "#btn_job_down")
+    def action_move_down(self) -> None:
+        """Move the selected job down [d]."""
+        job = self.selected_job()
+        if job:
+            self.scheduler.move(job, 1)
+            self.query_one("#job_table", DataTable).move_cursor(row=self.scheduler.jobs.index(job))
+            self.refresh_rows()
+
+    @on(Button.Pressed, "#btn_job_cancel")
+    def action_cancel_job(self) -> None:
+        """Cancel the selected job [c]."""
+        job = self.selected_job()
+        if job:
+            self.scheduler.cancel(job)
+            self.refresh_rows()
+
+    @on(Button.Pressed, "#btn_job_pause")
+    def action_pause_job(self) -> None:
+        """Pause or continue the selected job [p]."""
+        job = self.selected_job()
+        if job:
+            if job.status == PAUSED:
+                job.resume()
+            else:
+                job.pause()
+            self.refresh_rows()
+
+    @on(Button.Pressed, "#btn_job_clear")
+    def action_clear_finished(self) -> None:
+        """Remove finished, failed and cancelled jobs [r]."""
+        self.scheduler.clear_finished()
+        self.refresh_rows()
+
+    @on(Button.Pressed, "#btn_queue_close")
+    def action_close(self) -> None:
+        """Close the queue [z or escape]."""
+        self.dismiss(None)
+
+
+class ThrottleScreen(ModalScreen):
+    """A modal screen editing the bandwidth and IOPS limits, also while jobs run."""
+
+    BINDINGS = [
+        Binding("escape", "close", "Kapat", show=False),
+    ]
+
+    CSS = """
+    ThrottleScreen {
+        align: center middle;
+    }
+
+    #throttle-container {
+        width: 80;
+        height: 25;
+        background: #2b3339;
+        border: thick #a7c080;
+    }
+
+    #throttle-title {
+        height: 3;
+        content-align: center middle;
+        background: #a7c080;
+        color: #2b3339;
+        text-style: bold;
+    }
+
+    .throttle-row {
+        height: 3;
+        padding: 0 2;
+        align: left middle;
+    }
+
+    .throttle-row Label {
+        width: 18;
+        color: #d3c6aa;
+    }
+
+    #throttle_backoff {
+        margin: 0 2;
+    }
+
+    #throttle-status {
+        height: 3;
+        padding: 0 2;
+        color: #d3c6aa;
+    }
+
+    #throttle-buttons {
+        height: 4;
+        align: center middle;
+        background: #2b3339;
+    }
+
+    #throttle-buttons Button {
+        margin: 0 1;
+        min-width: 12;
+    }
+    """
+
+    def __init__(self, throttle: Throttle):
+        super().__init__()
+        self.throttle = throttle
+
+    def compose(self) -> ComposeResult:
+        settings = self.throttle.settings
+        with Container(id="throttle-container"):
+            yield Static("⏱ Hız Sınırı", id="throttle-title")
+            with Horizontal(classes="throttle-row"):
+                yield Label("Bant genişliği:")
+                yield Input(value=format_limit(settings.bytes_per_sec),
+                            placeholder="Örn: 50M (boş: sınırsız)", id="throttle_bytes")
+            with Horizontal(classes="throttle-row"):
+                yield Label("İşlem/sn:")
+                yield Input(value=str(settings.ops_per_sec or ""),
+                            placeholder="Örn: 200 (boş: sınırsız)", id="throttle_ops")
+            with Horizontal(classes="throttle-row"):
+                yield Label("Zaman planı:")
+                yield Input(value=settings.schedule,
+                            placeholder="Örn: 09:00-18:00=20M/100; 18-09=0", id="throttle_schedule")
+            yield Checkbox("Yazma gecikmesi artınca yavaşla", value=settings.backoff,
+                           id="throttle_backoff")
+            yield Static("", id="throttle-status")
+            with Horizontal(id="throttle-buttons"):
+                yield Button("Uygula", id="btn_throttle_apply", variant="primary")
+                yield Button("Kapat", id="btn_throttle_close")
+
+    def on_mount(self) -> None:
+        self.refresh_status()
+        self.set_interval(1.0, self.refresh_status)
+
+    def refresh_status(self) -> None:
+        """Show the limits in force, which may differ from the form by schedule or back-off."""
+        self.query_one("#throttle-status", Static).update(
+            "Şu an: " + (self.throttle.describe() or "sınırsız")
+        )
+
+    @on(Button.Pressed, "#btn_throttle_apply")
+    def action_apply(self) -> None:
+        """Apply the limits to running and future jobs and remember them."""
+        status = self.query_one("#throttle-status", Static)
+        ops = self.query_one("#throttle_ops", Input).value.strip()
+        try:
+            if ops and not ops.isdigit():
+                raise ValueError(f"geçersiz işlem sayısı: '{ops}'")
+            settings = ThrottleSettings(
+                bytes_per_sec=parse_rate(self.query_one("#throttle_bytes", Input).value),
+                ops_per_sec=int(ops or 0),
+                schedule=self.query_one("#throttle_schedule", Input).value.strip(),
+                backoff=self.query_one("#throttle_backoff", Checkbox).value,
+            )
+            self.throttle.apply(settings)
+        except ValueError as e:
+            status.update(f"❌ {e}")
+            return
+        try:
+            save_settings(settings)
+        except OSError:
+            pass
+        self.dismiss(True)
+
+    @on(Button.Pressed, "#btn_throttle_close")
+    def action_close(self) -> None:
+        """Close without changing the limits [escape]."""
+        self.dismiss(None)
+
+
+def format_limit(rate: int) -> str:
+    """A byte rate as typed in the limit form: 50M rather than 52428800."""
+    if not rate:
+        return ""
+    for unit, size in (("G", 1024 ** 3), ("M", 1024 ** 2), ("K", 1024)):
+        if rate % size == 0:
+            return f"{rate // size}{unit}"
+    return str(rate)
+
+
 class CpppTUI(App):
     """A Textual app for cppp (cp++) - Everforest Theme."""
 
@@ -129,7 +770,7 @@ class CpppTUI(App):
 
     #app-container {
         width: 90;
-        height: 40;
+        height: 51;
         background: #2b3339;
         border: thick #a7c080;
     }
@@ -218,6 +859,21 @@ class CpppTUI(App):
         background: #83c092;
     }
 
+    .sources-row {
+        height: 5;
+        margin: 1 0 0 0;
+    }
+
+    #source_list {
+        height: 4;
+        background: #232a2e;
+    }
+
+    #source-total {
+        height: 1;
+        color: #859289;
+    }
+
     .options-row {
         height: 4;
         align: left middle;
@@ -230,6 +886,11 @@ class CpppTUI(App):
         height: 3;
     }
 
+    .options-row Checkbox {
+        padding: 0;
+        margin: 0 1 0 0;
+    }
+
     #logs-section {
         height: 13;
         padding: 0;
@@ -252,6 +913,53 @@ class CpppTUI(App):
         text-style: bold;
     }
 
+    #progress-row {
+        height: 1;
+        padding: 0 2;
+        background: #272e33;
+    }
+
+    #progress-bar {
+        width: 1fr;
+    }
+
+    #progress-speed {
+        width: auto;
+        color: #7fbbb3;
+    }
+
+    #logs-row {
+        height: 11;
+    }
+
+    #parts-row {
+        display: none;
+    }
+
+    #app-container.parts-mode #parts-row {
+        display: block;
+    }
+
+    #app-container.parts-mode #logs-section {
+        height: 9;
+    }
+
+    #app-container.parts-mode #logs-row,
+    #app-container.parts-mode Log,
+    #app-container.parts-mode #metrics {
+        height: 7;
+    }
+
+    #metrics {
+        display: none;
+        width: 31;
+        height: 11;
+        padding: 0 1;
+        background: #232a2e;
+        color: #7fbbb3;
+        border-left: solid #374247;
+    }
+
     Log {
         height: 11;
         background: #232a2e;
@@ -319,16 +1027,39 @@ class CpppTUI(App):
         Binding("q", "quit", "Çıkış", show=True),
         Binding("ctrl+c", "quit", "Çıkış", show=False),
         Binding("s", "toggle_start", "Başlat/Durdur", show=True),
+        Binding("p", "toggle_pause", "Duraklat", show=True),
+        Binding("r", "resume", "Devam Et", show=True),
         Binding("h", "show_help", "Yardım", show=True),
         Binding("i", "focus_input", "Kaynak", show=True),
         Binding("o", "focus_output", "Hedef", show=True),
         Binding("t", "focus_thread", "Thread", show=True),
+        Binding("a", "queue_add", "Kuyruğa Ekle", show=True),
+        Binding("j", "show_queue", "Kuyruk", show=True),
+        Binding("g", "toggle_metrics", "Grafik", show=True),
+        Binding("l", "show_throttle", "Hız Sınırı", show=True),
     ]
 
     def __init__(self):
         super().__init__()
         self.process = None
+        self.engine = None
         self.process_running = False
+        # Set while the running transfer is held with [p]
+        self.paused = False
+        self.last_progress = None
+        self.shown_progress = None
+        self.log_buffer = LogBuffer()
+        self.metrics = None
+        # binary.BinaryInfo of the cppp binary, set by discover_binary()
+        self.binary = None
+        # Bandwidth and IOPS limits shared by the main job and the queue
+        self.throttle = Throttle(load_settings())
+        self.scheduler = JobScheduler(on_finish=self.on_job_finished, throttle=self.throttle)
+        # Sources whose size changed since the list was last redrawn; filled by
+        # SizeAggregator threads, so only touched under sources_lock
+        self.sources_dirty = set()
+        self.sources_lock = threading.Lock()
+        self.sources = SizeAggregator(on_update=self.source_updated)
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
@@ -345,14 +1076,38 @@ class CpppTUI(App):
                     with RadioSet(id="mode_select"):
                         yield RadioButton("Kopyala", value=True, id="mode_copy")
                         yield RadioButton("Taşı", id="mode_move")
+                        yield RadioButton("Senkronize", id="mode_sync")
+                        yield RadioButton("Parça", id="mode_parts")
+
+                # Split, merge and select-merge, shown in the Parça mode only
+                with Horizontal(classes="input-row", id="parts-row"):
+                    yield Label("Parça İşlemi:", classes="input-label")
+                    with RadioSet(id="parts_select"):
+                        yield RadioButton("Böl", value=True, id="parts_split")
+                        yield RadioButton("Birleştir", id="parts_merge")
+                        yield RadioButton("Ayıkla", id="parts_select_merge")
+                    yield Input(placeholder="Parçalar: 1,3-5", id="select_parts")
+
+                # Copy backend: external cppp binary or the in-process engine
+                with Horizontal(classes="input-row"):
+                    yield Label("Motor:", classes="input-label")
+                    with RadioSet(id="backend_select"):
+                        yield RadioButton("cppp (C)", value=True, id="backend_cppp")
+                        yield RadioButton("Python", id="backend_python")
                     yield Label("Thread:", classes="input-label")
-                    yield Input(value="4", id="parts")
+                    yield Input(value="4", placeholder="4 veya auto", id="parts")
                 
-                # Input paths
+                # Input paths: typed paths and patterns are added to the source list
                 with Horizontal(classes="input-row"):
                     yield Label("Kaynak Yolu:", classes="input-label")
-                    yield Input(placeholder="Örn: ./dosya.txt veya /tam/yol", id="input_path")
+                    yield Input(placeholder="Örn: ./dosya.txt, /tam/yol veya *.txt (Enter: listeye ekle)", id="input_path")
                     yield Button("📁", id="btn_browse_input", classes="browse-btn")
+
+                with Horizontal(classes="sources-row"):
+                    yield Label("Kaynaklar:", classes="input-label")
+                    with Vertical():
+                        yield SourceTable(id="source_list", cursor_type="row", show_header=False)
+                        yield Static("Liste boş", id="source-total")
                 
                 # Output path
                 with Horizontal(classes="input-row"):
@@ -362,23 +1117,32 @@ class CpppTUI(App):
             
             # Options section
             with Horizontal(classes="section options-row"):
-                yield Checkbox("Detaylı Çıktı (-v)", id="verbose", value=True)
+                yield Checkbox("Detaylı (-v)", id="verbose", value=True)
                 yield Checkbox("Üzerine Yaz (-f)", id="force")
-                yield Checkbox("SHA-256 Kontrolü (-c)", id="checksum")
+                yield Checkbox("SHA-256 (-c)", id="checksum")
+                yield Checkbox("Önbelleksiz", id="direct_io")
             
             # Progress section
             yield Static("▶ İşlem Başlamadı", id="progress-section")
+            with Horizontal(id="progress-row"):
+                yield ProgressBar(total=100, show_eta=False, id="progress-bar")
+                yield Static("", id="progress-speed")
             
             # Logs section
             with Vertical(id="logs-section"):
                 yield Static("─── İŞLEM KAYITLARI ───", id="logs-title")
-                yield Log(id="logs", auto_scroll=True)
+                with Horizontal(id="logs-row"):
+                    yield Log(id="logs", auto_scroll=True, max_lines=LOG_MAX_LINES)
+                    yield Static("", id="metrics", markup=False)
             
             # Buttons section
             with Vertical(id="buttons-section"):
                 with Horizontal(id="button-container"):
                     yield Button("📖 Yardım", id="btn_help", classes="btn-help")
                     yield Button("▶ İşlemi Başlat", id="btn_start", classes="btn-start")
+                    yield Button("↻ Devam Et", id="btn_resume", classes="btn-help")
+                    yield Button("➕ Kuyruğa Ekle", id="btn_queue_add", classes="btn-help")
+                    yield Button("📋 Kuyruk", id="btn_queue", classes="btn-help")
         
         yield Footer()
 
@@ -395,20 +1159,181 @@ class CpppTUI(App):
         log.write_line("  3. '▶ İşlemi Başlat' butonuna basın")
         log.write_line("")
         log.write_line("⌨️  [i] Kaynak | [o] Hedef | [t] Thread")
-        log.write_line("    [s] Başlat | [h] Yardım | [q] Çıkış")
+        log.write_line("    [s] Başlat | [p] Duraklat | [r] Devam Et | [h] Yardım | [q] Çıkış")
+        log.write_line("    [a] Kuyruğa Ekle | [j] Kuyruk | [g] Grafik | [l] Hız Sınırı")
         log.write_line("")
+        sources = self.query_one("#source_list", DataTable)
+        for column in ("Kaynak", "Boyut", "Dosya"):
+            sources.add_column(column, key=column)
+        self.set_interval(PROGRESS_REFRESH, self.refresh_progress)
+        self.set_interval(PROGRESS_REFRESH, self.refresh_sources)
+        self.set_interval(SAMPLE_INTERVAL, self.refresh_metrics)
+        self.set_interval(LOG_FLUSH_INTERVAL, self.flush_logs)
+        # Probing the binary runs subprocesses, keep it off the event loop
+        self.run_worker(self.discover_binary(), group="binary")
+
+    async def discover_binary(self) -> None:
+        """Find the cppp binary and offer the C backend only if it exists."""
+        self.binary = await asyncio.to_thread(discover)
+        self.log_buffer.append(describe_binary(self.binary))
+        if self.binary is None:
+            self.query_one("#backend_python", RadioButton).value = True
+            self.query_one("#backend_cppp", RadioButton).disabled = True
+
+    def binary_path(self):
+        """The binary found at startup; searched again only if there was none."""
+        return self.binary.path if self.binary is not None else find_binary()
+
+    def on_unmount(self) -> None:
+        self.sources.shutdown()
+
+    def flush_logs(self) -> None:
+        """Write queued output lines to the Log widget in one batch."""
+        lines = self.log_buffer.drain()
+        if lines:
+            self.query_one("#logs", Log).write_lines(lines)
+        buffer = self.log_buffer
+        if buffer.dropped or buffer.collapsed:
+            self.query_one("#logs-title", Static).update(
+                f"─── İŞLEM KAYITLARI ─── (atlanan: {buffer.dropped}, tekrarlanan: {buffer.collapsed})"
+            )
+
+    def refresh_progress(self) -> None:
+        """Render the latest progress event at a fixed rate."""
+        event = self.last_progress
+        if not self.process_running or event is None:
+            return
+        speed = self.query_one("#progress-speed", Static)
+        if event is not self.shown_progress:
+            self.shown_progress = event
+            self.query_one("#progress-bar", ProgressBar).update(progress=event.percent)
+        idle = time.monotonic() - event.received
+        if self.paused:
+            speed.update(" ⏸  Duraklatıldı, sürdürmek için p tuşuna basın")
+        elif idle > STALL_AFTER and event.percent < 100:
+            speed.update(f" ⚠️  {int(idle)} sn'dir ilerleme yok")
+        else:
+            files = f" | {event.files_done}/{event.files_total} dosya" if event.files_total else ""
+            limit = self.throttle.describe() if self.engine else ""
+            speed.update(
+                f" {event.speed_mbps:.2f} MB/s | ETA {format_duration(event.eta)}"
+                f" | Geçen {format_duration(event.elapsed)}{files}"
+                + (f" | ⏱ {limit}" if limit else "")
+            )
+
+    def add_sources(self, paths: list[str]) -> None:
+        """Add paths to the source list and start measuring them."""
+        table = self.query_one("#source_list", DataTable)
+        for path in paths:
+            if self.sources.add(path):
+                table.add_row(path, "…", "…", key=path)
+        self.update_source_total()
+
+    def source_updated(self, path: str, size) -> None:
+        """Called from SizeAggregator worker threads."""
+        with self.sources_lock:
+            self.sources_dirty.add(path)
+
+    def refresh_sources(self) -> None:
+        """Redraw the sizes that changed since the last refresh."""
+        with self.sources_lock:
+            dirty, self.sources_dirty = self.sources_dirty, set()
+        if not dirty:
+            return
+        table = self.query_one("#source_list", DataTable)
+        for path in dirty:
+            size = self.sources.sizes.get(path)
+            if size is None or path not in table.rows:
+                continue
+            if size.error:
+                table.update_cell(path, "Boyut", f"❌ {size.error}", update_width=True)
+                table.update_cell(path, "Dosya", "-")
+                continue
+            suffix = "" if size.done else "…"
+            table.update_cell(path, "Boyut", format_size(size.total_bytes) + suffix, update_width=True)
+            table.update_cell(path, "Dosya", f"{size.file_count}{suffix}", update_width=True)
+        self.update_source_total()
+
+    def update_source_total(self) -> None:
+        total = self.query_one("#source-total", Static)
+        count = len(self.sources.sizes)
+        if not count:
+            total.update("Liste boş")
+            return
+        total_bytes, file_count = self.sources.totals()
+        state = " (hesaplanıyor…)" if self.sources.measuring else ""
+        total.update(f"Toplam: {count} kaynak • {format_size(total_bytes)} • {file_count} dosya{state}"
+                     "   \\[Del] çıkar")
+
+    @on(RadioSet.Changed, "#mode_select")
+    def on_mode_changed(self, event: RadioSet.Changed) -> None:
+        """Show the parts row in the Parça mode."""
+        container = self.query_one("#app-container", Container)
+        container.set_class(event.pressed.id == "mode_parts", "parts-mode")
+
+    @on(Input.Submitted, "#input_path")
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Add the typed path, or every match of the typed pattern."""
+        paths, unmatched = expand_sources(event.value)
+        for pattern in unmatched:
+            self.query_one("#logs", Log).write_line(f"⚠️  '{pattern}' ile eşleşen dosya yok")
+        if paths:
+            self.add_sources(paths)
+            event.input.value = ""
+
+    def action_remove_source(self) -> None:
+        """Remove the highlighted source from the list."""
+        table = self.query_one("#source_list", DataTable)
+        if not table.row_count:
+            return
+        key = table.coordinate_to_cell_key((table.cursor_row, 0)).row_key
+        self.sources.remove(key.value)
+        table.remove_row(key)
+        self.update_source_total()
+
+    def refresh_metrics(self) -> None:
+        """Sample the running job and redraw the sparkline panel."""
+        panel = self.query_one("#metrics", Static)
+        metrics = self.metrics
+        if metrics is None or not panel.display:
+            return
+        if self.process_running:
+            metrics.sample()
+        width = 12
+        rows = [
+            ("MB/s", metrics.throughput),
+            ("dosya/s", metrics.file_rate),
+            ("kuyruk", metrics.queue_depth),
+            ("okuma ms", metrics.read_latency),
+            ("yazma ms", metrics.write_latency),
+        ]
+        lines = [f"{label:<9}{sparkline(ring.values(), width):<{width}} {ring.last:>6.1f}"
+                 for label, ring in rows]
+        lines.append("── iş parçacığı MB/s ──")
+        workers = sorted(metrics.workers.items(), key=lambda item: item[1].last, reverse=True)
+        for name, ring in workers[:4]:
+            name = name.removeprefix("cppp-")
+            lines.append(f"{name[:9]:<9}{sparkline(ring.values(), width):<{width}} {ring.last:>6.1f}")
+        if len(workers) > 4:
+            lines.append(f"  (+{len(workers) - 4} iş parçacığı)")
+        panel.update("\n".join(lines))
+
+    def action_toggle_metrics(self) -> None:
+        """Show or hide the sparkline panel next to the logs."""
+        panel = self.query_one("#metrics", Static)
+        panel.display = not panel.display
 
     @on(Button.Pressed, "#btn_browse_input")
     def browse_input(self) -> None:
-        """Browse for input file/directory."""
+        """Browse for input files/directories and add them to the source list."""
         current_path = self.query_one("#input_path", Input).value or "."
         
         def handle_result(result):
             if result:
-                self.query_one("#input_path", Input).value = result
+                self.add_sources(result)
         
         self.push_screen(
-            FilePickerScreen("Kaynak Dosya/Klasör Seç", current_path),
+            FilePickerScreen("Kaynak Dosya/Klasör Seç", current_path, multiple=True),
             handle_result
         )
 
@@ -449,33 +1374,71 @@ class CpppTUI(App):
         log.write_line("   • Gerçek zamanlı ilerleme gösterimi")
         log.write_line("   • Detaylı hata raporlama")
         log.write_line("   • Klasör ve dosya desteği")
+        log.write_line("   • Ön tarama: toplam boyut, boş alan ve çakışma kontrolü")
+        log.write_line("   • Yarım kalan işlere kaldığı yerden devam etme")
+        log.write_line("   • Hız, gecikme ve kuyruk grafikleri; iş sonunda özet raporu")
+        log.write_line("   • Bant genişliği ve işlem/sn sınırı, saat planı ve gecikme")
+        log.write_line("     artınca kendiliğinden yavaşlama (Python motoru)")
         log.write_line("")
         log.write_line("📋 Kullanım Adımları:")
-        log.write_line("   1. Mod: copy (kopyala) veya move (taşı)")
-        log.write_line("   2. Kaynak: Kopyalanacak dosya/klasör")
+        log.write_line("   1. Mod: copy (kopyala), move (taşı) veya sync (senkronize:")
+        log.write_line("      değişmeyen dosyalar atlanır, büyük dosyalarda yalnızca")
+        log.write_line("      değişen bloklar yeniden yazılır)")
+        log.write_line("      Taşı: aynı dosya sisteminde anında yeniden adlandırır;")
+        log.write_line("      başka diske kopyalar, doğrular, sonra kaynağı siler")
+        log.write_line("      Parça modunda: Böl (her kaynak Thread sayısı kadar")
+        log.write_line("      .partN dosyasına), Birleştir (kaynaklar listedeki")
+        log.write_line("      sırayla hedef dosyaya) veya Ayıkla (Thread sayısı kadar")
+        log.write_line("      parçaya bölünen kaynağın 1,3-5 gibi seçilen parçaları)")
+        log.write_line("   2. Kaynak: Kopyalanacak dosya/klasör; yol veya *.txt gibi")
+        log.write_line("      bir desen yazıp [Enter] ile listeye ekleyin. Listedeki")
+        log.write_line("      tüm kaynaklar tek işte kopyalanır, toplam boyut arka")
+        log.write_line("      planda hesaplanır ([Del] seçili kaynağı çıkarır)")
         log.write_line("   3. Hedef: Kopyalanacağı yer")
         log.write_line("   4. Thread: İşlemci çekirdek sayınıza göre ayarlayın")
         log.write_line("      • 2-4 çekirdek: 4 thread")
         log.write_line("      • 6-8 çekirdek: 8-12 thread")
         log.write_line("      • 12+ çekirdek: 16-20 thread")
+        log.write_line("      • auto: kaynak ve hedef disk ölçülerek seçilir")
+        log.write_line("   5. Motor: cppp (C binary) veya Python (parçaları aynı")
+        log.write_line("      anda kopyalayan süreç içi motor)")
         log.write_line("")
         log.write_line("⚙️  Seçenekler:")
-        log.write_line("   • Detaylı Çıktı (-v): İlerleme çubuğu ve hız gösterir")
+        log.write_line("   • Detaylı (-v): İlerleme çubuğu ve hız gösterir")
         log.write_line("   • Üzerine Yaz (-f): Var olan dosyaları değiştirir")
-        log.write_line("   • SHA-256 (-c): Kopyalama sonrası bütünlük kontrolü")
+        log.write_line("   • SHA-256 (-c): Python motorunda kopyalarken parça parça hesaplanır")
+        log.write_line("   • Önbelleksiz: Çok büyük dosyalar O_DIRECT ile, olmazsa")
+        log.write_line("     sayfa önbelleğini sürekli boşaltarak kopyalanır (Python motoru)")
         log.write_line("")
         log.write_line("⌨️  Klavye Kısayolları:")
         log.write_line("   [i] → Kaynak yoluna odaklan")
         log.write_line("   [o] → Hedef yoluna odaklan")
         log.write_line("   [t] → Thread sayısına odaklan")
         log.write_line("   [s] → İşlemi Başlat/Durdur")
+        log.write_line("   [p] → Çalışan işi duraklat/sürdür (açık dosyalar ve")
+        log.write_line("         ilerleme korunur, kuyrukta da [p] seçili işi duraklatır)")
+        log.write_line("   [r] → Yarım kalan işe kaldığı yerden devam et")
+        log.write_line("         (Python motoruyla, biten dosya ve parçalar atlanır)")
+        log.write_line("   [a] → Formu iş kuyruğuna ekle")
+        log.write_line("   [j] → İş kuyruğunu göster")
+        log.write_line("   [g] → Grafik panelini göster/gizle")
+        log.write_line("   [l] → Hız sınırı (iş sürerken de değiştirilebilir)")
         log.write_line("   [h] → Bu yardım ekranı")
         log.write_line("   [q] → Çıkış")
         log.write_line("")
         log.write_line("   Dosya Seçici:")
-        log.write_line("   [x] → Seçili dosyayı onayla")
+        log.write_line("   [↑]/[↓] [PgUp]/[PgDn] → Gezin, [Enter] → Klasörü aç")
+        log.write_line("   [Boşluk] → İşaretle (kaynakta birden çok seçilebilir)")
+        log.write_line("   [Backspace] → Üst klasör, [/] → Ada göre süz")
+        log.write_line("   [x] → İşaretlileri (yoksa imleçtekini) onayla")
         log.write_line("   [z] veya [Esc] → İptal")
         log.write_line("")
+        log.write_line("   İş Kuyruğu:")
+        log.write_line("   [u]/[d] → Seçili işi yukarı/aşağı taşı")
+        log.write_line("   [c] → Seçili işi iptal et")
+        log.write_line("   [r] → Biten işleri temizle")
+        log.write_line("   [z] veya [Esc] → Kapat")
+        log.write_line("")
         log.write_line("📝 Komut Satırı Örnekleri:")
         log.write_line("   cppp -i dosya.txt -o /hedef/ -p 4 -v")
         log.write_line("   cppp -i /kaynak/klasor -o /yedek/ -p 20 -v -c")
@@ -492,48 +1455,98 @@ class CpppTUI(App):
         if self.process_running:
             await self.stop_process()
         else:
-            await self.start_process()
+            # Run in a worker so the Stop button stays responsive
+            self.run_worker(self.start_process(), group="copy")
 
-    async def start_process(self) -> None:
-        """Start the cppp process."""
+    def read_form(self):
+        """Validate the form and return it as a JobSpec, or None on error."""
         log = self.query_one("#logs", Log)
-        progress = self.query_one("#progress-section", Static)
-        button = self.query_one("#btn_start", Button)
         
         # Get input values
         input_path = self.query_one("#input_path", Input).value.strip()
+        inputs = self.sources.paths
         output_path = self.query_one("#output_path", Input).value.strip()
         parts = self.query_one("#parts", Input).value.strip()
         
         # Get mode from radio buttons
         mode_radio = self.query_one("#mode_select", RadioSet)
-        mode = "copy" if mode_radio.pressed_button.id == "mode_copy" else "move"
+        mode = {"mode_copy": "copy", "mode_move": "move", "mode_sync": "sync",
+                "mode_parts": "parts"}[mode_radio.pressed_button.id]
+        if mode == "parts":
+            parts_radio = self.query_one("#parts_select", RadioSet)
+            mode = {"parts_split": "split", "parts_merge": "merge",
+                    "parts_select_merge": "select-merge"}[parts_radio.pressed_button.id]
         
         # Get checkboxes
         verbose = self.query_one("#verbose", Checkbox).value
         force = self.query_one("#force", Checkbox).value
         checksum = self.query_one("#checksum", Checkbox).value
+        direct_io = self.query_one("#direct_io", Checkbox).value
+
+        # Get backend from radio buttons
+        backend_radio = self.query_one("#backend_select", RadioSet)
+        backend = "python" if backend_radio.pressed_button.id == "backend_python" else "cppp"
+        if mode in ENGINE_ONLY_MODES and backend != "python":
+            log.write_line(f"ℹ️  {ENGINE_ONLY_MODES[mode]}")
+            backend = "python"
+        if mode in PARTS_MODES and backend != "python":
+            # build_command() cannot pass part files or a part selection
+            log.write_line("ℹ️  Parça işlemleri Python motoruyla yapılır.")
+            backend = "python"
+        if direct_io and mode in PARTS_MODES:
+            log.write_line("ℹ️  Parça işlemleri önbelleksiz G/Ç kullanmaz.")
+            direct_io = False
+        if direct_io and backend != "python":
+            # copy.c always goes through the page cache
+            log.write_line("ℹ️  Önbelleksiz G/Ç Python motoruyla yapılır.")
+            backend = "python"
+        if self.throttle.enabled and backend != "python":
+            # Only in-process workers take their budget from the shared buckets
+            log.write_line("ℹ️  Hız sınırı Python motoruyla uygulanır.")
+            backend = "python"
         
-        # Validate inputs
-        if not input_path:
+        # Validate inputs (a typed path not added to the list yet still counts)
+        paths, unmatched = expand_sources(input_path)
+        if unmatched:
+            log.write_line("")
+            log.write_line(f"❌ HATA: '{unmatched[0]}' ile eşleşen dosya yok!")
+            return None
+        inputs += [path for path in paths if path not in inputs]
+        if not inputs:
             log.write_line("")
             log.write_line("❌ HATA: Kaynak yolu boş olamaz!")
             log.write_line("   Lütfen kaynak dosya veya klasör yolu girin.")
-            return
+            return None
         
         if not output_path:
             log.write_line("")
             log.write_line("❌ HATA: Hedef yolu boş olamaz!")
             log.write_line("   Lütfen hedef klasör yolu girin.")
-            return
+            return None
         
-        # Validate parts
+        selected = []
+        if mode == "select-merge":
+            try:
+                selected = parse_selection(self.query_one("#select_parts", Input).value)
+            except ValueError:
+                selected = None
+            if not selected:
+                log.write_line("")
+                log.write_line("❌ HATA: Ayıklanacak parçaları girin (örn: 1,3-5)!")
+                return None
+        
+        # Validate parts ("auto" measures them before the copy starts)
+        auto_tune = parts.lower() in ("auto", "otomatik")
+        if auto_tune and mode in PARTS_MODES:
+            log.write_line("")
+            log.write_line("❌ HATA: Parça sayısı için bir sayı girin!")
+            return None
         try:
-            parts_int = int(parts) if parts else 1
+            parts_int = DEFAULT_PARTS if auto_tune else int(parts) if parts else 1
             if parts_int < 1:
                 log.write_line("")
                 log.write_line("❌ HATA: Thread sayısı 1'den küçük olamaz!")
-                return
+                return None
             if parts_int > 50:
                 log.write_line("")
                 log.write_line("⚠️  UYARI: Çok yüksek thread sayısı performansı düşürebilir!")
@@ -541,17 +1554,9 @@ class CpppTUI(App):
         except ValueError:
             log.write_line("")
             log.write_line("❌ HATA: Thread sayısı geçerli bir sayı olmalı!")
-            return
+            return None
         
-        # Find cppp binary
-        cppp_paths = ["./build/cppp", "./cppp", "cppp"]
-        cppp_bin = None
-        for path in cppp_paths:
-            if os.path.exists(path) or path == "cppp":
-                cppp_bin = path
-                break
-        
-        if not cppp_bin:
+        if backend == "cppp" and not self.binary_path():
             log.write_line("")
             log.write_line("❌ HATA: cppp binary bulunamadı!")
             log.write_line("")
@@ -559,29 +1564,65 @@ class CpppTUI(App):
             log.write_line("  cd build")
             log.write_line("  cmake ..")
             log.write_line("  make")
-            return
+            return None
         
-        # Build command
-        cmd = [cppp_bin]
-        if mode and mode != "copy":
-            cmd.extend(["-m", mode])
-        cmd.extend(["-i", input_path])
-        cmd.extend(["-o", output_path])
-        if parts:
-            cmd.extend(["-p", parts])
-        if verbose:
-            cmd.append("-v")
-        if force:
-            cmd.append("-f")
-        if checksum:
-            cmd.append("-c")
+        return JobSpec(
+            inputs=inputs,
+            output=output_path,
+            mode=mode,
+            parts=parts_int,
+            verbose=verbose,
+            force=force,
+            checksum=checksum,
+            direct_io=direct_io,
+            backend=backend,
+            auto_tune=auto_tune,
+            selected=selected,
+        )
+
+    @on(Button.Pressed, "#btn_resume")
+    def action_resume(self) -> None:
+        """Continue an interrupted job from its checkpoint journal."""
+        if not self.process_running:
+            self.run_worker(self.start_process(resume=True), group="copy")
+
+    async def start_process(self, resume: bool = False) -> None:
+        """Start the cppp process, or resume an interrupted one."""
+        log = self.query_one("#logs", Log)
+        progress = self.query_one("#progress-section", Static)
+        button = self.query_one("#btn_start", Button)
+        
+        spec = self.read_form()
+        if spec is None:
+            return
+        if resume and spec.parts_mode:
+            log.write_line("")
+            log.write_line("❌ HATA: Parça işlemleri kaldığı yerden devam ettirilemez!")
+            return
+        if resume:
+            if not has_journal(spec.inputs, spec.output):
+                log.write_line("")
+                log.write_line("❌ HATA: Bu kaynak ve hedef için yarım kalmış bir işlem yok!")
+                return
+            # Only the Python engine can skip finished files and parts
+            spec.backend = "python"
+        elif has_journal(spec.inputs, spec.output):
+            # A fresh start discards the checkpoints of the interrupted run
+            Journal.open(spec.inputs, spec.output).remove()
+        use_engine = spec.backend == "python"
+        journal = None
         
         log.clear()
         log.write_line("═══════════════════════════════════════════════════════════")
-        log.write_line("🚀 cppp İşlemi Başlatıldı")
+        log.write_line("↻ cppp İşlemine Devam Ediliyor" if resume else "🚀 cppp İşlemi Başlatıldı")
         log.write_line("═══════════════════════════════════════════════════════════")
         log.write_line("")
-        log.write_line("📌 Komut: " + " ".join(cmd))
+        if spec.parts_mode:
+            log.write_line(f"📌 Parça İşlemi: {PARTS_LABELS[spec.mode]} (parça: {spec.parts})")
+        elif use_engine:
+            log.write_line(f"📌 Motor: Python (paralel parça: {spec.parts})")
+        if use_engine and self.throttle.enabled:
+            log.write_line(f"⏱  Hız sınırı: {self.throttle.describe() or 'şu an yok'} ([l] ile değiştirilebilir)")
         log.write_line("")
         log.write_line("─────────────────────────────────────────────────────────")
         
@@ -591,42 +1632,77 @@ class CpppTUI(App):
             button.label = "⏹ İşlemi Durdur"
             button.remove_class("btn-start")
             button.add_class("btn-stop")
-            progress.update("▶ İşlem Devam Ediyor...")
+            self.last_progress = None
+            self.shown_progress = None
+            self.query_one("#progress-bar", ProgressBar).update(progress=0)
+            self.query_one("#progress-speed", Static).update("")
             
-            # Run the process
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            self.process = process
-            
-            # Read output
-            async def read_stream(stream, prefix=""):
-                while True:
-                    line = await stream.readline()
-                    if not line:
-                        break
-                    log.write_line(prefix + line.decode().strip())
-            
-            await asyncio.gather(
-                read_stream(process.stdout),
-                read_stream(process.stderr, "⚠️  ")
-            )
+            # Plan the transfer before any bytes move; parts jobs preallocate
+            # their outputs, which fails early when space is short
+            report = None
+            if not spec.parts_mode:
+                progress.update("🔎 Ön Tarama Yapılıyor...")
+                report = await asyncio.to_thread(scan, spec.inputs, spec.output,
+                                                 sync=spec.mode == "sync", move=spec.mode == "move",
+                                                 skip_holes=use_engine)
+                for line in summarize(report):
+                    log.write_line(line)
+                log.write_line("")
+            if report is not None and not report.fits:
+                log.write_line("❌ HATA: Hedefte yeterli boş alan yok, işlem başlatılmadı!")
+                progress.update("❌ Yetersiz Alan")
+                return
+            if spec.auto_tune:
+                progress.update("⚙️  Kalibrasyon Yapılıyor...")
+                result = await asyncio.to_thread(tune, report.largest_file, spec.output)
+                spec.apply_tuning(result)
+                log.write_line(describe(result))
+                log.write_line("")
+            if not self.process_running:
+                # Stopped during the scan
+                return
+            progress.update("▶ İşlem Devam Ediyor...")
             
-            await process.wait()
+            if not spec.parts_mode:
+                journal = await asyncio.to_thread(Journal.open, spec.inputs, spec.output)
+            if resume and not journal.has_destinations:
+                # Without the recorded roots the engine would pick a nested destination
+                log.write_line("❌ HATA: Kayıtlı işlemin hedefi bilinmiyor, devam ettirilemez!")
+                progress.update("❌ Devam Ettirilemez")
+                return
+            if resume:
+                log.write_line(f"↻ Kayıtlı ilerleme: {journal.finished_files} dosya tamamlanmış")
+            self.metrics = MetricsRecorder()
+            # Shown for every run; [g] hides it again
+            self.query_one("#metrics", Static).display = True
+            if use_engine:
+                returncode = await self.run_engine(spec, report, journal)
+            else:
+                if journal is not None:
+                    # Recorded for a resume on the Python engine, see Journal.destination()
+                    roots = await asyncio.to_thread(planned_destinations, spec.inputs, spec.output)
+                    for src, dst in roots.items():
+                        journal.record_destination(src, dst)
+                cmd = build_command(self.binary_path(), spec)
+                log.write_line("📌 Komut: " + shlex.join(cmd))
+                returncode = await self.run_binary(cmd, journal)
+            self.flush_logs()
+            if returncode == 0 and journal is not None:
+                journal.remove()
+                journal = None
             
             log.write_line("")
             log.write_line("─────────────────────────────────────────────────────────")
-            if process.returncode == 0:
+            if returncode == 0:
                 log.write_line("✅ İşlem Başarıyla Tamamlandı!")
                 log.write_line("   Tüm dosyalar başarıyla kopyalandı.")
                 progress.update("✅ İşlem Tamamlandı")
+                self.query_one("#progress-bar", ProgressBar).update(progress=100)
             else:
-                log.write_line(f"❌ İşlem Başarısız! (Çıkış Kodu: {process.returncode})")
+                log.write_line(f"❌ İşlem Başarısız! (Çıkış Kodu: {returncode})")
                 log.write_line("   Lütfen yukarıdaki hata mesajlarını kontrol edin.")
                 progress.update("❌ İşlem Başarısız")
+            self.report_metrics()
             log.write_line("═══════════════════════════════════════════════════════════")
             
         except FileNotFoundError:
@@ -642,7 +1718,14 @@ class CpppTUI(App):
             log.write_line("  4. sudo make install  (veya PATH'e ekleyin)")
             log.write_line("")
             progress.update("❌ cppp Bulunamadı")
+        except EngineError as e:
+            self.flush_logs()
+            if e.code != "ERR_COPY_CANCELLED":
+                log.write_line("")
+                log.write_line(f"❌ HATA: {e}")
+                progress.update("❌ İşlem Başarısız")
         except Exception as e:
+            self.flush_logs()
             log.write_line("")
             log.write_line("═══════════════════════════════════════════════════════════")
             log.write_line(f"❌ Beklenmeyen Hata: {str(e)}")
@@ -650,11 +1733,62 @@ class CpppTUI(App):
             log.write_line("")
             progress.update("❌ Hata Oluştu")
         finally:
+            if journal is not None:
+                journal.close()
+                log.write_line("↻ İlerleme kaydedildi, kaldığı yerden devam etmek için [r] tuşuna basın.")
             self.process_running = False
+            self.paused = False
             button.label = "▶ İşlemi Başlat"
             button.remove_class("btn-stop")
             button.add_class("btn-start")
             self.process = None
+            self.engine = None
+
+    def report_metrics(self) -> None:
+        """Log the run summary of the finished job and save it as JSON."""
+        log = self.query_one("#logs", Log)
+        self.metrics.sample()
+        self.refresh_metrics()
+        summary = self.metrics.summary()
+        log.write_line("")
+        for line in summarize_metrics(summary):
+            log.write_line(line)
+        try:
+            log.write_line(f"   Özet kaydedildi: {export_summary(summary)}")
+        except OSError as e:
+            log.write_line(f"⚠️  Özet kaydedilemedi: {e.strerror}")
+
+    async def run_binary(self, cmd: list[str], journal=None) -> int:
+        """Run the external cppp binary and stream its output to the log."""
+        finished = []
+
+        def on_progress(event):
+            self.last_progress = event
+
+        def on_start(process):
+            self.process = process
+
+        def on_file_done(src, dst):
+            finished.append((src, dst))
+
+        try:
+            return await run_binary(cmd, self.log_buffer.append, on_progress, on_start, on_file_done,
+                                    on_event=self.metrics.record_event if self.metrics else None)
+        finally:
+            if journal is not None:
+                await asyncio.to_thread(journal.record_copied, finished)
+
+    async def run_engine(self, spec: JobSpec, report=None, journal=None) -> int:
+        """Run the in-process Python engine of a job on a worker thread."""
+
+        def on_progress(event):
+            self.last_progress = event
+
+        self.engine = spec.make_engine(on_log=self.log_buffer.append, on_progress=on_progress,
+                                       journal=journal, metrics=self.metrics, throttle=self.throttle)
+        if report is not None:
+            self.engine.set_plan(report.total_bytes, report.file_count)
+        return await run_engine(self.engine, spec.inputs, spec.output)
 
     async def stop_process(self) -> None:
         """Stop the running cppp process."""
@@ -662,10 +1796,21 @@ class CpppTUI(App):
         progress = self.query_one("#progress-section", Static)
         button = self.query_one("#btn_start", Button)
         
-        if self.process:
+        if self.engine:
+            log.write_line("")
+            log.write_line("⏹️  İşlem durduruluyor...")
+            self.engine.cancel()
+            while self.engine:
+                await asyncio.sleep(0.05)
+            log.write_line("✅ İşlem başarıyla durduruldu.")
+            progress.update("⏹ İşlem Durduruldu")
+        elif self.process:
             log.write_line("")
             log.write_line("⏹️  İşlem durduruluyor...")
             self.process.terminate()
+            if self.paused:
+                # A stopped process only acts on SIGTERM once it continues
+                pause_process(self.process, False)
             try:
                 await asyncio.wait_for(self.process.wait(), timeout=5.0)
                 log.write_line("✅ İşlem başarıyla durduruldu.")
@@ -681,11 +1826,70 @@ class CpppTUI(App):
         button.remove_class("btn-stop")
         button.add_class("btn-start")
 
+    @on(Button.Pressed, "#btn_queue_add")
+    def action_queue_add(self) -> None:
+        """Add the current form to the job queue."""
+        spec = self.read_form()
+        if spec is None:
+            return
+        job = self.scheduler.add(spec)
+        log = self.query_one("#logs", Log)
+        log.write_line(f"📋 İş #{job.id} kuyruğa eklendi: {describe_sources(spec.inputs)} → {spec.output}")
+
+    @on(Button.Pressed, "#btn_queue")
+    def action_show_queue(self) -> None:
+        """Show the job queue."""
+        self.push_screen(JobQueueScreen(self.scheduler))
+
+    def action_show_throttle(self) -> None:
+        """Edit the bandwidth and IOPS limits, also of running jobs."""
+
+        def handle_result(applied):
+            if applied:
+                limit = self.throttle.describe()
+                self.log_buffer.append(f"⏱  Hız sınırı: {limit or 'sınırsız'}")
+
+        self.push_screen(ThrottleScreen(self.throttle), handle_result)
+
+    def on_job_finished(self, job) -> None:
+        """Report a finished queue job in the main log."""
+        self.log_buffer.append(f"📋 İş #{job.id}: {job.status} ({describe_sources(job.spec.inputs)} → {job.spec.output})")
+        if job.error:
+            self.log_buffer.append(f"   ❌ {job.error}")
+
     def action_toggle_start(self) -> None:
         """Toggle start/stop via keyboard."""
         button = self.query_one("#btn_start", Button)
         button.press()
 
+    def action_toggle_pause(self) -> None:
+        """Pause or continue the running transfer without losing its progress."""
+        log = self.query_one("#logs", Log)
+        progress = self.query_one("#progress-section", Static)
+        running = self.engine or (self.process and self.process.returncode is None)
+        if not running:
+            if self.process_running:
+                log.write_line("ℹ️  Aktarım henüz başlamadı, duraklatılacak bir şey yok.")
+            return
+        self.paused = not self.paused
+        if self.engine:
+            # Workers stop at their next chunk boundary, files stay open
+            if self.paused:
+                self.engine.pause()
+            else:
+                self.engine.resume()
+        else:
+            pause_process(self.process, self.paused)
+        if self.paused:
+            log.write_line("⏸  İşlem duraklatıldı; ilerleme korunuyor, [p] ile sürdürün.")
+            progress.update("⏸ İşlem Duraklatıldı")
+        else:
+            log.write_line("▶  İşlem sürdürülüyor.")
+            progress.update("▶ İşlem Devam Ediyor...")
+            if self.last_progress is not None:
+                # Not a stall: the pause just ended
+                self.last_progress.received = time.monotonic()
+
     def action_focus_input(self) -> None:
         """Focus on input path."""
         self.query_one("#input_path", Input).focus()
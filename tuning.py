@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+cppp tuning - Measures part count and block size for a device pair
+Runs a short copy probe from the real source device to the real
+destination device and caches the winner per (source, destination)
+st_dev pair, so "auto" only pays for the probe once.
+"""
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+
+from engine import CHUNK_SIZE, METHOD_READ_WRITE, copy_range, drop_cache, split_ranges
+from paths import cache_dir, device_of
+
+# Bytes copied by one probe trial; smaller sources are probed in full
+PROBE_BYTES = 64 * 1024 * 1024
+# Below this there is too little data to measure anything useful
+MIN_PROBE_BYTES = 4 * 1024 * 1024
+PROBE_BLOCK_SIZES = [256 * 1024, 1024 * 1024, 4 * 1024 * 1024]
+PROBE_PARTS = [1, 2, 4, 8, 16]
+# Cached profiles older than this are measured again
+PROFILE_MAX_AGE = 30 * 24 * 3600
+PROFILE_FILE = "profiles.json"
+
+DEFAULT_PARTS = 4
+
+
+@dataclass
+class TuneResult:
+    """Chosen settings for one (source device, destination device) pair."""
+
+    parts: int = DEFAULT_PARTS
+    block_size: int = CHUNK_SIZE
+    mbps: float = 0.0
+    measured: float = 0.0
+    cached: bool = False
+
+
+def _profile_path() -> str:
+    return os.path.join(cache_dir(), PROFILE_FILE)
+
+
+def load_profiles() -> dict:
+    try:
+        with open(_profile_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_profile(key: str, result: TuneResult) -> None:
+    profiles = load_profiles()
+    entry = asdict(result)
+    entry.pop("cached")
+    profiles[key] = entry
+    path = _profile_path()
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _trial(src: str, dst_dir: str, length: int, parts: int, block_size: int) -> float:
+    """Copy length bytes of src into a temporary file and return MB/s."""
+    fd_src = os.open(src, os.O_RDONLY)
+    fd_dst, tmp_path = tempfile.mkstemp(prefix=".cppp-probe-", dir=dst_dir)
+    try:
+        drop_cache(fd_src)
+        os.ftruncate(fd_dst, length)
+        ranges = split_ranges(length, parts)
+        start = time.monotonic()
+        # copy_file_range may reflink or copy server-side within a
+        # filesystem, which measures no real bandwidth
+        with ThreadPoolExecutor(max_workers=parts) as pool:
+            list(pool.map(lambda r: copy_range(fd_src, fd_dst, r[0], r[1], block_size,
+                                               method=METHOD_READ_WRITE), ranges))
+        os.fsync(fd_dst)
+        elapsed = time.monotonic() - start
+    finally:
+        os.close(fd_src)
+        os.close(fd_dst)
+        os.unlink(tmp_path)
+    return (length / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0
+
+
+def probe(src: str, dst_dir: str) -> TuneResult:
+    """Measure block sizes first, then part counts with the best block size."""
+    length = min(os.path.getsize(src), PROBE_BYTES)
+    best_block, best_mbps = CHUNK_SIZE, 0.0
+    for block_size in PROBE_BLOCK_SIZES:
+        mbps = _trial(src, dst_dir, length, DEFAULT_PARTS, block_size)
+        if mbps > best_mbps:
+            best_block, best_mbps = block_size, mbps
+
+    best_parts, best_mbps = DEFAULT_PARTS, 0.0
+    for parts in PROBE_PARTS:
+        mbps = _trial(src, dst_dir, length, parts, best_block)
+        # Prefer fewer parts unless more parts are clearly faster
+        if mbps > best_mbps * 1.05:
+            best_parts, best_mbps = parts, mbps
+    return TuneResult(parts=best_parts, block_size=best_block, mbps=best_mbps,
+                      measured=time.time())
+
+
+def tune(sample: str, output: str) -> TuneResult:
+    """Return tuned settings for copying sample's device to output's device.
+
+    sample should be a large regular file from the sources, e.g.
+    PreflightReport.largest_file. Falls back to defaults when there is
+    nothing big enough to measure.
+    """
+    if not sample or os.path.getsize(sample) < MIN_PROBE_BYTES:
+        return TuneResult()
+
+    key = f"{device_of(sample)}:{device_of(output)}"
+    entry = load_profiles().get(key)
+    if entry and time.time() - entry.get("measured", 0) < PROFILE_MAX_AGE:
+        return TuneResult(**entry, cached=True)
+
+    dst_dir = os.path.abspath(output)
+    while not os.path.isdir(dst_dir):
+        dst_dir = os.path.dirname(dst_dir)
+    result = probe(sample, dst_dir)
+    save_profile(key, result)
+    return result
+
+
+def describe(result: TuneResult) -> str:
+    """One log line describing the chosen settings."""
+    source = "profil önbelleğinden" if result.cached else "ölçüldü"
+    if not result.mbps:
+        return f"⚙️  Otomatik ayar: {result.parts} parça (ölçüm için kaynak çok küçük)"
+    return (f"⚙️  Otomatik ayar: {result.parts} parça, {result.block_size // 1024} KB blok "
+            f"({result.mbps:.0f} MB/s, {source})")